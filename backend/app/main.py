@@ -1,9 +1,38 @@
 """
 this script is the entry point for the FastAPI application.
 """
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.app.routers import courses, requirements, departments, analytics,upload
+from backend.app.routers import instructors, metrics
+from backend.app.metrics import MetricsMiddleware, install_sql_instrumentation
+from backend.database.db import SessionLocal, init_db
+from backend.database.rollups import backfill_enrollment_rollups, backfill_instructor_rollups
+from backend.database.forecasts import backfill_enrollment_forecasts
+from backend.database.reference_data import refresh_reference_snapshot
+from backend.database.read_executor import shutdown_read_executor
+from backend.app.utils.jobs import shutdown_job_executor
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """
+    Creates the database engines and missing tables and backfills the precomputed
+    aggregates on startup; drains the read executor and stops the job worker on shutdown.
+    """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    init_db()
+    with SessionLocal() as db:
+        backfill_enrollment_rollups(db)
+        backfill_enrollment_forecasts(db)
+        backfill_instructor_rollups(db)
+        refresh_reference_snapshot(db)
+    yield
+    shutdown_read_executor()
+    shutdown_job_executor()
+
 
 app = FastAPI(
     title="GenEd API",
@@ -12,8 +41,12 @@ app = FastAPI(
     openapi_url="/api/openapi.json",  # Explicit OpenAPI JSON path
     docs_url="/api/docs",  # Swagger UI path
     redoc_url="/api/redoc",  # Alternative ReDoc UI
+    lifespan=lifespan,
 )
 
+install_sql_instrumentation()
+app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Allow all origins
@@ -26,4 +59,6 @@ app.include_router(courses.router)
 app.include_router(requirements.router)
 app.include_router(departments.router)
 app.include_router(analytics.router)
+app.include_router(instructors.router)
 app.include_router(upload.router)
+app.include_router(metrics.router)
@@ -0,0 +1,300 @@
+"""
+This module collects per-route request metrics and renders them in the Prometheus
+text exposition format (served at /metrics by routers/metrics.py).
+
+- `MetricsMiddleware` (pure ASGI) times every request and measures its response size.
+- SQLAlchemy cursor events, registered for every engine by `install_sql_instrumentation`,
+  count the statements of the current request and their time. SQLite connections get
+  a cursor that counts the rows fetched.
+- Per-request counters live in a ContextVar, so statements run on other threads are
+  attributed correctly as long as the context is copied there (run_in_threadpool and
+  the read executor do).
+
+Route labels use the route template (e.g. /courses/{course_code}), not the raw path.
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from backend.services.analytics import analytics_cache
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 500, 1000)
+
+# caches whose hit ratio is exported, by label
+CACHES = {"analytics": analytics_cache}
+
+
+@dataclass(slots=True)
+class RequestStats:
+    """SQL work done on behalf of one request."""
+    statements: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket upper bounds."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Records one observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+@dataclass
+class RouteMetrics:
+    """Everything recorded for one (method, route)."""
+    latency: Histogram
+    statements: Histogram
+    responses: Dict[int, int]
+    db_seconds: float = 0.0
+    rows: int = 0
+    response_bytes: int = 0
+
+
+class MetricsRegistry:
+    """Thread-safe store of the per-route metrics."""
+
+    def __init__(self):
+        self._routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, route: str, status: int, seconds: float,
+               response_bytes: int, stats: RequestStats) -> None:
+        """Adds one finished request."""
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = RouteMetrics(Histogram(LATENCY_BUCKETS),
+                                       Histogram(STATEMENT_BUCKETS), {})
+                self._routes[(method, route)] = metrics
+            metrics.latency.observe(seconds)
+            metrics.statements.observe(stats.statements)
+            metrics.responses[status] = metrics.responses.get(status, 0) + 1
+            metrics.db_seconds += stats.db_seconds
+            metrics.rows += stats.rows
+            metrics.response_bytes += response_bytes
+
+    def snapshot(self) -> Dict[Tuple[str, str], RouteMetrics]:
+        """Returns a consistent copy of the per-route metrics."""
+        with self._lock:
+            return {
+                key: RouteMetrics(_copy_histogram(m.latency), _copy_histogram(m.statements),
+                                  dict(m.responses), m.db_seconds, m.rows, m.response_bytes)
+                for key, m in self._routes.items()
+            }
+
+    def reset(self) -> None:
+        """Forgets everything recorded so far."""
+        with self._lock:
+            self._routes.clear()
+
+
+def _copy_histogram(histogram: Histogram) -> Histogram:
+    copy = Histogram(histogram.buckets)
+    copy.counts, copy.total, copy.count = list(histogram.counts), histogram.total, histogram.count
+    return copy
+
+
+registry = MetricsRegistry()
+
+
+# --- SQL instrumentation ---
+
+class _RowCountingCursor(sqlite3.Cursor):
+    """Counts the rows fetched for the current request."""
+
+    def _count(self, rows: int) -> None:
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.rows += rows
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            self._count(1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = super().fetchmany(*args, **kwargs)
+        self._count(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self._count(len(rows))
+        return rows
+
+
+class _RowCountingConnection(sqlite3.Connection):
+    def cursor(self, factory=_RowCountingCursor):  # pylint: disable=arguments-differ
+        return super().cursor(factory)
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany):
+    stats = _current_stats.get()
+    if stats is not None and conn.info.get("query_start"):
+        stats.statements += 1
+        stats.db_seconds += time.perf_counter() - conn.info["query_start"].pop()
+
+
+def _use_row_counting_connection(dialect, _conn_rec, _cargs, cparams):
+    if dialect.name == "sqlite":
+        cparams.setdefault("factory", _RowCountingConnection)
+
+
+_installed = False
+
+
+def install_sql_instrumentation() -> None:
+    """Registers the statement hooks for every engine (idempotent)."""
+    global _installed  # pylint: disable=global-statement
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "do_connect", _use_row_counting_connection)
+    _installed = True
+
+
+# --- request instrumentation ---
+
+class MetricsMiddleware:
+    """Records latency, SQL work and response size of each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        status, response_bytes = 500, 0
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_stats.reset(token)
+            route = scope.get("route")
+            registry.record(scope["method"], getattr(route, "path", "unmatched"), status,
+                            elapsed, response_bytes, stats)
+
+
+# --- exposition ---
+
+def _process_memory_bytes() -> int:
+    """Current resident memory from /proc where available, else the peak (getrusage)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource  # pylint: disable=import-outside-toplevel
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and KiB elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _render_histogram(lines: list, name: str, histogram: Histogram, **labels) -> None:
+    cumulative = 0
+    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+        cumulative += count
+        le = "+Inf" if bound == float("inf") else repr(float(bound))
+        lines.append(f"{name}_bucket{_labels(**labels, le=le)} {cumulative}")
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.total}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+
+def render_metrics() -> str:
+    """Renders all metrics in the Prometheus text format (version 0.0.4)."""
+    routes = sorted(registry.snapshot().items())
+    lines = []
+
+    def header(name: str, kind: str, description: str):
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    header("http_requests_total", "counter", "HTTP requests by route and status.")
+    for (method, route), m in routes:
+        for status, count in sorted(m.responses.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)}"
+                         f" {count}")
+
+    header("http_request_duration_seconds", "histogram", "HTTP request latency.")
+    for (method, route), m in routes:
+        _render_histogram(lines, "http_request_duration_seconds", m.latency,
+                          method=method, route=route)
+
+    header("http_request_sql_statements", "histogram", "SQL statements executed per request.")
+    for (method, route), m in routes:
+        _render_histogram(lines, "http_request_sql_statements", m.statements,
+                          method=method, route=route)
+
+    for name, attr, description in (
+            ("http_request_db_seconds_total", "db_seconds", "Time spent executing SQL."),
+            ("http_request_db_rows_total", "rows", "Rows fetched from the database."),
+            ("http_response_size_bytes_total", "response_bytes", "Response body bytes sent."),
+    ):
+        header(name, "counter", description)
+        for (method, route), m in routes:
+            lines.append(f"{name}{_labels(method=method, route=route)} {getattr(m, attr)}")
+
+    header("cache_requests_total", "counter", "Cache lookups by result.")
+    for cache_name, cache in CACHES.items():
+        lines.append(f"cache_requests_total{_labels(cache=cache_name, result='hit')} {cache.hits}")
+        lines.append(f"cache_requests_total{_labels(cache=cache_name, result='miss')} "
+                     f"{cache.misses}")
+    header("cache_hit_ratio", "gauge", "Share of cache lookups that were hits.")
+    for cache_name, cache in CACHES.items():
+        lookups = cache.hits + cache.misses
+        lines.append(f"cache_hit_ratio{_labels(cache=cache_name)} "
+                     f"{cache.hits / lookups if lookups else 0.0}")
+
+    header("process_resident_memory_bytes", "gauge", "Resident memory of this process.")
+    lines.append(f"process_resident_memory_bytes {_process_memory_bytes()}")
+
+    return "\n".join(lines) + "\n"
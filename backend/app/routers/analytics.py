@@ -2,24 +2,26 @@
 this module defines the API routes for analytics queries.
 """
 
-from typing import Optional
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from backend.database.db import get_db
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from backend.database.read_executor import ReadExecutorService
 from backend.services.analytics import AnalyticsService
-from backend.app.schemas import CourseCoverageResponse, EnrollmentDataResponse
+from backend.app.schemas import (CourseCoverageResponse, EnrollmentDataResponse,
+                                 EnrollmentTotalsResponse, EnrollmentForecastResponse,
+                                 RequirementDemandResponse, RequirementOverlapResponse,
+                                 CoverageGapResponse)
 
 router = APIRouter()
 
-def get_analytics_service(db: Session = Depends(get_db)) -> AnalyticsService:
-    """provides AnalyticsService instance for handling analytics queries."""
-    return AnalyticsService(db)
+def get_analytics_service() -> ReadExecutorService:
+    """provides AnalyticsService, run on the read executor, for handling analytics queries."""
+    return ReadExecutorService(AnalyticsService)
 
 @router.get("/analytics/course-coverage", response_model=CourseCoverageResponse)
-def get_course_coverage(
+async def get_course_coverage(
     major: str,
     semester: Optional[str] = None,
-    analytics_service: AnalyticsService = Depends(get_analytics_service)
+    analytics_service: ReadExecutorService = Depends(get_analytics_service)
 ):
     """
     Get course coverage data: number of courses fulfilling each requirement for a major.
@@ -30,19 +32,140 @@ def get_course_coverage(
     - `/analytics/course-coverage?major=CS`
     - `/analytics/course-coverage?major=BA&semester=F22`
     """
-    return analytics_service.fetch_course_coverage(major, semester)
+    return await analytics_service.fetch_course_coverage(major, semester)
 
 @router.get("/analytics/enrollment-data", response_model=EnrollmentDataResponse)
-def get_enrollment_data(
-    course_code: str,
-    analytics_service: AnalyticsService = Depends(get_analytics_service)
+async def get_enrollment_data(
+    course_code: Optional[str] = None,
+    course_codes: Optional[str] = None,
+    department: Optional[str] = None,
+    analytics_service: ReadExecutorService = Depends(get_analytics_service)
 ):
     """
-    Get past enrollment data for a specific course.
-    - `course_code`: Required, the code of the course.
+    Get past enrollment data for one course, several courses, or a whole department.
+    - `course_code`: the code of a single course.
+    - `course_codes`: comma-separated course codes; all series are returned in one response.
+    - `department`: department code; returns the series of every course in the department.
 
-    Example Request:
-    - `/analytics/enrollment-data?course_code=CS101`
+    Each record of a multi-course response carries its `course_code`.
+
+    Example Requests:
+    - `/analytics/enrollment-data?course_code=15-122`
+    - `/analytics/enrollment-data?course_codes=15-122,15-213`
+    - `/analytics/enrollment-data?department=15`
     """
-    enrollment_data = analytics_service.fetch_enrollment_data(course_code)
+    code_list = [c.strip() for c in course_codes.split(",") if c.strip()] if course_codes else []
+
+    if code_list or department:
+        enrollment_data = await analytics_service.fetch_enrollment_data_for_courses(
+            course_codes=code_list or None, department=department
+        )
+    elif course_code:
+        enrollment_data = await analytics_service.fetch_enrollment_data(course_code)
+    else:
+        raise HTTPException(status_code=400, detail="Provide course_code, course_codes "
+                            "or department")
     return EnrollmentDataResponse(enrollment_data=enrollment_data)
+
+@router.get("/analytics/enrollment-totals", response_model=EnrollmentTotalsResponse)
+async def get_enrollment_totals(
+    group_by: Literal["department", "requirement", "campus"] = "department",
+    semester: Optional[str] = None,
+    campus_id: Optional[int] = None,
+    major: Optional[str] = None,
+    analytics_service: ReadExecutorService = Depends(get_analytics_service)
+):
+    """
+    Get enrollment totals per semester and class, read from the enrollment rollups.
+    - `group_by`: `department` (default), `requirement` or `campus`.
+    - `semester`: Optional, filters by semester.
+    - `campus_id`: Optional, filters by campus (2 = Qatar).
+    - `major`: Optional, restricts requirement totals to one major.
+
+    Example Requests:
+    - `/analytics/enrollment-totals?group_by=department&semester=F24`
+    - `/analytics/enrollment-totals?group_by=requirement&major=cs&campus_id=2`
+    """
+    return await analytics_service.fetch_enrollment_totals(group_by, semester, campus_id, major)
+
+@router.get("/analytics/enrollment-forecast", response_model=EnrollmentForecastResponse)
+async def get_enrollment_forecast(
+    course_code: Optional[str] = None,
+    department: Optional[str] = None,
+    analytics_service: ReadExecutorService = Depends(get_analytics_service)
+):
+    """
+    Get enrollment forecasts for the upcoming semesters of a course or a department.
+    Forecasts (moving average, linear trend and seasonal Fall/Spring models, each with
+    an 80% interval) are computed in batch whenever enrollment data is uploaded.
+    - `course_code` or `department`: Required, one of the two.
+
+    Example Requests:
+    - `/analytics/enrollment-forecast?course_code=15-122`
+    - `/analytics/enrollment-forecast?department=15`
+    """
+    if course_code:
+        return await analytics_service.fetch_enrollment_forecast("course", course_code)
+    if department:
+        return await analytics_service.fetch_enrollment_forecast("department", department)
+    raise HTTPException(status_code=400, detail="Provide course_code or department")
+
+@router.get("/analytics/requirement-demand", response_model=RequirementDemandResponse)
+async def get_requirement_demand(
+    major: Optional[str] = None,
+    class_year: Optional[int] = None,
+    model: Literal["moving_average", "linear_trend", "seasonal"] = "linear_trend",
+    analytics_service: ReadExecutorService = Depends(get_analytics_service)
+):
+    """
+    Get historical and projected seat demand per requirement, for capacity planning.
+    Enrollment in a course counts toward every requirement the course satisfies.
+    - `major`: Optional, restricts to the requirements of one major.
+    - `class_year`: Optional, only counts students of that class year.
+    - `model`: forecast model used for the projection (default `linear_trend`).
+
+    Example Requests:
+    - `/analytics/requirement-demand?major=cs`
+    - `/analytics/requirement-demand?major=ba&class_year=1&model=seasonal`
+    """
+    return await analytics_service.fetch_requirement_demand(major, class_year, model)
+
+@router.get("/analytics/requirement-overlap", response_model=RequirementOverlapResponse)
+async def get_requirement_overlap(
+    major: Optional[str] = None,
+    min_shared: int = 1,
+    analytics_service: ReadExecutorService = Depends(get_analytics_service)
+):
+    """
+    Get, for every pair of requirements, the number of courses counting toward both,
+    their Jaccard similarity and the shared course lists.
+    - `major`: Optional, comma-separated majors; pairs across all majors when omitted.
+    - `min_shared`: Optional, only returns pairs sharing at least this many courses.
+
+    Example Requests:
+    - `/analytics/requirement-overlap?major=cs`
+    - `/analytics/requirement-overlap?major=cs,is&min_shared=5`
+    """
+    majors = [m.strip() for m in major.split(",") if m.strip()] if major else None
+    return await analytics_service.fetch_requirement_overlap(majors, min_shared)
+
+@router.get("/analytics/coverage-gaps", response_model=CoverageGapResponse)
+async def get_coverage_gaps(
+    semester: str,
+    max_courses: int = 0,
+    major: Optional[str] = None,
+    analytics_service: ReadExecutorService = Depends(get_analytics_service)
+):
+    """
+    Get the requirements of each major offered by at most `max_courses` Qatar courses
+    in a semester, with the nearest semesters in which they were covered.
+    - `semester`: Required, e.g. `F24`.
+    - `max_courses`: Optional, defaults to 0 (requirements with no Qatar course).
+    - `major`: Optional, comma-separated majors; all majors when omitted.
+
+    Example Requests:
+    - `/analytics/coverage-gaps?semester=F25`
+    - `/analytics/coverage-gaps?semester=S25&max_courses=2&major=cs,is`
+    """
+    majors = [m.strip() for m in major.split(",") if m.strip()] if major else None
+    return await analytics_service.fetch_coverage_gaps(semester, max_courses, majors)
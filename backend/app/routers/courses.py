@@ -5,30 +5,29 @@ filtering courses based on department and requirements, and integrating with
 the service layer for business logic.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from backend.database.db import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response
+from backend.database.read_executor import ReadExecutorService
 from backend.services.courses import CourseService
 from backend.app.schemas import (CourseResponse, CourseListResponse,
                                  CombinedCourseFilter)
 
 router = APIRouter()
 
-def get_course_service(db: Session = Depends(get_db)) -> CourseService:
+def get_course_service() -> ReadExecutorService:
     """
-    Provides a CourseService instance for handling course-related operations.
+    Provides CourseService, run on the read executor, for handling course-related operations.
     """
-    return CourseService(db)
+    return ReadExecutorService(CourseService)
 
 @router.get("/courses/search", response_model=CourseListResponse)
-def search_courses(
+async def search_courses(
     filters: CombinedCourseFilter = Depends(),
-    course_service: CourseService = Depends(get_course_service)
+    course_service: ReadExecutorService = Depends(get_course_service)
 ):
     """
     fetch courses based on a combination of filters.
     """
-    courses = course_service.fetch_courses_by_filters(
+    courses = await course_service.fetch_courses_by_filters(
         department=filters.department,
         semester=filters.semester,
         has_prereqs=filters.has_prereqs,
@@ -47,20 +46,26 @@ def search_courses(
     return courses
 
 @router.get("/courses/semesters")
-def get_all_semesters(course_service: CourseService = Depends(get_course_service)):
+async def get_all_semesters(
+    course_service: ReadExecutorService = Depends(get_course_service)
+):
     """
-    Endpoint to retrieve a list of all semesters (from the Offerings table).
+    Endpoint to retrieve a list of all semesters (from the Offerings table),
+    served from the pre-serialized reference data snapshot.
     """
-    semesters = course_service.fetch_all_semesters()
-    return {"semesters": semesters}
+    return Response(content=await course_service.fetch_all_semesters_json(),
+                    media_type="application/json")
 
 
 @router.get("/courses/{course_code}", response_model=CourseResponse)
-def get_course(course_code: str, course_service: CourseService = Depends(get_course_service)):
+async def get_course(
+    course_code: str,
+    course_service: ReadExecutorService = Depends(get_course_service)
+):
     """
     fetch course details by course code.
     """
-    course = course_service.fetch_course_by_code(course_code)
+    course = await course_service.fetch_course_by_code(course_code)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     return course
@@ -1,20 +1,23 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from backend.database.db import get_db
+from fastapi import APIRouter, Depends, Response
+from backend.database.read_executor import ReadExecutorService
 from backend.services.departments import DepartmentService
 from backend.app.schemas import DepartmentListResponse
 
 router = APIRouter()
 
-def get_department_service(db: Session = Depends(get_db)) -> DepartmentService:
+def get_department_service() -> ReadExecutorService:
     """
-    Provides a DepartmentService instance for handling department-related operations.
+    Provides DepartmentService, run on the read executor, for department-related operations.
     """
-    return DepartmentService(db)
+    return ReadExecutorService(DepartmentService)
 
 @router.get("/departments", response_model=DepartmentListResponse)
-def get_departments(department_service: DepartmentService = Depends(get_department_service)):
+async def get_departments(
+    department_service: ReadExecutorService = Depends(get_department_service)
+):
     """
     API route to fetch all available departments with their names.
+    Served from the pre-serialized reference data snapshot.
     """
-    return department_service.fetch_all_departments()
+    return Response(content=await department_service.fetch_all_departments_json(),
+                    media_type="application/json")
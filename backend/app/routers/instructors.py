@@ -0,0 +1,42 @@
+"""
+This script defines API endpoints for instructor teaching-load analytics.
+"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from backend.database.read_executor import ReadExecutorService
+from backend.services.instructors import InstructorService
+from backend.app.schemas import InstructorListResponse, InstructorDetailResponse
+
+router = APIRouter()
+
+def get_instructor_service() -> ReadExecutorService:
+    """
+    Provides InstructorService, run on the read executor, for handling instructor analytics.
+    """
+    return ReadExecutorService(InstructorService)
+
+@router.get("/analytics/instructors", response_model=InstructorListResponse)
+async def get_instructors(
+    department: Optional[str] = None,
+    instructor_service: ReadExecutorService = Depends(get_instructor_service)
+):
+    """
+    Get every instructor with the number of courses they teach.
+    - `department`: Optional, only counts courses of this department (e.g. `15`).
+    """
+    return await instructor_service.fetch_instructors(department)
+
+@router.get("/analytics/instructors/{andrew_id}", response_model=InstructorDetailResponse)
+async def get_instructor(
+    andrew_id: str,
+    instructor_service: ReadExecutorService = Depends(get_instructor_service)
+):
+    """
+    Get an instructor's courses, the requirements those courses cover, and the
+    enrollment taught per semester (from aggregates precomputed at upload time).
+    """
+    instructor = await instructor_service.fetch_instructor(andrew_id)
+    if not instructor:
+        raise HTTPException(status_code=404, detail="Instructor not found")
+    return instructor
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+from backend.app.metrics import render_metrics
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """
+    API route exposing the request, SQL, cache and process metrics in the
+    Prometheus text format.
+    """
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -2,21 +2,65 @@
 This script defines API endpoints for requirement-related operations.
 """
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from backend.database.db import get_db
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from backend.database.read_executor import ReadExecutorService
 from backend.services.requirements import RequirementService
-from backend.app.schemas import RequirementsResponse
+from backend.app.schemas import (RequirementsResponse, RequirementTreeResponse,
+                                 RequirementCoursesResponse)
 
 router = APIRouter()
 
-def get_requirement_service(db: Session = Depends(get_db)) -> RequirementService:
+def get_requirement_service() -> ReadExecutorService:
     """
-    Provides a RequirementService instance for handling requirement-related operations.
+    Provides RequirementService, run on the read executor, for requirement-related operations.
     """
-    return RequirementService(db)
+    return ReadExecutorService(RequirementService)
 
 @router.get("/requirements", response_model=RequirementsResponse)
-def get_requirements(requirement_service: RequirementService = Depends(get_requirement_service)):
-    """API route to fetch all course requirements."""
-    return requirement_service.fetch_all_requirements()
+async def get_requirements(
+    requirement_service: ReadExecutorService = Depends(get_requirement_service)
+):
+    """API route to fetch all course requirements (served from the reference data snapshot)."""
+    return Response(content=await requirement_service.fetch_all_requirements_json(),
+                    media_type="application/json")
+
+@router.get("/requirements/tree", response_model=RequirementTreeResponse)
+async def get_requirement_tree(
+    requirement_service: ReadExecutorService = Depends(get_requirement_service)
+):
+    """
+    API route to fetch the requirements of every audit as a tree. Each node carries
+    the number of distinct courses satisfying it and how many are offered in Qatar.
+    """
+    return Response(content=await requirement_service.fetch_requirement_tree_json(),
+                    media_type="application/json")
+
+@router.get("/requirements/{requirement:path}/courses",
+            response_model=RequirementCoursesResponse)
+async def get_requirement_courses(
+    requirement: str,
+    semester: Optional[str] = None,
+    campus_id: Optional[int] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    summary: bool = False,
+    requirement_service: ReadExecutorService = Depends(get_requirement_service)
+):
+    """
+    API route to fetch the courses that count for a requirement, one page at a time.
+    - `requirement`: the full requirement name, e.g. `GenEd---Humanities/Arts Electives`.
+    - `semester` / `campus_id`: only courses offered in that semester / on that campus.
+    - `summary`: return only code, name, department and units.
+
+    Example Requests:
+    - `/requirements/GenEd---Humanities%2FArts Electives/courses?page=2&page_size=20`
+    - `/requirements/GenEd---Humanities%2FArts Electives/courses?campus_id=2&summary=true`
+    """
+    result = await requirement_service.fetch_requirement_courses(
+        requirement, semester=semester, campus_id=campus_id, page=page,
+        page_size=page_size, summary=summary
+    )
+    if result is None:
+        raise HTTPException(status_code=404, detail="Requirement not found")
+    return result
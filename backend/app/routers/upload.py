@@ -4,20 +4,28 @@ It handles the upload of department CSV, course ZIP files, audit ZIP files,
 and enrollment Excel file.
 """
 
+import asyncio
+import json
 import shutil
 import os
+import time
 import zipfile
 import logging
 from typing import Optional, List
 from pathlib import Path
 from fastapi import APIRouter, UploadFile, File, HTTPException
-import pandas as pd
-from backend.scripts.course_extractor import CourseDataExtractor
-from backend.scripts.audit_extractor import AuditDataExtractor
-from backend.scripts.enrollment_extractor import EnrollmentDataExtractor
-from backend.database.load_data import load_data_from_dicts
-from backend.database.models import Course
-from backend.database.db import SessionLocal
+from fastapi.responses import StreamingResponse
+from backend.database.snapshots import rollback_snapshot
+from backend.app.utils.jobs import (
+    TERMINAL_STATUSES,
+    JobConflict,
+    JobNotCancellable,
+    cancel_job,
+    discard_job,
+    read_job,
+    reserve_job,
+    submit_job,
+)
 # Import the new file handler utils
 from backend.app.utils.file_handler import (
     save_upload_file,
@@ -31,8 +39,9 @@ from backend.app.utils.file_handler import (
 
 router = APIRouter()
 
-# Set up logging configuration
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# How often the progress stream checks the job's state, and sends a comment when idle
+EVENT_POLL_SECONDS = 0.5
+EVENT_KEEPALIVE_SECONDS = 15.0
 
 # UPLOAD_DIR is now defined in file_handler.py
 # print(f"Using data directory: {UPLOAD_DIR}")
@@ -118,7 +127,8 @@ ALLOWED_AUDIT_MAJORS = {'ba', 'bio', 'cs', 'is'} # Define allowed majors
         "- Audit ZIP files (containing JSON audit data)\n"
         "- Enrollment Excel file"""
     ),
-    response_description="Returns a list of successfully loaded data types"
+    status_code=202,
+    response_description="Returns the id and URLs of the job loading the data"
 )
 async def initialize_database(
     course_zips: Optional[List[UploadFile]] = File(default=None, description="ZIP files containing course JSON data"),
@@ -126,7 +136,18 @@ async def initialize_database(
     enrollment_file: Optional[UploadFile] = File(default=None, description="Excel file containing enrollment data"),
     department_csv: Optional[UploadFile] = File(default=None, description="CSV file containing department data (columns: dep_code, name)")
 ):
-    """Initialize or update the database with uploaded files."""
+    """
+    Save and validate the uploaded files, then queue a job that extracts and loads them
+    (see backend/app/utils/ingestion.py). Returns immediately with the job id; the job's
+    status and progress are served by /upload/jobs/{job_id} and its /events stream.
+    """
+    # one upload at a time: a new upload would overwrite the files a job is reading.
+    # The job is reserved before any file is saved, atomically with the check.
+    try:
+        job_id = reserve_job()
+    except JobConflict as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+
     logging.info("=== Starting Database Initialization Request ===")
 
     prepared_paths = {
@@ -294,121 +315,105 @@ async def initialize_database(
 
     except (HTTPException, ValueError, IOError) as e:
         logging.error("File preparation error: %s", e)
+        discard_job(job_id)
         raise e if isinstance(e, HTTPException) else HTTPException(status_code=400, detail=f"File handling error: {e}") from e
     except Exception as e:
         logging.exception("Unexpected error during file preparation: %s", e)
+        discard_job(job_id)
         raise HTTPException(status_code=500, detail="Internal server error during file handling.")
 
-    # --- 3. Data Extraction and Staged Loading ---
-    loaded_types_display = []
+    # --- 3. Data Extraction and Loading, in the job worker process ---
     try:
-        # Stage 1: Load Departments
-        if upload_content["departments"] and prepared_paths["dept_csv_path"]:
-            logging.info("Processing and loading department CSV...")
-            try:
-                dept_df = pd.read_csv(prepared_paths["dept_csv_path"])
-                if 'dep_code' in dept_df.columns and 'name' in dept_df.columns:
-                    dept_df = dept_df[['name', 'dep_code']].dropna(subset=['dep_code', 'name'])
-                    dept_records = dept_df.to_dict(orient="records")
-                    if dept_records:
-                        load_data_from_dicts({"department": dept_records})
-                        if "departments" not in loaded_types_display: loaded_types_display.append("departments")
-                    else: logging.warning("No department records found in CSV.")
-                else: raise ValueError("Department CSV missing required columns (dep_code, name)")
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Error processing/loading department CSV: {e}")
-
-        # Stage 2: Load Courses
-        course_related_data = {}
-        if upload_content["courses"] and prepared_paths["course_dir"]:
-            logging.info("Processing and loading course data...")
-            try:
-                course_extractor = CourseDataExtractor(folder_path=prepared_paths["course_dir"], base_dir=UPLOAD_DIR)
-                course_extractor.process_all_courses()
-                course_results = course_extractor.get_results()
-                # Extract only course-related tables for immediate loading
-                course_keys = {"course", "instructor", "offering", "prereqs", "course_instructor"}
-                course_related_data = {k: v for k, v in course_results.items() if k in course_keys and v}
-                if course_related_data:
-                    load_data_from_dicts(course_related_data)
-                    if "courses" not in loaded_types_display: loaded_types_display.append("courses")
-                else: logging.warning("Course extractor returned no data to load.")
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Error processing/loading course data: {e}")
-
-        # Stage 3: Fetch Course Codes (NOW courses are loaded)
-        db_course_codes = set()
-        if upload_content["audits"] and prepared_paths["audit_root"]:
-            db = SessionLocal()
-            try:
-                logging.info("Fetching latest course codes for audit processing...")
-                course_results = db.query(Course.course_code).all()
-                db_course_codes = {c[0] for c in course_results}
-                logging.info("Found %d course codes after course load.", len(db_course_codes))
-            except Exception as e:
-                logging.error("DB Error fetching course codes: %s", e)
-                # Potentially raise or allow audit to proceed without codes? For now, let it proceed.
-            finally:
-                db.close()
+        submit_job("backend.app.utils.ingestion:run_ingestion", prepared_paths,
+                   upload_content, job_id=job_id)
+    except BaseException:
+        discard_job(job_id)
+        raise
+    logging.info("=== Upload saved, ingestion queued as job %s ===", job_id)
+    return {
+        "message": "Upload accepted; the data is being loaded.",
+        "job_id": job_id,
+        "status_url": f"/upload/jobs/{job_id}",
+        "events_url": f"/upload/jobs/{job_id}/events",
+    }
 
-        # Stage 4: Load Audits
-        if upload_content["audits"] and prepared_paths["audit_root"]:
-            logging.info("Processing and loading audit data...")
-            if not db_course_codes:
-                 logging.warning("Proceeding with audit processing, but no course codes were found in DB. 'countsfor' links may be incomplete.")
-            try:
-                audit_base_path = prepared_paths["audit_root"]
-                logging.info(f"Calling AuditDataExtractor with base_path: {audit_base_path} and {len(db_course_codes)} course codes.") # Log input
-                audit_extractor = AuditDataExtractor(audit_base_path=audit_base_path)
-                audit_results = audit_extractor.get_results(db_course_codes=db_course_codes)
-
-                # Log output of the extractor
-                log_audit_counts = {k: len(v) for k, v in audit_results.items()} if audit_results else {}
-                logging.info(f"AuditDataExtractor returned: {log_audit_counts}")
-
-                # Extract only audit-related tables
-                audit_keys = {"audit", "requirement", "countsfor"}
-                audit_related_data = {k: v for k, v in audit_results.items() if k in audit_keys and v}
-
-                # Log data being sent to load_data_from_dicts
-                log_audit_load_counts = {k: len(v) for k, v in audit_related_data.items()} if audit_related_data else {}
-                logging.info(f"Preparing to load audit data: {log_audit_load_counts}")
-
-                if audit_related_data:
-                    load_data_from_dicts(audit_related_data)
-                    if "audits" not in loaded_types_display: loaded_types_display.append("audits")
-                else: logging.warning("Audit extractor returned no data to load.")
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Error processing/loading audit data: {e}")
-
-        # Stage 5: Load Enrollment
-        if upload_content["enrollment"] and prepared_paths["enrollment_excel_path"]:
-            logging.info("Processing and loading enrollment file...")
-            try:
-                enrollment_df = pd.read_excel(prepared_paths["enrollment_excel_path"])
-                enrollment_extractor = EnrollmentDataExtractor()
-                enrollment_records = enrollment_extractor.process_enrollment_dataframe(enrollment_df)
-                if enrollment_records:
-                    # _ensure_offerings_exist is called within load_data_from_dicts now
-                    load_data_from_dicts({"enrollment": enrollment_records})
-                    if "enrollment" not in loaded_types_display: loaded_types_display.append("enrollment")
-                else:
-                    logging.warning("No valid enrollment records extracted from Excel.")
-            except Exception as e:
-                # ... (error handling as before) ...
-                raise HTTPException(status_code=400, detail=f"Error processing/loading enrollment file: {e}")
-
-
-    except HTTPException as e:
-         logging.error("Data processing/loading error: %s (Detail: %s)", e.status_code, e.detail)
-         raise e
-    except Exception as e:
-        logging.exception("Unexpected error during staged data loading: %s", e)
-        raise HTTPException(status_code=500, detail="Internal server error during data loading.")
+@router.get(
+    "/upload/jobs/{job_id}",
+    summary="Get an Upload Job",
+    response_description="Returns the status, per-stage timings, progress and result of the job"
+)
+def get_upload_job(job_id: str):
+    """Return the state of an ingestion job."""
+    state = read_job(job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return state
+
+async def _job_events(job_id: str, state: dict):
+    """Yields an SSE `status` event whenever the job's state changes, until it finishes."""
+    last_sent = time.monotonic()
+    yield f"event: status\ndata: {json.dumps(state)}\n\n"
+    while state["status"] not in TERMINAL_STATUSES:
+        await asyncio.sleep(EVENT_POLL_SECONDS)
+        current = read_job(job_id)
+        if current is None:  # removed meanwhile
+            return
+        if current != state:
+            state = current
+            yield f"event: status\ndata: {json.dumps(state)}\n\n"
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= EVENT_KEEPALIVE_SECONDS:
+            # keeps proxies from closing an idle stream
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+
+@router.get(
+    "/upload/jobs/{job_id}/events",
+    summary="Stream Upload Job Progress",
+    response_description="Server-Sent Events: a `status` event with the job state on every change"
+)
+async def stream_upload_job(job_id: str):
+    """Stream the state of an ingestion job as Server-Sent Events until it finishes."""
+    state = read_job(job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return StreamingResponse(_job_events(job_id, state), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.post(
+    "/upload/jobs/{job_id}/cancel",
+    summary="Cancel an Upload Job",
+    response_description="Returns the state of the job"
+)
+def cancel_upload_job(job_id: str):
+    """
+    Cancel an ingestion job. A queued job is dropped; a running one stops at its next
+    check and discards the data it loaded, leaving the live database untouched. A job
+    that already started publishing its upload can no longer be cancelled (409).
+    """
+    try:
+        state = cancel_job(job_id)
+    except JobNotCancellable as e:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is already publishing "
+                                                    "its upload; too late to cancel") from e
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if state["status"] in TERMINAL_STATUSES and state["status"] != "cancelled":
+        raise HTTPException(status_code=409, detail=f"Job {job_id} already {state['status']}")
+    return state
 
-    final_message = f"Successfully loaded: {', '.join(loaded_types_display)}" if loaded_types_display else "No data was processed or loaded."
-    logging.info("=== Finished Database Initialization Request: %s ===", final_message)
-    return {"message": final_message, "loaded_data": loaded_types_display}
+@router.post(
+    "/upload/rollback/",
+    summary="Roll Back the Last Upload",
+    response_description="Returns the database snapshot now being served"
+)
+def rollback_database():
+    """Switch back to the database snapshot that was live before the last upload."""
+    try:
+        snapshot = rollback_snapshot()
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    return {"message": f"Rolled back to {snapshot}", "snapshot": snapshot}
 
 # Removed clear_existing_department_data, clear_existing_course_data, clear_existing_audit_data
 # Use clear_existing_data(folders) instead
@@ -3,7 +3,7 @@ this script contains data models used for API input validation and response seri
 ensuring type safety and structure for course-related operations.
 """
 
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Union
 from pydantic import BaseModel, Field
 
 class CourseFilter(BaseModel):
@@ -49,6 +49,52 @@ class RequirementsResponse(BaseModel):
     """Pydantic schema for returning a list of requirements."""
     requirements: List[RequirementResponse]
 
+class RequirementTreeNode(BaseModel):
+    """A requirement or requirement group in an audit's requirement tree."""
+    name: str
+    path: str
+    is_requirement: bool
+    num_courses: int
+    num_qatar_courses: int
+    children: List["RequirementTreeNode"]
+
+class RequirementTreeAudit(BaseModel):
+    """The root of one audit's requirement tree."""
+    audit_id: str
+    name: str
+    major: Optional[str] = None
+    type: bool
+    num_courses: int
+    num_qatar_courses: int
+    children: List[RequirementTreeNode]
+
+class RequirementTreeResponse(BaseModel):
+    """Pydantic schema for the requirement trees of every audit."""
+    audits: List[RequirementTreeAudit]
+
+class RequirementCourseSummary(BaseModel):
+    """Summary projection of a course satisfying a requirement."""
+    course_code: str
+    course_name: Optional[str] = None
+    department: Optional[str] = None
+    units: Optional[int] = None
+
+class RequirementCourseDetail(RequirementCourseSummary):
+    """Full projection of a course satisfying a requirement."""
+    description: Optional[str] = None
+    prerequisites: Optional[str] = "None"
+    offered: List[str]
+    offered_qatar: Optional[bool] = None
+    offered_pitts: Optional[bool] = None
+
+class RequirementCoursesResponse(BaseModel):
+    """Pydantic schema for one page of the courses satisfying a requirement."""
+    requirement: str
+    total: int
+    page: int
+    page_size: int
+    courses: List[Union[RequirementCourseDetail, RequirementCourseSummary]]
+
 class DepartmentResponse(BaseModel):
     """Pydantic schema for a single department."""
     dep_code: str
@@ -88,6 +134,7 @@ class CombinedCourseFilter(BaseModel):
 
 class EnrollmentDataItem(BaseModel):
     """Schema for individual enrollment data."""
+    course_code: Optional[str] = None  # Set only for multi-course requests
     semester: str
     enrollment_count: int
     class_: int
@@ -95,3 +142,125 @@ class EnrollmentDataItem(BaseModel):
 class EnrollmentDataResponse(BaseModel):
     """Schema for enrollment data response."""
     enrollment_data: List[EnrollmentDataItem]
+
+class EnrollmentTotalItem(BaseModel):
+    """Schema for an enrollment total of one group in one semester and class."""
+    group: str
+    semester: str
+    class_: int
+    enrollment_count: int
+
+class EnrollmentTotalsResponse(BaseModel):
+    """Schema for enrollment totals read from the rollup tables."""
+    group_by: str
+    totals: List[EnrollmentTotalItem]
+
+class EnrollmentForecastItem(BaseModel):
+    """Schema for one model's forecast of one upcoming semester."""
+    semester: str
+    model: str
+    forecast: float
+    lower: float
+    upper: float
+    num_observations: int
+
+class EnrollmentForecastResponse(BaseModel):
+    """Schema for the enrollment forecasts of a course or department."""
+    scope: str
+    key: str
+    forecasts: List[EnrollmentForecastItem]
+
+class RequirementDemandPoint(BaseModel):
+    """Schema for the seat demand of a requirement in one semester."""
+    semester: str
+    demand: float
+    lower: Optional[float] = None
+    upper: Optional[float] = None
+
+class RequirementDemandItem(BaseModel):
+    """Schema for the historical and projected seat demand of one requirement."""
+    requirement: str
+    major: str
+    history: List[RequirementDemandPoint]
+    projection: List[RequirementDemandPoint]
+
+class RequirementDemandResponse(BaseModel):
+    """Schema for requirement-level seat demand."""
+    major: Optional[str] = None
+    class_year: Optional[int] = None
+    model: str
+    demand: List[RequirementDemandItem]
+
+class RequirementSizeItem(BaseModel):
+    """Schema for the number of courses counting toward a requirement."""
+    requirement: str
+    major: str
+    num_courses: int
+
+class RequirementOverlapItem(BaseModel):
+    """Schema for the courses shared by a pair of requirements."""
+    requirement_a: str
+    requirement_b: str
+    major_a: str
+    major_b: str
+    shared_count: int
+    jaccard: float
+    shared_courses: List[str]
+
+class RequirementOverlapResponse(BaseModel):
+    """Schema for the requirement overlap matrix (non-empty pairs only)."""
+    majors: Optional[List[str]] = None
+    requirements: List[RequirementSizeItem]
+    overlaps: List[RequirementOverlapItem]
+
+class InstructorSummary(BaseModel):
+    """Schema for an instructor and the number of courses they teach."""
+    andrew_id: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    num_courses: int
+
+class InstructorListResponse(BaseModel):
+    """Schema for a list of instructors."""
+    instructors: List[InstructorSummary]
+
+class InstructorCourseItem(BaseModel):
+    """Schema for a course taught by an instructor."""
+    course_code: str
+    course_name: Optional[str] = None
+
+class InstructorRequirementItem(BaseModel):
+    """Schema for a requirement covered by an instructor's courses."""
+    requirement: str
+    major: str
+    num_courses: int
+
+class InstructorLoadItem(BaseModel):
+    """Schema for an instructor's teaching load in one semester."""
+    semester: str
+    num_courses: int
+    enrollment_count: int
+
+class InstructorDetailResponse(BaseModel):
+    """Schema for an instructor's courses, covered requirements and teaching load."""
+    andrew_id: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    courses: List[InstructorCourseItem]
+    requirements: List[InstructorRequirementItem]
+    load: List[InstructorLoadItem]
+
+class CoverageGapItem(BaseModel):
+    """Schema for a requirement with few or no Qatar courses in a semester."""
+    major: str
+    requirement: str
+    num_courses: int
+    courses: List[str]
+    previous_covered: Optional[str] = None
+    next_covered: Optional[str] = None
+
+class CoverageGapResponse(BaseModel):
+    """Schema for the coverage gaps of a semester."""
+    semester: str
+    max_courses: int
+    gaps: List[CoverageGapItem]
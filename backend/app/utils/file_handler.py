@@ -11,11 +11,8 @@ from pathlib import Path
 from typing import IO
 import asyncio
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
+# Created on demand by the upload helpers (they create missing parent directories)
 UPLOAD_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../data"))
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 def find_json_files(directory: str) -> list[str]:
     """Find all JSON files in the given directory and its subdirectories."""
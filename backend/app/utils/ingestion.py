@@ -0,0 +1,138 @@
+"""
+The ingestion job of an upload: extracts the saved upload files and loads them.
+
+Runs in the job worker process (see jobs.py), after `/upload/init-db/` has saved and
+validated the files. All stages load into a staging copy of the database, published
+atomically once every stage succeeded, so readers keep the previous snapshot until
+then and a failed or cancelled job leaves the live data untouched. A record that cannot
+be written only fails itself: the other rows are published and the failed ones are
+reported in the job's diff (`failed` and `errors` per table). With UPLOAD_MAX_FAILED_ROWS
+set, a job with more failed records than that fails instead. A failed commit or any other
+database error fails the job. The tables that changed are then exported to CSV.
+
+Progress: `files_parsed` counts the source files read, `rows_written` the rows
+committed by the loader.
+"""
+
+import logging
+import os
+from typing import Optional
+import pandas as pd
+from backend.app.utils.file_handler import UPLOAD_DIR, find_json_files
+from backend.app.utils.jobs import JobReporter
+from backend.database.load_data import LoadError, load_data_from_dicts, changed_tables
+from backend.database.load_data import tables
+from backend.database.models import Course
+from backend.database.row_hashes import ChunkStats
+from backend.database.snapshots import staging_snapshot
+from backend.database.to_csv import export_changed_tables
+from backend.scripts.audit_extractor import AuditDataExtractor
+from backend.scripts.course_extractor import CourseDataExtractor
+from backend.scripts.enrollment_extractor import EnrollmentDataExtractor
+
+COURSE_TABLES = {"course", "instructor", "offering", "prereqs", "course_instructor"}
+AUDIT_TABLES = {"audit", "requirement", "countsfor"}
+# Failed records tolerated in one upload before the job fails; unset means no limit
+_max_failed_rows = os.getenv("UPLOAD_MAX_FAILED_ROWS")
+MAX_FAILED_ROWS: Optional[int] = int(_max_failed_rows) if _max_failed_rows else None
+
+
+def run_ingestion(reporter: JobReporter, prepared_paths: dict,
+                  upload_content: dict) -> dict:
+    """
+    Extracts and loads the files of an upload (`prepared_paths` and `upload_content` as
+    built by `/upload/init-db/`). Returns the loaded data types and the rows changed per
+    table.
+    """
+    loaded_types = []
+    # Rows inserted, updated, unchanged, deleted and failed per table, over all stages
+    diff_summary = {}
+    modified_tables = set()
+
+    def on_chunk(_table_name: str, chunk: ChunkStats) -> None:
+        reporter.add_progress(rows_written=chunk.written)
+        reporter.check_cancelled()
+
+    def on_file() -> None:
+        reporter.add_progress(files_parsed=1)
+        reporter.check_cancelled()
+
+    def load(data: dict, session_factory, data_type: str) -> None:
+        diffs = load_data_from_dicts(data, session_factory=session_factory, prune=True,
+                                     on_chunk=on_chunk)
+        diff_summary.update({table: diff.summary() for table, diff in diffs.items()})
+        modified_tables.update(changed_tables(diffs))
+        loaded_types.append(data_type)
+        # raising discards the staging snapshot
+        failed = {table: diff["failed"] for table, diff in diff_summary.items() if diff["failed"]}
+        if MAX_FAILED_ROWS is not None and sum(failed.values()) > MAX_FAILED_ROWS:
+            raise LoadError(f"More than {MAX_FAILED_ROWS} records could not be written: "
+                            + ", ".join(f"{count} in {table}"
+                                        for table, count in sorted(failed.items())))
+
+    # a last check for cancellation right before publishing; later cancels are refused
+    with staging_snapshot(before_publish=reporter.begin_publish) as staging:
+        if upload_content["departments"] and prepared_paths["dept_csv_path"]:
+            with reporter.stage("departments"):
+                dept_df = pd.read_csv(prepared_paths["dept_csv_path"])
+                on_file()
+                if 'dep_code' not in dept_df.columns or 'name' not in dept_df.columns:
+                    raise ValueError("Department CSV missing required columns (dep_code, name)")
+                dept_records = dept_df[['name', 'dep_code']].dropna(
+                    subset=['dep_code', 'name']).to_dict(orient="records")
+                if dept_records:
+                    load({"department": dept_records}, staging.session_factory, "departments")
+                else:
+                    logging.warning("No department records found in CSV.")
+
+        if upload_content["courses"] and prepared_paths["course_dir"]:
+            with reporter.stage("courses"):
+                course_extractor = CourseDataExtractor(folder_path=prepared_paths["course_dir"],
+                                                       base_dir=UPLOAD_DIR)
+                course_extractor.process_all_courses(on_file=on_file)
+                course_data = {k: v for k, v in course_extractor.get_results().items()
+                               if k in COURSE_TABLES and v}
+                if course_data:
+                    load(course_data, staging.session_factory, "courses")
+                else:
+                    logging.warning("Course extractor returned no data to load.")
+
+        if upload_content["audits"] and prepared_paths["audit_root"]:
+            with reporter.stage("audits"):
+                # the courses are loaded by now; audits only link to known course codes
+                with staging.session_factory() as db:
+                    db_course_codes = {code for (code,) in db.query(Course.course_code)}
+                if not db_course_codes:
+                    logging.warning("No course codes found in the database; 'countsfor' "
+                                    "links may be incomplete.")
+                audit_extractor = AuditDataExtractor(audit_base_path=prepared_paths["audit_root"])
+                audit_results = audit_extractor.get_results(db_course_codes=db_course_codes)
+                reporter.add_progress(
+                    files_parsed=len(find_json_files(str(prepared_paths["audit_root"]))))
+                audit_data = {k: v for k, v in (audit_results or {}).items()
+                              if k in AUDIT_TABLES and v}
+                if audit_data:
+                    load(audit_data, staging.session_factory, "audits")
+                else:
+                    logging.warning("Audit extractor returned no data to load.")
+
+        if upload_content["enrollment"] and prepared_paths["enrollment_excel_path"]:
+            with reporter.stage("enrollment"):
+                enrollment_df = pd.read_excel(prepared_paths["enrollment_excel_path"])
+                on_file()
+                enrollment_records = EnrollmentDataExtractor().process_enrollment_dataframe(
+                    enrollment_df)
+                if enrollment_records:
+                    load({"enrollment": enrollment_records}, staging.session_factory,
+                         "enrollment")
+                else:
+                    logging.warning("No valid enrollment records extracted from Excel.")
+
+    # the upload is live, so the export can no longer be cancelled
+    with reporter.stage("export", cancellable=False):
+        export_changed_tables(modified_tables, list(tables))
+
+    message = (f"Successfully loaded: {', '.join(loaded_types)}" if loaded_types
+               else "No data was processed or loaded.")
+    logging.info("Ingestion finished: %s", message)
+    return {"message": message, "loaded_data": loaded_types, "diff": diff_summary}
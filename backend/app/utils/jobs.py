@@ -0,0 +1,408 @@
+"""
+Background jobs run in a separate worker process.
+
+An upload only saves and validates its files in the request; the extraction and loading
+run as a job in a worker process, so the API stays responsive and the request returns
+right away with the job id. Jobs run one at a time, in submission order.
+
+The state of a job is a JSON file in JOBS_DIR (`<job_id>.json`), replaced atomically by
+the worker, so every API process can serve the status and the progress stream of any
+job. Cancelling a job that is still queued in this process drops it; otherwise a marker
+file (`<job_id>.cancel`) is created, which the worker checks between stages and after
+every chunk of rows written. Right before publishing its upload, the worker claims the
+same marker file for itself; whichever of the two creates it first wins, so a job is
+either cancelled or published, and a cancel arriving once publishing started is refused.
+
+Only one job may be queued or running at a time. An upload reserves its job (a queued
+state file) before saving its files; the check for an active job and the reservation
+happen under a lock file created with O_EXCL, so concurrent uploads to any API process
+cannot both pass the check.
+"""
+
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from backend.app.utils.file_handler import UPLOAD_DIR
+
+JOBS_DIR = os.getenv("JOBS_DIR", os.path.join(UPLOAD_DIR, "jobs"))
+TERMINAL_STATUSES = {"succeeded", "failed", "cancelled"}
+# Contents of the marker file of a job: its cancellation was requested, or it is publishing
+CANCEL_REQUESTED = "cancel"
+PUBLISHING = "publish"
+# State files of finished jobs beyond the most recent ones are removed
+KEEP_FINISHED_JOBS = 50
+# Progress is written to the state file at most this often (and at every stage change)
+PROGRESS_SAVE_SECONDS = 0.5
+# The reservation lock is held for milliseconds; an older one was left by a process that died
+RESERVATION_LOCK = "reserve.lock"
+RESERVATION_LOCK_STALE_SECONDS = 10.0
+RESERVATION_LOCK_TIMEOUT_SECONDS = 15.0
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_futures: Dict[str, Future] = {}
+
+
+class JobCancelled(Exception):
+    """Raised in the worker when the cancellation of its job was requested."""
+
+
+class JobConflict(Exception):
+    """Raised by reserve_job when another job is still queued or running."""
+
+    def __init__(self, state: dict):
+        super().__init__(f"Upload job {state['job_id']} is still {state['status']}")
+        self.state = state
+
+
+class JobNotCancellable(Exception):
+    """Raised by cancel_job when the job already started publishing its upload."""
+
+    def __init__(self, state: dict):
+        super().__init__(f"Upload job {state['job_id']} is already publishing")
+        self.state = state
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _state_path(jobs_dir: str, job_id: str) -> str:
+    return os.path.join(jobs_dir, f"{job_id}.json")
+
+
+def _cancel_path(jobs_dir: str, job_id: str) -> str:
+    return os.path.join(jobs_dir, f"{job_id}.cancel")
+
+
+def _read_marker(jobs_dir: str, job_id: str) -> Optional[str]:
+    try:
+        with open(_cancel_path(jobs_dir, job_id), encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _claim_marker(jobs_dir: str, job_id: str, value: str) -> str:
+    """
+    Creates the marker file of a job holding `value`, unless it already exists. Returns
+    the value the marker holds. Linking a complete file is atomic, so a concurrent reader
+    never sees an empty marker and only one claim can win.
+    """
+    fd, tmp = tempfile.mkstemp(dir=jobs_dir, prefix=f".{job_id}-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(value)
+        try:
+            os.link(tmp, _cancel_path(jobs_dir, job_id))
+            return value
+        except FileExistsError:
+            return _read_marker(jobs_dir, job_id)
+    finally:
+        os.remove(tmp)
+
+
+def _write_state(jobs_dir: str, state: dict) -> None:
+    """Atomically replaces the state file of a job."""
+    fd, tmp = tempfile.mkstemp(dir=jobs_dir, prefix=f".{state['job_id']}-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, _state_path(jobs_dir, state["job_id"]))
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def read_job(job_id: str, jobs_dir: Optional[str] = None) -> Optional[dict]:
+    """
+    The state of a job, or None if there is no such job. A queued or running job whose
+    process is gone (e.g. the server was restarted) is marked as failed.
+    """
+    jobs_dir = jobs_dir or JOBS_DIR
+    if not job_id.isalnum():  # job ids are hex; never read outside jobs_dir
+        return None
+    try:
+        with open(_state_path(jobs_dir, job_id), encoding="utf-8") as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    if state["status"] not in TERMINAL_STATUSES and not _process_alive(state["pid"]):
+        logging.warning("Job %s was interrupted (process %d is gone)", job_id, state["pid"])
+        state.update(status="failed", error="Interrupted: the process running it exited",
+                     stage=None, finished_at=_now())
+        _write_state(jobs_dir, state)
+    return state
+
+
+class JobReporter:
+    """Records the stages, progress and outcome of a job, in the worker process."""
+
+    def __init__(self, jobs_dir: str, job_id: str):
+        self.jobs_dir = jobs_dir
+        self.job_id = job_id
+        self.state = read_job(job_id, jobs_dir)
+        self._saved_at = 0.0
+
+    def save(self) -> None:
+        """Writes the current state to the job's state file."""
+        _write_state(self.jobs_dir, self.state)
+        self._saved_at = time.monotonic()
+
+    def check_cancelled(self) -> None:
+        """Raises JobCancelled if the job's cancellation was requested."""
+        if _read_marker(self.jobs_dir, self.job_id) not in (None, PUBLISHING):
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+
+    def begin_publish(self) -> None:
+        """
+        Marks the job as publishing, after which it can no longer be cancelled. Raises
+        JobCancelled if its cancellation was requested first.
+        """
+        if _claim_marker(self.jobs_dir, self.job_id, PUBLISHING) != PUBLISHING:
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+        self.state["publishing"] = True
+        self.save()
+
+    @contextmanager
+    def stage(self, name: str, cancellable: bool = True):
+        """Runs the block as the named stage, recording its status and duration."""
+        if cancellable:
+            self.check_cancelled()
+        entry = {"name": name, "status": "running", "seconds": None}
+        self.state["stages"].append(entry)
+        self.state["stage"] = name
+        self.save()
+        started = time.perf_counter()
+        try:
+            yield
+            entry["status"] = "succeeded"
+        except JobCancelled:
+            entry["status"] = "cancelled"
+            raise
+        except BaseException:
+            entry["status"] = "failed"
+            raise
+        finally:
+            entry["seconds"] = round(time.perf_counter() - started, 3)
+            self.save()
+
+    def add_progress(self, **counts: int) -> None:
+        """Adds to the progress counters (e.g. files_parsed, rows_written)."""
+        progress = self.state["progress"]
+        for name, count in counts.items():
+            progress[name] = progress.get(name, 0) + count
+        if time.monotonic() - self._saved_at >= PROGRESS_SAVE_SECONDS:
+            self.save()
+
+
+def run_job(jobs_dir: str, job_id: str, target: str, *args) -> None:
+    """
+    Runs `target` ("module:function", called as function(reporter, *args)) as the job
+    `job_id`, in the worker process. The value it returns is the job's result.
+    """
+    reporter = JobReporter(jobs_dir, job_id)
+    state = reporter.state
+    state.update(status="running", started_at=_now(), pid=os.getpid())
+    try:
+        reporter.check_cancelled()
+        reporter.save()
+        module_name, function_name = target.split(":")
+        function = getattr(importlib.import_module(module_name), function_name)
+        state["result"] = function(reporter, *args)
+        state["status"] = "succeeded"
+    except JobCancelled:
+        logging.info("Job %s cancelled", job_id)
+        state["status"] = "cancelled"
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logging.exception("Job %s failed: %s", job_id, e)
+        state.update(status="failed",
+                     error=f"Error in stage {state['stage']}: {e}" if state["stage"] else str(e))
+    finally:
+        state.update(stage=None, finished_at=_now())
+        reporter.save()
+
+
+def _init_worker() -> None:
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def get_job_executor() -> ProcessPoolExecutor:
+    """Returns the job executor (a single worker process), creating it on first use."""
+    global _executor  # pylint: disable=global-statement
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn: the worker must not inherit the server's threads and engines
+                _executor = ProcessPoolExecutor(
+                    max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker)
+    return _executor
+
+
+def shutdown_job_executor() -> None:
+    """Waits for the running job to finish, drops queued ones and stops the worker."""
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+def _prune_finished_jobs(jobs_dir: str) -> None:
+    states = []
+    for name in os.listdir(jobs_dir):
+        if name.endswith(".json"):
+            state = read_job(name[:-len(".json")], jobs_dir)
+            if state and state["status"] in TERMINAL_STATUSES:
+                states.append(state)
+    states.sort(key=lambda s: s["created_at"], reverse=True)
+    for state in states[KEEP_FINISHED_JOBS:]:
+        for path in (_state_path(jobs_dir, state["job_id"]),
+                     _cancel_path(jobs_dir, state["job_id"])):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _job_done(jobs_dir: str, job_id: str, future: Future) -> None:
+    _futures.pop(job_id, None)
+    state = read_job(job_id, jobs_dir)
+    if state is None or state["status"] in TERMINAL_STATUSES:
+        return
+    # dropped before it started (shutdown), or the worker process died (e.g. killed)
+    # without recording the outcome
+    if future.cancelled():
+        state.update(status="cancelled")
+    else:
+        state.update(status="failed", error=f"Worker process failed: {future.exception()}")
+    state.update(stage=None, finished_at=_now())
+    _write_state(jobs_dir, state)
+
+
+def _new_job(jobs_dir: str) -> str:
+    _prune_finished_jobs(jobs_dir)
+    job_id = uuid.uuid4().hex
+    _write_state(jobs_dir, {
+        "job_id": job_id, "status": "queued", "pid": os.getpid(), "created_at": _now(),
+        "started_at": None, "finished_at": None, "stage": None, "stages": [], "progress": {},
+        "publishing": False, "result": None, "error": None,
+    })
+    return job_id
+
+
+@contextmanager
+def _reservation_lock(jobs_dir: str):
+    """Holds the reservation lock of jobs_dir, shared by every process using it."""
+    path = os.path.join(jobs_dir, RESERVATION_LOCK)
+    deadline = time.monotonic() + RESERVATION_LOCK_TIMEOUT_SECONDS
+    while True:
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > RESERVATION_LOCK_STALE_SECONDS:
+                    logging.warning("Removing the stale job reservation lock %s", path)
+                    os.remove(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for the job reservation lock {path}")
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        os.remove(path)
+
+
+def reserve_job(jobs_dir: Optional[str] = None) -> str:
+    """
+    Records a new queued job, to be started with submit_job(..., job_id=...), unless
+    another job is queued or running (JobConflict). Returns the job id.
+    """
+    jobs_dir = jobs_dir or JOBS_DIR
+    os.makedirs(jobs_dir, exist_ok=True)
+    with _reservation_lock(jobs_dir):
+        running = active_job(jobs_dir)
+        if running is not None:
+            raise JobConflict(running)
+        return _new_job(jobs_dir)
+
+
+def discard_job(job_id: str, jobs_dir: Optional[str] = None) -> None:
+    """Removes a reserved job that will not be submitted (e.g. its upload was invalid)."""
+    jobs_dir = jobs_dir or JOBS_DIR
+    if job_id not in _futures and os.path.exists(_state_path(jobs_dir, job_id)):
+        os.remove(_state_path(jobs_dir, job_id))
+
+
+def submit_job(target: str, *args, jobs_dir: Optional[str] = None,
+               job_id: Optional[str] = None) -> str:
+    """
+    Queues `target` (see run_job) with `args` on the job executor, as the job reserved
+    with reserve_job or as a new one. Returns the job id.
+    """
+    jobs_dir = jobs_dir or JOBS_DIR
+    os.makedirs(jobs_dir, exist_ok=True)
+    job_id = job_id or _new_job(jobs_dir)
+    future = get_job_executor().submit(run_job, jobs_dir, job_id, target, *args)
+    _futures[job_id] = future
+    future.add_done_callback(lambda f: _job_done(jobs_dir, job_id, f))
+    logging.info("Queued job %s (%s)", job_id, target)
+    return job_id
+
+
+def cancel_job(job_id: str, jobs_dir: Optional[str] = None) -> Optional[dict]:
+    """
+    Requests the cancellation of a job. Returns its state (unchanged if it already
+    finished, "cancelled" if it was still queued here), or None if there is no such job.
+    A running job stops at its next check and discards what it loaded; one that already
+    started publishing cannot be cancelled (JobNotCancellable).
+    """
+    jobs_dir = jobs_dir or JOBS_DIR
+    state = read_job(job_id, jobs_dir)
+    if state is None or state["status"] in TERMINAL_STATUSES:
+        return state
+    if _claim_marker(jobs_dir, job_id, CANCEL_REQUESTED) == PUBLISHING:
+        raise JobNotCancellable(state)
+    future = _futures.get(job_id)
+    if future is not None and future.cancel():
+        return read_job(job_id, jobs_dir)  # recorded by _job_done
+    return state
+
+
+def active_job(jobs_dir: Optional[str] = None) -> Optional[dict]:
+    """The state of a queued or running job, if any."""
+    jobs_dir = jobs_dir or JOBS_DIR
+    if not os.path.isdir(jobs_dir):
+        return None
+    for name in os.listdir(jobs_dir):
+        if name.endswith(".json"):
+            state = read_job(name[:-len(".json")], jobs_dir)
+            if state and state["status"] not in TERMINAL_STATUSES:
+                return state
+    return None
+
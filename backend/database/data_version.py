@@ -0,0 +1,28 @@
+"""
+This script tracks the version of the data in the database.
+
+Every data load bumps a single counter; caches of derived analytics key their
+entries on it so they are recomputed only after the underlying data changed.
+"""
+
+from datetime import datetime, timezone
+from sqlalchemy.orm import Session
+from .models import DataVersion
+
+
+def get_data_version(db: Session) -> int:
+    """Returns the current data version (0 if nothing was ever loaded)."""
+    version = db.query(DataVersion.version).filter(DataVersion.id == 1).scalar()
+    return version or 0
+
+
+def bump_data_version(db: Session) -> int:
+    """Increments the data version and commits. Returns the new version."""
+    row = db.get(DataVersion, 1)
+    if row is None:
+        row = DataVersion(id=1, version=0)
+        db.add(row)
+    row.version = (row.version or 0) + 1
+    row.updated_at = datetime.now(timezone.utc)
+    db.commit()
+    return row.version
@@ -1,43 +1,263 @@
 """
 this script handles database connection setup and session management.
+
+The engine is configured by a profile selected with the DB_PROFILE environment variable:
+- development (default): statement echo on, SQLite defaults.
+- production: no echo; WAL journaling, synchronous=NORMAL, a sized page cache and
+  memory map, in-memory temp storage and a busy timeout, applied to every new
+  connection through a connect event hook.
+
+Read-only routes use sessions from a separate engine with DB_READ_POOL_SIZE pooled
+connections, additionally put in query_only mode (production profile).
+
+For SQLite, DATABASE_URL names the base database file. Uploads build a new snapshot
+file next to it (see snapshots.py) and record it in a pointer file
+(`<database file>.current`); the engines are bound to the snapshot the pointer names.
+`bind_database` switches the session factories to another file, and every process
+follows pointer changes made by other workers through `sync_database_binding`.
+
+Importing this module does not create any engine: they are created by `init_engines`,
+which the application's lifespan hook calls on startup, or on the first session.
 """
 
 import os
-from sqlalchemy import create_engine
+import json
+import logging
+import threading
+import time
+from typing import Optional
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from backend.database.models import Base
+from backend.database.migrations import run_migrations
 
 # Load database URL (Default: SQLite)
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///backend/database/gened_db.sqlite")
+DB_PROFILE = os.getenv("DB_PROFILE", "development")
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "8"))
+
+PROFILES = {
+    "development": {
+        "echo": True,
+        "pragmas": {},
+        "query_only_reads": False,
+    },
+    "production": {
+        "echo": False,
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -64000,  # negative = KiB, i.e. ~64 MB
+            "mmap_size": 268435456,  # 256 MB
+            "temp_store": "MEMORY",
+            "busy_timeout": 5000,  # ms
+        },
+        "query_only_reads": True,
+    },
+}
+
+
+def create_db_engine(database_url: str = DATABASE_URL, profile: str = DB_PROFILE,
+                     query_only: bool = False, echo: Optional[bool] = None,
+                     pool_size: Optional[int] = None):
+    """
+    Creates an engine for the given profile. For SQLite the profile's pragmas (and
+    query_only, if requested) are set on every new connection. `echo` overrides the
+    profile's statement echo; `pool_size` caps the pooled connections of file databases.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE '{profile}'. Expected one of {list(PROFILES)}")
+    settings = PROFILES[profile]
+
+    is_sqlite = database_url.startswith("sqlite")
+    pool_args = {}
+    if pool_size is not None and database_url not in ("sqlite://", "sqlite:///:memory:"):
+        pool_args = {"pool_size": pool_size, "max_overflow": 0}
+    engine = create_engine(
+        database_url,
+        connect_args={"check_same_thread": False} if is_sqlite else {},
+        echo=settings["echo"] if echo is None else echo,
+        **pool_args,
+    )
+
+    pragmas = dict(settings["pragmas"])
+    if query_only:
+        pragmas["query_only"] = "ON"
+    if is_sqlite and pragmas:
+        @event.listens_for(engine, "connect")
+        def _apply_pragmas(dbapi_connection, _connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    return engine
+
+
+def sqlite_file_path(database_url: str) -> Optional[str]:
+    """Returns the file of a SQLite file URL, or None for other databases and in-memory ones."""
+    if not database_url.startswith("sqlite:///") or database_url == "sqlite:///:memory:":
+        return None
+    return database_url[len("sqlite:///"):]
+
+
+def pointer_file_path(base_url: Optional[str] = None) -> Optional[str]:
+    """Returns the path of the file naming the active snapshot of the base database."""
+    base_path = sqlite_file_path(base_url or DATABASE_URL)
+    return f"{base_path}.current" if base_path else None
+
+
+def read_pointer(base_url: Optional[str] = None) -> dict:
+    """Reads the snapshot pointer ({'current': file name, 'previous': file name})."""
+    pointer = pointer_file_path(base_url)
+    if not pointer or not os.path.exists(pointer):
+        return {}
+    try:
+        with open(pointer, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logging.error("Could not read snapshot pointer %s: %s", pointer, e)
+        return {}
+
+
+def active_database_url(base_url: Optional[str] = None) -> str:
+    """Returns the URL of the snapshot the pointer names, or the base URL without one."""
+    base_url = base_url or DATABASE_URL
+    current = read_pointer(base_url).get("current")
+    if not current:
+        return base_url
+    path = os.path.join(os.path.dirname(sqlite_file_path(base_url)), current)
+    if not os.path.exists(path):
+        logging.error("Snapshot %s named by the pointer is missing; using %s.", path, base_url)
+        return base_url
+    return f"sqlite:///{path}"
+
 
-# Add these lines for debugging
-db_file_path = DATABASE_URL.replace("sqlite:///", "")
-print(f"\n--- !!! BACKEND USING DATABASE FILE: {os.path.abspath(db_file_path)} !!! ---\n")
-# End of added lines
+def _create_engines(database_url: str):
+    return (
+        create_db_engine(database_url, DB_PROFILE),
+        create_db_engine(database_url, DB_PROFILE,
+                         query_only=PROFILES[DB_PROFILE]["query_only_reads"],
+                         pool_size=DB_READ_POOL_SIZE),
+    )
 
-# Create the engine (Enable echo temporarily for debugging)
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False}, echo=True)
 
-# Create a session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+class _LazySessionmaker(sessionmaker):
+    """A sessionmaker that creates the engines on first use."""
+
+    def __call__(self, **local_kw):
+        if engine is None:
+            init_engines()
+        return super().__call__(**local_kw)
+
+
+# Bound by init_engines / bind_database
+bound_database_url: Optional[str] = None
+engine = None
+read_engine = None
+
+# Create the session factories
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+ReadSessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+
+_bind_lock = threading.Lock()
+_init_lock = threading.Lock()
+_pointer_checked_at = 0.0
+POINTER_CHECK_SECONDS = 1.0
+
+
+def init_engines():
+    """Creates the engines for the active database unless they exist. Returns the write engine."""
+    if engine is None:
+        with _init_lock:
+            if engine is None:
+                bind_database(active_database_url())
+                logging.info("Backend using database %s with the '%s' profile.",
+                             bound_database_url, DB_PROFILE)
+    return engine
+
+
+def bind_database(database_url: str):
+    """
+    Points the engines and session factories at another database. Sessions opened
+    before the switch keep their connection to the old database until they close.
+    Returns the old (engine, read_engine) so the caller can drain and dispose them.
+    """
+    global engine, read_engine, bound_database_url  # pylint: disable=global-statement
+    new_engine, new_read_engine = _create_engines(database_url)
+    with _bind_lock:
+        old_engines = (engine, read_engine)
+        engine, read_engine = new_engine, new_read_engine
+        SessionLocal.configure(bind=engine)
+        ReadSessionLocal.configure(bind=read_engine)
+        bound_database_url = database_url
+    logging.info("Database switched to %s.", database_url)
+    return old_engines
+
+
+def drain_engines(engines, timeout: float = 30.0) -> None:
+    """Waits until the engines have no checked-out connections (or timeout), then disposes them."""
+    deadline = time.monotonic() + timeout
+    for old_engine in engines:
+        if old_engine is None:
+            continue
+        checkedout = getattr(old_engine.pool, "checkedout", lambda: 0)
+        while checkedout() > 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        old_engine.dispose()
+
+
+def sync_database_binding() -> None:
+    """
+    Rebinds to the snapshot named by the pointer if another process switched it.
+    The pointer is checked at most every POINTER_CHECK_SECONDS.
+    """
+    global _pointer_checked_at  # pylint: disable=global-statement
+    if engine is None:
+        init_engines()
+        return
+    now = time.monotonic()
+    if now - _pointer_checked_at < POINTER_CHECK_SECONDS:
+        return
+    _pointer_checked_at = now
+    database_url = active_database_url()
+    if database_url != bound_database_url:
+        old_engines = bind_database(database_url)
+        threading.Thread(target=drain_engines, args=(old_engines,), daemon=True).start()
+
 
 def get_db():
     """Provides a database session dependency for FastAPI."""
+    sync_database_binding()
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
+def get_read_db():
+    """Provides a read-only database session dependency for FastAPI read routes."""
+    sync_database_binding()
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
 def init_db():
-    """Creates all database tables based on SQLAlchemy models."""
+    """Creates all database tables based on SQLAlchemy models and applies pending migrations."""
+    init_engines()
     Base.metadata.create_all(engine)
+    # create_all skips changes to tables that already exist; migrations bring them up to date
+    run_migrations(engine)
     print("✅ Database tables created successfully.")
 
 def reset_db():
     """Drops all tables and recreates them."""
+    init_engines()
     Base.metadata.drop_all(engine)
     print("🗑️  All tables dropped.")
 
     Base.metadata.create_all(engine)
+    run_migrations(engine)
     print("✅ Database reset and tables recreated.")
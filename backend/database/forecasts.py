@@ -0,0 +1,234 @@
+"""
+This script builds the enrollment forecasts served by the analytics endpoints.
+
+After each enrollment upload the whole enrollment history is pivoted into a
+(series x semester) matrix and three simple models are fitted to every course and
+department at once with vectorized NumPy:
+
+- moving_average: mean of the last few semesters,
+- linear_trend: least-squares line over the whole history,
+- seasonal: mean of the last few semesters of the same term (Fall/Spring).
+
+Forecasts and 80% intervals for the upcoming semesters are stored in the
+enrollment_forecast table, so reads are a single indexed lookup.
+Only Fall and Spring semesters are modelled; summer terms are ignored.
+"""
+
+import logging
+from typing import Optional
+import numpy as np
+from sqlalchemy import delete, func, insert
+from sqlalchemy.orm import Session
+from .models import Course, Enrollment, EnrollmentForecast, Offering
+
+TERM_ORDER = {"S": 0, "F": 1}
+FORECAST_HORIZON = 2
+MOVING_AVERAGE_WINDOW = 4
+SEASONAL_WINDOW = 3
+Z_SCORE = 1.2816  # two-sided 80% interval
+
+
+def semester_index(semester: str) -> Optional[int]:
+    """Maps a semester code like 'F23' to a position on the Spring/Fall timeline."""
+    if not semester or len(semester) < 2:
+        return None
+    term, year = semester[0].upper(), semester[1:]
+    if term not in TERM_ORDER or not year.isdigit():
+        return None
+    return (2000 + int(year)) * 2 + TERM_ORDER[term]
+
+
+def semester_sort_key(semester: str):
+    """Chronological sort key for any semester code (Spring < Summer < Fall)."""
+    year = semester[1:] if semester else ""
+    term_rank = {"S": 0, "M": 1, "F": 2}.get(semester[:1].upper(), 3) if semester else 3
+    return (int(year) if year.isdigit() else 0, term_rank)
+
+
+def semester_label(index: int) -> str:
+    """Inverse of semester_index."""
+    year, term = divmod(index, 2)
+    return f"{'SF'[term]}{year % 100:02d}"
+
+
+def _masked_mean_std(window: np.ndarray):
+    """Row-wise mean, sample std and count of the non-NaN entries of a 2D array."""
+    mask = ~np.isnan(window)
+    count = mask.sum(axis=1)
+    safe = np.maximum(count, 1)
+    mean = np.where(mask, window, 0.0).sum(axis=1) / safe
+    sq_dev = np.where(mask, (window - mean[:, None]) ** 2, 0.0).sum(axis=1)
+    std = np.sqrt(sq_dev / np.maximum(count - 1, 1))
+    mean = np.where(count > 0, mean, np.nan)
+    return mean, std, count
+
+
+def _moving_average(values: np.ndarray, horizon: int):
+    mean, std, count = _masked_mean_std(values[:, -MOVING_AVERAGE_WINDOW:])
+    spread = Z_SCORE * std * np.sqrt(1 + 1 / np.maximum(count, 1))
+    forecast = np.repeat(mean[:, None], horizon, axis=1)
+    spread = np.repeat(spread[:, None], horizon, axis=1)
+    return forecast, spread, count
+
+
+def _linear_trend(values: np.ndarray, horizon: int):
+    periods = values.shape[1]
+    t = np.arange(periods, dtype=float)
+    mask = ~np.isnan(values)
+    filled = np.where(mask, values, 0.0)
+    count = mask.sum(axis=1)
+    safe = np.maximum(count, 1)
+
+    t_mean = (mask * t).sum(axis=1) / safe
+    y_mean = filled.sum(axis=1) / safe
+    t_dev = np.where(mask, t - t_mean[:, None], 0.0)
+    sxx = (t_dev ** 2).sum(axis=1)
+    sxy = (t_dev * np.where(mask, filled - y_mean[:, None], 0.0)).sum(axis=1)
+    slope = np.divide(sxy, sxx, out=np.zeros_like(sxy), where=sxx > 0)
+    intercept = y_mean - slope * t_mean
+
+    residuals = np.where(mask, filled - (intercept[:, None] + slope[:, None] * t), 0.0)
+    sigma = np.sqrt((residuals ** 2).sum(axis=1) / np.maximum(count - 2, 1))
+
+    future_t = periods - 1 + np.arange(1, horizon + 1, dtype=float)
+    forecast = intercept[:, None] + slope[:, None] * future_t
+    leverage = np.divide((future_t - t_mean[:, None]) ** 2, sxx[:, None],
+                         out=np.zeros_like(forecast), where=sxx[:, None] > 0)
+    spread = Z_SCORE * sigma[:, None] * np.sqrt(1 + 1 / safe[:, None] + leverage)
+
+    forecast[count < 2] = np.nan
+    return forecast, spread, count
+
+
+def _seasonal(values: np.ndarray, first_index: int, horizon: int):
+    periods = values.shape[1]
+    terms = (first_index + np.arange(periods)) % 2
+    forecast = np.full((values.shape[0], horizon), np.nan)
+    spread = np.zeros_like(forecast)
+    count = np.zeros(values.shape[0], dtype=int)
+    for h in range(horizon):
+        term = (first_index + periods - 1 + h + 1) % 2
+        same_term = values[:, terms == term][:, -SEASONAL_WINDOW:]
+        mean, std, term_count = _masked_mean_std(same_term)
+        forecast[:, h] = mean
+        spread[:, h] = Z_SCORE * std * np.sqrt(1 + 1 / np.maximum(term_count, 1))
+        count = np.maximum(count, term_count)
+    return forecast, spread, count
+
+
+def forecast_matrix(values: np.ndarray, first_index: int,
+                    horizon: int = FORECAST_HORIZON) -> dict:
+    """
+    Fits every model to every row of `values` (series x consecutive semesters,
+    NaN where a series has no data) and returns
+    {model: (forecast, lower, upper, num_observations)} with (series x horizon) arrays.
+    """
+    fitted = {
+        "moving_average": _moving_average(values, horizon),
+        "linear_trend": _linear_trend(values, horizon),
+        "seasonal": _seasonal(values, first_index, horizon),
+    }
+    results = {}
+    for model, (forecast, spread, count) in fitted.items():
+        forecast = np.clip(forecast, 0, None)
+        lower = np.clip(forecast - spread, 0, None)
+        upper = forecast + spread
+        results[model] = (forecast, lower, upper, count)
+    return results
+
+
+def _load_course_series(db: Session):
+    """Pivots total enrollment per course and semester into a NaN-padded matrix."""
+    rows = (
+        db.query(Offering.course_code, Course.dep_code, Offering.semester,
+                 func.sum(Enrollment.enrollment_count))
+        .join(Offering, Enrollment.offering_id == Offering.offering_id)
+        .join(Course, Course.course_code == Offering.course_code)
+        .group_by(Offering.course_code, Course.dep_code, Offering.semester)
+        .all()
+    )
+    rows = [(code, dep, semester_index(sem), total) for code, dep, sem, total in rows]
+    rows = [r for r in rows if r[2] is not None]
+    if not rows:
+        return None
+
+    codes = sorted({r[0] for r in rows})
+    code_pos = {code: i for i, code in enumerate(codes)}
+    course_dep = {r[0]: r[1] for r in rows}
+    sem_idx = np.array([r[2] for r in rows])
+    first_index = int(sem_idx.min())
+
+    values = np.full((len(codes), int(sem_idx.max()) - first_index + 1), np.nan)
+    values[[code_pos[r[0]] for r in rows], sem_idx - first_index] = [r[3] or 0 for r in rows]
+    return codes, [course_dep[c] for c in codes], values, first_index
+
+
+def _department_series(deps: list, values: np.ndarray):
+    """Sums course series into department series (NaN where no course has data)."""
+    dep_codes = sorted({d for d in deps if d})
+    dep_pos = {dep: i for i, dep in enumerate(dep_codes)}
+    keep = np.array([d in dep_pos for d in deps])
+    rows = np.array([dep_pos[d] for d in deps if d in dep_pos], dtype=int)
+
+    mask = ~np.isnan(values[keep])
+    totals = np.zeros((len(dep_codes), values.shape[1]))
+    counts = np.zeros_like(totals)
+    np.add.at(totals, rows, np.where(mask, values[keep], 0.0))
+    np.add.at(counts, rows, mask)
+    totals[counts == 0] = np.nan
+    return dep_codes, totals
+
+
+def build_forecast_rows(scope: str, keys: list, values: np.ndarray, first_index: int,
+                        horizon: int = FORECAST_HORIZON) -> list[dict]:
+    """Turns the fitted models for a set of series into enrollment_forecast rows."""
+    last_index = first_index + values.shape[1] - 1
+    labels = [semester_label(last_index + h) for h in range(1, horizon + 1)]
+    rows = []
+    for model, (forecast, lower, upper, count) in forecast_matrix(values, first_index,
+                                                                  horizon).items():
+        for i, key in enumerate(keys):
+            for h, semester in enumerate(labels):
+                if np.isnan(forecast[i, h]):
+                    continue
+                rows.append({
+                    "scope": scope,
+                    "key": key,
+                    "semester": semester,
+                    "model": model,
+                    "forecast": round(float(forecast[i, h]), 2),
+                    "lower": round(float(lower[i, h]), 2),
+                    "upper": round(float(upper[i, h]), 2),
+                    "num_observations": int(count[i]),
+                })
+    return rows
+
+
+def refresh_enrollment_forecasts(db: Session) -> int:
+    """Recomputes and stores every course and department forecast. Returns the row count."""
+    series = _load_course_series(db)
+    rows = []
+    if series:
+        codes, deps, values, first_index = series
+        dep_codes, dep_values = _department_series(deps, values)
+        rows = (build_forecast_rows("course", codes, values, first_index)
+                + build_forecast_rows("department", dep_codes, dep_values, first_index))
+
+    try:
+        db.execute(delete(EnrollmentForecast))
+        if rows:
+            db.execute(insert(EnrollmentForecast), rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    logging.info("Stored %d enrollment forecast rows.", len(rows))
+    return len(rows)
+
+
+def backfill_enrollment_forecasts(db: Session) -> None:
+    """Builds the forecasts if none are stored but enrollment data exists."""
+    has_forecasts = db.query(EnrollmentForecast.key).first() is not None
+    has_enrollment = db.query(Enrollment.enrollment_id).first() is not None
+    if has_enrollment and not has_forecasts:
+        refresh_enrollment_forecasts(db)
@@ -1,6 +1,8 @@
 """
 This file is used to load data from a dictionary of table names and list-of-dict records.
-It updates existing records and inserts new ones.
+It updates existing records and inserts new ones. Rows whose content hash matches the
+previous load are skipped, and a load that is the complete source of its tables removes
+the rows missing from it (see row_hashes.py).
 
 The data is loaded from the endpoints instead of Excel files,
 and inserts the results into the database.
@@ -8,24 +10,42 @@ and inserts the results into the database.
 
 import logging
 import os
+import time
+from typing import Callable, Dict, Optional
 import pandas as pd
 from pandas.errors import ParserError
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from backend.scripts.audit_extractor import AuditDataExtractor
 from backend.scripts.course_extractor import CourseDataExtractor
 from backend.scripts.enrollment_extractor import EnrollmentDataExtractor
 from .models import Instructor, Course, Offering, Requirement, Audit, CountsFor
-from .models import Prereqs, CourseInstructor, Enrollment, Department
+from .models import Prereqs, CourseInstructor, Enrollment, Department, RowHash
 from .db import SessionLocal
-from .to_csv import export_tables_to_csv
+from .to_csv import export_changed_tables
+from .rollups import refresh_enrollment_rollups, refresh_requirement_rollup
+from .rollups import refresh_instructor_rollups
+from .forecasts import refresh_enrollment_forecasts
+from .data_version import bump_data_version
+from .reference_data import refresh_reference_snapshot
+from .upsert import upsert_records
+from .records import prepare_records
+from .row_hashes import ChunkStats, TableDiff, diff_rows, delete_stale_rows
+
+# Enrollment data is recorded at the Qatar campus
+QATAR_CAMPUS_ID = 2
+
+# Changed rows written per transaction; bounds lock hold time and what a failed commit loses
+LOAD_CHUNK_SIZE = 5000
+
+
+class LoadError(Exception):
+    """Raised when a load fails; only the chunks committed before the error remain."""
 
-# Set up logging configuration
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Define the centralized data directory
 DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
-os.makedirs(DATA_DIR, exist_ok=True)
 
 tables = {
     "department": Department,
@@ -53,90 +73,178 @@ primary_keys = {
     "enrollment": ["enrollment_id"]
 }
 
-def _ensure_offerings_exist(db: Session, enrollment_records: list[dict]) -> None:
+def _ensure_offerings_exist(db: Session,
+                            enrollment_records: list[dict]) -> Dict[tuple, str]:
     """
     Checks enrollment records and creates missing Offering records in the database.
     This ensures that enrollment data can be linked to a valid offering.
+
+    The offerings of the semesters in the records are fetched once; the missing ones
+    are created in one bulk insert. Returns the offering_id of each (semester,
+    course_code), preferring the Qatar campus where a course was offered on both.
     """
     if not enrollment_records:
-        return
+        return {}
 
     logging.info("Ensuring necessary Offering records exist for enrollment data...")
-    semester_course_combos = set()
-    courses_to_check = set()
-
-    for record in enrollment_records:
-        semester = record.get('semester')
-        course_code = record.get('course_code')
-        if semester and course_code:
-            semester_course_combos.add((semester, course_code))
-            courses_to_check.add(course_code)
-
+    semester_course_combos = {(r.get("semester"), r.get("course_code"))
+                              for r in enrollment_records}
+    semester_course_combos = {(s, c) for s, c in semester_course_combos if s and c}
     if not semester_course_combos:
         logging.warning(
             "No valid semester/course combinations found in enrollment records."
         )
-        return
-
-    # Pre-fetch existing courses to minimize DB calls inside loop
+        return {}
+
+    semesters = {semester for semester, _ in semester_course_combos}
+    offering_ids = {}
+    relevant_offerings = db.execute(
+        select(Offering.semester, Offering.course_code, Offering.campus_id,
+               Offering.offering_id)
+        .where(Offering.semester.in_(semesters))
+        .order_by(Offering.offering_id)
+    ).all()
+    for semester, course_code, campus_id, offering_id in relevant_offerings:
+        if (semester, course_code) not in offering_ids or campus_id == QATAR_CAMPUS_ID:
+            offering_ids[(semester, course_code)] = offering_id
+
+    missing = semester_course_combos - offering_ids.keys()
     existing_db_courses = set()
-    if courses_to_check:
-        # Split filter for line length
-        course_results = db.query(Course.course_code).filter(
-            Course.course_code.in_(courses_to_check)
-        ).all()
-        existing_db_courses = {c[0] for c in course_results}
-
-    # Pre-fetch existing offerings
-    existing_offerings = set()
-    if semester_course_combos:
-        # Build query dynamically might be complex, fetch all relevant and filter in memory
-        # Or fetch in chunks if memory is a concern
-        relevant_offerings = db.query(Offering.semester, Offering.course_code).filter(
-            Offering.course_code.in_(courses_to_check)
-        ).all()
-        existing_offerings = {(o.semester, o.course_code) for o in relevant_offerings}
+    if missing:
+        existing_db_courses = set(db.execute(
+            select(Course.course_code)
+            .where(Course.course_code.in_({course_code for _, course_code in missing}))
+        ).scalars())
 
     offerings_to_add = []
-    for semester, course_code in semester_course_combos:
-        if (semester, course_code) not in existing_offerings:
-            # Check if the course itself exists in the database before creating offering
-            if course_code in existing_db_courses:
-                offering_id = f"{course_code}_{semester}_2" # Assume campus_id 2 (Qatar)
-                offerings_to_add.append(Offering(
-                    offering_id=offering_id,
-                    semester=semester,
-                    course_code=course_code,
-                    campus_id=2  # Default campus_id for Qatar
-                ))
-            else:
-                logging.warning(
-                    "Cannot create offering for (%s, %s) because Course %s does not exist.",
-                    semester, course_code, course_code
-                )
+    for semester, course_code in sorted(missing):
+        # Check if the course itself exists in the database before creating offering
+        if course_code in existing_db_courses:
+            offering_id = f"{course_code}_{semester}_{QATAR_CAMPUS_ID}"
+            offerings_to_add.append({"offering_id": offering_id, "semester": semester,
+                                     "course_code": course_code,
+                                     "campus_id": QATAR_CAMPUS_ID})
+        else:
+            logging.warning(
+                "Cannot create offering for (%s, %s) because Course %s does not exist.",
+                semester, course_code, course_code
+            )
 
     if offerings_to_add:
+        result = upsert_records(db, Offering, offerings_to_add, ["offering_id"])
         try:
-            db.bulk_save_objects(offerings_to_add)
             db.commit()
-            logging.info("Created %d missing Offering records.", len(offerings_to_add))
+            logging.info("Created %d missing Offering records.", result.written)
         except (IntegrityError, SQLAlchemyError) as e:
             db.rollback()
             logging.error("Error creating missing Offering records: %s", e)
-            # Propagate the error or handle as needed - potentially raise?
+            return offering_ids
+        for record, error in result.errors:
+            logging.error("Error creating Offering record %s: %s", record, error)
+        failed = {record.get("offering_id") for record, _ in result.errors}
+        offering_ids.update({(o["semester"], o["course_code"]): o["offering_id"]
+                             for o in offerings_to_add if o["offering_id"] not in failed})
+    return offering_ids
+
+
+def _link_enrollment_records(records: list[dict], offering_ids: Dict[tuple, str]) -> list[dict]:
+    """
+    Returns copies of the enrollment records with the offering_id of their (semester,
+    course_code) and, where missing, an enrollment_id. Records without an offering
+    are skipped.
+    """
+    linked = []
+    for record in records:
+        offering_id = offering_ids.get((record.get("semester"), record.get("course_code")))
+        if not offering_id:
+            continue # Skip if offering couldn't be found
 
-def load_data_from_dicts(data_dict: dict[str, list[dict]]) -> None:
+        try:
+            class_val = int(record.get("class_", 0))
+        except (TypeError, ValueError):
+            logging.warning("Invalid class for enrollment record: %s", record)
+            continue
+        record = dict(record, offering_id=offering_id, class_=class_val)
+        if "enrollment_id" not in record:
+            section = record.get("section", "")
+            department = record.get("department", "")
+            record["enrollment_id"] = f"{offering_id}_{class_val}_{section}_{department}"
+        linked.append(record)
+    return linked
+
+
+def _write_changed_rows(db: Session, table_name: str, diff: TableDiff,
+                        on_chunk: Optional[Callable[[str, ChunkStats], None]] = None) -> None:
+    """
+    Upserts the changed rows of `diff` in chunks of LOAD_CHUNK_SIZE, committing each chunk
+    together with the row hashes of its rows. Within a chunk a bad record only fails
+    itself (see upsert.py) and is recorded in `diff.errors`; a chunk with failures keeps
+    the old hashes, so its rows are written again on the next load. A chunk whose commit
+    fails raises LoadError. Records the stats of each chunk in `diff.chunks` and passes
+    them to `on_chunk`, if given, after the chunk is committed.
+    """
+    model, key_columns = tables[table_name], primary_keys[table_name]
+    for start in range(0, len(diff.changed_rows), LOAD_CHUNK_SIZE):
+        started = time.perf_counter()
+        rows = diff.changed_rows[start:start + LOAD_CHUNK_SIZE]
+        keys = diff.changed_keys[start:start + LOAD_CHUNK_SIZE]
+        result = upsert_records(db, model, rows, key_columns)
+        if not result.failed:
+            upsert_records(db, RowHash, diff.hash_records(keys), ["table_name", "row_key"])
+        try:
+            db.commit()
+        except SQLAlchemyError as e:
+            logging.error("Error committing chunk of %d rows for table %s: %s",
+                          len(rows), table_name, e)
+            db.rollback()
+            raise LoadError(f"Could not commit a chunk of {len(rows)} rows for table "
+                            f"{table_name}: {e}") from e
+        chunk = ChunkStats(len(rows), result.written, result.failed,
+                           round(time.perf_counter() - started, 4))
+        diff.chunks.append(chunk)
+        diff.failed += chunk.failed
+        diff.report_errors(result.errors)
+        logging.debug("Chunk %d of %s: %d rows written, %d failed in %.3f s",
+                      len(diff.chunks), table_name, chunk.written, chunk.failed, chunk.seconds)
+        for record, error in result.errors:
+            logging.warning("Failed to upsert record into %s: %s Record: %s",
+                            table_name, error, record)
+        if on_chunk is not None:
+            on_chunk(table_name, chunk)
+
+
+def load_data_from_dicts(data_dict: dict[str, list[dict]],
+                         session_factory: Optional[sessionmaker] = None,
+                         prune: bool = False,
+                         on_chunk: Optional[Callable[[str, ChunkStats], None]] = None
+                         ) -> Dict[str, TableDiff]:
     """
     Loads data from a dictionary of table names and list-of-dict records.
-    Updates existing records and inserts new ones.
+    Inserts new records and updates changed ones; unchanged records are skipped.
+    With `prune`, the records are the complete source of each table given, and rows
+    missing from them are deleted unless another table still references them.
+    Returns the diff of each table loaded.
+
+    `session_factory` selects the database to load into (e.g. a staging snapshot);
+    by default the live database is updated in place. The in-memory reference data
+    is only refreshed for the live database; snapshots refresh it when published.
+
+    `on_chunk(table_name, chunk_stats)` is called after every committed chunk, e.g. to
+    report progress; an exception it raises aborts the load.
+
+    Records that fail individually are counted in the diffs (`failed`); any other database
+    error (a failed commit, rollup refresh or data version bump) is rolled back and raised
+    as LoadError, as the tables would otherwise be left partially loaded.
     """
-    db: Session = SessionLocal()
+    db: Session = (session_factory or SessionLocal)()
+    diffs: Dict[str, TableDiff] = {}
+    stale_rows: Dict[str, list[dict]] = {}
     try:
         logging.info("Loading data from dictionaries...")
 
-        # Pre-process: Ensure offerings exist for enrollment data
-        if "enrollment" in data_dict:
-            _ensure_offerings_exist(db, data_dict["enrollment"])
+        # Semesters covered by this load, used to refresh the enrollment rollups afterwards
+        enrollment_semesters = {r.get("semester") for r in data_dict.get("enrollment", [])
+                                if r.get("semester")}
 
         # Process tables in a specific order to handle dependencies
         table_order = [
@@ -144,9 +252,6 @@ def load_data_from_dicts(data_dict: dict[str, list[dict]]) -> None:
             "requirement", "prereqs", "countsfor", "course_instructor", "enrollment"
         ]
 
-        # Cache fetched offerings to reduce DB lookups inside the enrollment loop
-        offering_cache = {}
-
         # --- Temporarily reduce logging --- #
         # Enable logging specifically for audit related tables
         log_tables = {"audit", "requirement", "countsfor"}
@@ -166,183 +271,83 @@ def load_data_from_dicts(data_dict: dict[str, list[dict]]) -> None:
                 # logging.warning("No model found for table: %s. Skipping.", table_name)
                 continue
 
-            # Basic deduplication based on all columns before processing
-            try:
-                df = pd.DataFrame(records)
-                df.dropna(axis=1, how='all', inplace=True)
-                pk = primary_keys.get(table_name)
-                if pk and all(k in df.columns for k in pk):
-                    df.drop_duplicates(subset=pk, keep='last', inplace=True)
-                else:
-                    df.drop_duplicates(keep='last', inplace=True)
-                deduped_records = df.to_dict(orient="records")
-            except (ValueError, KeyError, TypeError) as _: # Renamed unused variable e to _
-                # --- Temporarily reduce logging --- #
-                # logging.error(
-                #    "Error during DataFrame processing for %s: %s. Using raw records.",
-                #    table_name, e
-                # )
-                deduped_records = records
-
-            if not deduped_records:
-                # --- Temporarily reduce logging --- #
-                # logging.info("No records remaining for %s after deduplication.", table_name)
-                continue
-
-            # Special handling for enrollment (linking offering_id)
+            # Enrollment records are linked to their offering before they are prepared; the
+            # offerings (including any loaded above) are fetched once, missing ones created
             if table_name == "enrollment":
-                processed_enrollment = []
-                for record in deduped_records:
-                    record["class_"] = int(record.get("class_", 0))
-                    record["enrollment_count"] = int(record.get("enrollment_count", 0))
-
-                    semester = record.get("semester")
-                    course_code = record.get("course_code")
-                    offering_id = None
-
-                    if semester and course_code:
-                        cache_key = (semester, course_code)
-                        if cache_key in offering_cache:
-                            offering_id = offering_cache[cache_key]
-                        else:
-                            offering = db.query(Offering.offering_id).filter(
-                                Offering.course_code == course_code,
-                                Offering.semester == semester
-                            ).first()
-                            if offering:
-                                offering_id = offering.offering_id
-                                offering_cache[cache_key] = offering_id
-                            # else:
-                                # logging.warning(
-                                #    "Offering not found for enrollment record (%s, %s), "
-                                #    "skipping record.", semester, course_code
-                                # )
-                                # continue
-                    # else:
-                        # logging.warning(
-                        #    "Enrollment record missing semester/course_code: %s", record
-                        # )
-                        # continue
-
-                    if not offering_id:
-                        continue # Skip if offering couldn't be found
-
-                    record["offering_id"] = offering_id
-
-                    original_keys = list(record.keys())
-                    for key in original_keys:
-                        if not hasattr(model, key) and key != 'class_':
-                            del record[key]
-
-                    if "enrollment_id" not in record and record.get("offering_id"):
-                        section = record.get("section", "")
-                        class_val = record.get("class_", "")
-                        department = record.get("department", "")
-                        record["enrollment_id"] = (
-                            f"{record['offering_id']}_{class_val}_{section}_{department}"
-                        )
-                    elif "enrollment_id" not in record:
-                        # logging.warning(
-                        #    "Could not generate enrollment_id for record: %s", record
-                        # )
-                        continue
+                offering_ids = _ensure_offerings_exist(db, records)
+                records = _link_enrollment_records(records, offering_ids)
+
+            rows, rejected = prepare_records(model, records, primary_keys[table_name])
+            for record, error in rejected:
+                logging.warning("Rejected record for %s: %s Record: %s", table_name, error, record)
+            if not rows:
+                # nothing valid to load; never prune a table against an empty source
+                if rejected:
+                    diffs[table_name] = TableDiff(table_name, failed=len(rejected))
+                    diffs[table_name].report_errors(rejected)
+                continue
 
-                    processed_enrollment.append(record)
-                deduped_records = processed_enrollment
+            diff, stale_rows[table_name] = diff_rows(db, model, rows,
+                                                     primary_keys[table_name], prune)
+            diff.failed += len(rejected)
+            diff.report_errors(rejected)
+            diffs[table_name] = diff
+            _write_changed_rows(db, table_name, diff, on_chunk)
+            # --- Temporarily reduce logging --- #
+            # Log commit success specifically for offering and enrollment
+            if table_name in log_tables or table_name in ["offering", "enrollment"]:
+                logging.info(
+                    "COMMIT SUCCEEDED for table %s: %d records written in %d chunks, "
+                    "%d unchanged, %d failed.", table_name,
+                    sum(c.written for c in diff.chunks), len(diff.chunks), diff.unchanged,
+                    diff.failed
+                )
 
-            keys = primary_keys.get(table_name)
-            if not keys:
-                # --- Temporarily reduce logging --- #
-                # logging.warning("No primary keys defined for %s. Bulk inserting...", table_name)
-                try:
-                    db.bulk_insert_mappings(model, deduped_records)
-                    db.commit()
-                except (IntegrityError, SQLAlchemyError) as _: # Renamed unused variable error to _
-                    db.rollback()
-                    # logging.error(
-                    #    "Error bulk inserting into %s: %s", table_name, error
-                    # )
-                continue
+        # Stale rows are deleted last, dependent tables first
+        for table_name in reversed(table_order):
+            if stale_rows.get(table_name):
+                diffs[table_name].deleted = delete_stale_rows(
+                    db, tables[table_name], stale_rows[table_name], primary_keys[table_name])
+                db.commit()
+                logging.info("Deleted %d stale rows from %s.",
+                             diffs[table_name].deleted, table_name)
+
+        def changed(*table_names: str) -> bool:
+            return any(t in diffs and diffs[t].changed for t in table_names)
+
+        # Keep the enrollment rollups in sync: only the semesters in this load are recomputed,
+        # while a new countsfor mapping invalidates every requirement total.
+        if enrollment_semesters and changed("enrollment"):
+            refresh_enrollment_rollups(db, enrollment_semesters)
+            refresh_enrollment_forecasts(db)
+        if changed("countsfor"):
+            refresh_requirement_rollup(db)
+            db.commit()
 
-            successful_upserts = 0
-            failed_upserts = 0
-            for record in deduped_records:
-                try:
-                    filter_conditions = {}
-                    has_all_keys = True
-                    for key in keys:
-                        if key in record and record[key] is not None:
-                            filter_conditions[key] = record[key]
-                        else:
-                            # logging.warning(
-                            #    "Skipping record in %s due to missing PK '%s': %s",
-                            #    table_name, key, record
-                            # )
-                            has_all_keys = False
-                            break
-
-                    if not has_all_keys:
-                        failed_upserts += 1
-                        continue
-
-                    instance_data = record.copy()
-                    for key in filter_conditions:
-                        if key in instance_data:
-                            del instance_data[key]
-
-                    instance_to_merge = model(**filter_conditions)
-                    for key, value in instance_data.items():
-                        # attr_name = 'class_' if table_name == 'enrollment'
-                        #  and key == 'class' else key
-                        if table_name == 'enrollment' and key == 'class':
-                            attr_name = 'class_'
-                        else:
-                            attr_name = key
-                        if hasattr(instance_to_merge, attr_name):
-                            setattr(instance_to_merge, attr_name, value)
-                        # else:
-                            # logging.warning(
-                            #    "Model %s missing attr %s from key %s",
-                            #    table_name, attr_name, key
-                            # )
-
-                    db.merge(instance_to_merge)
-                    successful_upserts += 1
-
-                except SQLAlchemyError as _: # Renamed unused variable e to _
-                    # logging.error(
-                    #    "Error merging record into %s: %s Record: %s", table_name, _, record
-                    # )
-                    failed_upserts += 1
-                    db.rollback()
+        if changed("course_instructor", "countsfor", "enrollment"):
+            refresh_instructor_rollups(db)
 
-            try:
-                db.commit() # Commit all successful merges for the table
-                # --- Temporarily reduce logging --- #
-                # Log commit success specifically for offering and enrollment
-                if table_name in log_tables or table_name in ["offering", "enrollment"]:
-                    logging.info(
-                        "COMMIT SUCCEEDED for table %s: %d records successfully merged, %d failed.",
-                        table_name, successful_upserts, failed_upserts
-                    )
-            except SQLAlchemyError as _: # Renamed unused variable e to _
-                # logging.error("Error committing merges for table %s: %s", table_name, e)
-                db.rollback()
+        # An unchanged upload keeps the data version, so cached analytics stay valid
+        if changed(*diffs):
+            bump_data_version(db)
+            if session_factory is None:
+                refresh_reference_snapshot(db)
 
     except SQLAlchemyError as e:
         logging.exception("An unexpected error occurred during data loading: %s", e)
         db.rollback()
+        raise LoadError(f"Data loading failed: {e}") from e
     finally:
-        # Export tables to CSV after loading/processing
-        logging.info("Exporting tables to CSV...")
-        try:
-            # Pass the current session and the list of table names to export
-            export_tables_to_csv(session=db, table_names=list(tables.keys()))
-        except (IOError, SQLAlchemyError) as csv_e:
-            logging.error("CSV Export failed: %s", csv_e)
-        # Close the session AFTER exporting
+        # The CSV export is a separate post-ingestion step (export_changed_tables)
         db.close()
         logging.info("Database session closed.")
+    return diffs
+
+
+def changed_tables(diffs: Dict[str, TableDiff]) -> set[str]:
+    """Names of the tables a load modified, e.g. to export them afterwards."""
+    return {table_name for table_name, diff in diffs.items() if diff.changed}
+
 
 def load_data_from_endpoint() -> None:
     """
@@ -352,6 +357,7 @@ def load_data_from_endpoint() -> None:
     logging.info("--- Starting Data Loading from Endpoint Simulation ---")
     all_course_data = {}
     all_audit_data = {}
+    modified_tables = set()
     db_course_codes = set()
 
     # --- 0. Process and Load Department Data --- #
@@ -366,7 +372,8 @@ def load_data_from_endpoint() -> None:
                 dept_records = dept_df.to_dict(orient="records")
                 if dept_records:
                     logging.info("Loading Department data into the database...")
-                    load_data_from_dicts({"department": dept_records})
+                    modified_tables |= changed_tables(
+                        load_data_from_dicts({"department": dept_records}, prune=True))
                     logging.info("Finished loading Department data.")
                 else:
                     logging.warning(
@@ -378,7 +385,7 @@ def load_data_from_endpoint() -> None:
                     dept_csv_path
                 )
         except (FileNotFoundError, pd.errors.EmptyDataError,
-                ParserError, ValueError, KeyError) as e:
+                ParserError, ValueError, KeyError, LoadError) as e:
             logging.error(
                 "Failed to process or load department data from %s: %s", dept_csv_path, e
             )
@@ -402,14 +409,15 @@ def load_data_from_endpoint() -> None:
                 course_keys = {"course", "instructor", "offering", "prereqs", "course_instructor"}
                 data_to_load_now = {k: v for k, v in all_course_data.items() if k in course_keys}
                 if data_to_load_now:
-                    load_data_from_dicts(data_to_load_now)
+                    modified_tables |= changed_tables(
+                        load_data_from_dicts(data_to_load_now, prune=True))
                     logging.info("Finished loading Course related data.")
                 else:
                     logging.warning("No course-related data found to load initially.")
             else:
                 logging.warning("Course extractor returned no data.")
 
-        except (IOError, ValueError, FileNotFoundError) as e:
+        except (IOError, ValueError, FileNotFoundError, LoadError) as e:
             logging.error("Failed to process or load course data from %s: %s", course_data_dir, e)
     else:
         logging.warning("Course data directory not found or empty: %s", course_data_dir)
@@ -457,14 +465,15 @@ def load_data_from_endpoint() -> None:
                             "Audit Extractor produced counts: %s",
                             {k: len(v) for k, v in data_to_load_now.items()}
                         )
-                        load_data_from_dicts(data_to_load_now)
+                        modified_tables |= changed_tables(
+                            load_data_from_dicts(data_to_load_now, prune=True))
                         logging.info("Finished loading Audit related data.")
                     else:
                         logging.warning("No audit-related data found to load.")
                 else:
                     logging.warning("Audit extractor returned no data.")
 
-            except (IOError, ValueError, FileNotFoundError) as e:
+            except (IOError, ValueError, FileNotFoundError, LoadError) as e:
                 logging.error("Failed to process or load audit data from %s: %s", audit_data_dir, e)
         else:
             logging.warning(
@@ -484,16 +493,14 @@ def load_data_from_endpoint() -> None:
 
             if enrollment_records:
                 logging.info("Loading Enrollment related data into the database...")
-                # Ensure offerings exist BEFORE loading enrollment that depends on them
-                with SessionLocal() as temp_db:
-                    _ensure_offerings_exist(temp_db, enrollment_records)
-                # Now load the enrollment data
-                load_data_from_dicts({"enrollment": enrollment_records})
+                # Missing offerings are created by load_data_from_dicts before linking
+                modified_tables |= changed_tables(
+                    load_data_from_dicts({"enrollment": enrollment_records}, prune=True))
                 logging.info("Finished loading Enrollment related data.")
             else:
                 logging.warning("Enrollment extractor returned no data from the Excel file.")
         except (FileNotFoundError, ParserError, ValueError,
-                SQLAlchemyError, KeyError) as e:
+                SQLAlchemyError, KeyError, LoadError) as e:
             logging.error(
                 "Failed to process or load enrollment data from %s: %s",
                 enrollment_data_path, e
@@ -507,10 +514,14 @@ def load_data_from_endpoint() -> None:
     #     logging.info("Loading Instructor data...")
     #     load_data_from_dicts({"instructor": all_course_data["instructor"]})
 
+    # --- 6. Export the changed tables to CSV, once for all stages --- #
+    export_changed_tables(modified_tables, list(tables))
+
     logging.info("--- Finished Data Loading from Endpoint Simulation ---")
 
 # Example usage (optional, for testing)
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     # You might want to reset the DB before loading if needed
     from .db import reset_db
     reset_db()
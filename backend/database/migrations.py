@@ -0,0 +1,71 @@
+"""
+This script applies versioned schema migrations to existing databases.
+
+`create_all` only creates missing tables, so changes to existing tables (new
+indexes, columns, ...) never reach a deployed database. Each change is therefore
+also registered here as a numbered migration. On startup every migration that is
+not yet recorded in the schema_migration table is applied in order, each in its
+own transaction.
+
+Migrations must be idempotent, since a fresh database already gets the current
+schema from `create_all` before they run.
+
+To add a migration, append (next_version, description, function) to MIGRATIONS;
+the function receives an open connection.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Callable
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Connection, Engine
+from .models import Base, SchemaMigration
+
+
+def _create_indexes(*names: str) -> Callable[[Connection], None]:
+    """Builds a migration creating the given model indexes if they do not exist."""
+    def migrate(conn: Connection) -> None:
+        indexes = {index.name: index
+                   for table in Base.metadata.sorted_tables for index in table.indexes}
+        for name in names:
+            indexes[name].create(conn, checkfirst=True)
+    return migrate
+
+
+MIGRATIONS: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "secondary indexes on hot filter and join columns", _create_indexes(
+        "ix_offering_course_code",
+        "ix_offering_semester",
+        "ix_offering_campus_id",
+        "ix_countsfor_requirement",
+        "ix_requirement_audit_id",
+        "ix_audit_major",
+        "ix_enrollment_offering_id",
+        "ix_course_dep_code",
+        "ix_course_instructor_course_code",
+    )),
+]
+
+
+def applied_migrations(conn: Connection) -> set[int]:
+    """Returns the versions of the migrations already applied."""
+    return set(conn.execute(select(SchemaMigration.version)).scalars())
+
+
+def run_migrations(engine: Engine) -> list[int]:
+    """Applies every pending migration in order. Returns the versions applied."""
+    with engine.begin() as conn:
+        SchemaMigration.__table__.create(conn, checkfirst=True)
+        applied = applied_migrations(conn)
+
+    newly_applied = []
+    for version, name, migrate in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in applied:
+            continue
+        logging.info("Applying schema migration %d: %s", version, name)
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(insert(SchemaMigration).values(
+                version=version, name=name, applied_at=datetime.now(timezone.utc)))
+        newly_applied.append(version)
+    return newly_applied
@@ -2,7 +2,8 @@
 this script contains all the models for the gened database
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, SmallInteger, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, SmallInteger, ForeignKey, Text, Float
+from sqlalchemy import DateTime, Index
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -15,13 +16,16 @@ class Department(Base):
     dep_code = Column(String(20), primary_key=True)
     name = Column(Text)
 
-    courses = relationship("Course", back_populates="department")
+    courses = relationship("Course", back_populates="department", lazy="raise_on_sql")
 
 class Course(Base):
     """
     Course model
     """
     __tablename__ = 'course'
+    __table_args__ = (
+        Index('ix_course_dep_code', 'dep_code'),
+    )
     course_code = Column(String(20), primary_key=True)
     name = Column(Text)
     units = Column(SmallInteger)
@@ -34,11 +38,11 @@ class Course(Base):
     dep_code = Column(String(20), ForeignKey('department.dep_code'))
     prereqs_text = Column(Text)
 
-    prerequisites = relationship("Prereqs", back_populates="course")
-    counts_for = relationship("CountsFor", back_populates="course")
-    offerings = relationship("Offering", back_populates="course")
-    instructor = relationship("CourseInstructor", back_populates="course")
-    department = relationship("Department", back_populates="courses")
+    prerequisites = relationship("Prereqs", back_populates="course", lazy="raise_on_sql")
+    counts_for = relationship("CountsFor", back_populates="course", lazy="raise_on_sql")
+    offerings = relationship("Offering", back_populates="course", lazy="raise_on_sql")
+    instructor = relationship("CourseInstructor", back_populates="course", lazy="raise_on_sql")
+    department = relationship("Department", back_populates="courses", lazy="raise_on_sql")
 
 class Prereqs(Base):
     """
@@ -50,19 +54,24 @@ class Prereqs(Base):
     group_id = Column(Integer, primary_key=True)
     logic_type = Column(String(20))
 
-    course = relationship("Course", back_populates="prerequisites")
+    course = relationship("Course", back_populates="prerequisites", lazy="raise_on_sql")
 
 class Offering(Base):
     """
     Offering model: offerings od courses in the past
     """
     __tablename__ = 'offering'
+    __table_args__ = (
+        Index('ix_offering_course_code', 'course_code', 'semester', 'campus_id'),
+        Index('ix_offering_semester', 'semester', 'campus_id', 'course_code'),
+        Index('ix_offering_campus_id', 'campus_id', 'course_code'),
+    )
     offering_id = Column(String(50), primary_key=True)
     semester = Column(String(20))
     course_code = Column(String(20), ForeignKey('course.course_code'))
     campus_id = Column(Integer)
 
-    course = relationship("Course", back_populates="offerings")
+    course = relationship("Course", back_populates="offerings", lazy="raise_on_sql")
 
 class Instructor(Base):
     """
@@ -73,44 +82,58 @@ class Instructor(Base):
     first_name = Column(Text)
     last_name = Column(Text)
 
-    courses = relationship("CourseInstructor", back_populates="instructor")
+    courses = relationship("CourseInstructor", back_populates="instructor", lazy="raise_on_sql")
 
 class CourseInstructor(Base):
     """
     CourseInstructor model: many-to-many relationship between course and instructor
     """
     __tablename__ = 'course_instructor'
+    # The primary key serves lookups by instructor; this index serves lookups by course
+    # and department (course_code range), both without touching the table.
+    __table_args__ = (
+        Index('ix_course_instructor_course_code', 'course_code', 'andrew_id'),
+    )
     andrew_id = Column(Text, ForeignKey('instructor.andrew_id'), primary_key=True)
     course_code = Column(String(20), ForeignKey('course.course_code'), primary_key=True)
-    course = relationship("Course", back_populates="instructor")
-    instructor = relationship("Instructor", back_populates="courses")
+    course = relationship("Course", back_populates="instructor", lazy="raise_on_sql")
+    instructor = relationship("Instructor", back_populates="courses", lazy="raise_on_sql")
 
 class CountsFor(Base):
     """
     CountsFor model: many-to-many relationship between course and requirement
     """
     __tablename__ = 'countsfor'
+    __table_args__ = (
+        Index('ix_countsfor_requirement', 'requirement', 'course_code'),
+    )
     course_code = Column(String(20), ForeignKey('course.course_code'), primary_key=True)
     requirement = Column(Text, ForeignKey('requirement.requirement'), primary_key=True)
 
-    course = relationship("Course", back_populates="counts_for")
-    requirement_rel = relationship("Requirement", back_populates="counts_for")
+    course = relationship("Course", back_populates="counts_for", lazy="raise_on_sql")
+    requirement_rel = relationship("Requirement", back_populates="counts_for", lazy="raise_on_sql")
 
 class Requirement(Base):
     """
     Requirement model: requirements in each audit
     """
     __tablename__ = 'requirement'
+    __table_args__ = (
+        Index('ix_requirement_audit_id', 'audit_id'),
+    )
     requirement = Column(Text, primary_key=True)
     audit_id = Column(String(100), ForeignKey('audit.audit_id'))  # Reference to new audit_id
 
-    counts_for = relationship("CountsFor", back_populates="requirement_rel")
+    counts_for = relationship("CountsFor", back_populates="requirement_rel", lazy="raise_on_sql")
 
 class Audit(Base):
     """
     Audit model: audit for each major
     """
     __tablename__ = 'audit'
+    __table_args__ = (
+        Index('ix_audit_major', 'major'),
+    )
     audit_id = Column(String(100), primary_key=True)
     name = Column(Text)
     type = Column(Boolean)
@@ -121,9 +144,101 @@ class Enrollment(Base):
     Enrollment model: enrollment data for each class
     """
     __tablename__ = 'enrollment'
+    __table_args__ = (
+        Index('ix_enrollment_offering_id', 'offering_id'),
+    )
     enrollment_id = Column(String(100), primary_key=True)
     class_ = Column("class", Integer)
     enrollment_count = Column(Integer)
     department = Column(String(20))
     section = Column(String(20))
     offering_id = Column(String(50), ForeignKey('offering.offering_id'))
+
+class EnrollmentDepartmentRollup(Base):
+    """
+    EnrollmentDepartmentRollup model: enrollment totals per department, semester,
+    class year and campus, maintained at upload time
+    """
+    __tablename__ = 'enrollment_department_rollup'
+    dep_code = Column(String(20), primary_key=True)
+    semester = Column(String(20), primary_key=True)
+    class_ = Column("class", Integer, primary_key=True)
+    campus_id = Column(Integer, primary_key=True)
+    enrollment_count = Column(Integer)
+
+class EnrollmentRequirementRollup(Base):
+    """
+    EnrollmentRequirementRollup model: enrollment totals per requirement, semester,
+    class year and campus, maintained at upload time
+    """
+    __tablename__ = 'enrollment_requirement_rollup'
+    requirement = Column(Text, primary_key=True)
+    semester = Column(String(20), primary_key=True)
+    class_ = Column("class", Integer, primary_key=True)
+    campus_id = Column(Integer, primary_key=True)
+    enrollment_count = Column(Integer)
+
+class EnrollmentForecast(Base):
+    """
+    EnrollmentForecast model: forecast enrollment of a course or department for
+    upcoming semesters, rebuilt in batch after each enrollment upload
+    """
+    __tablename__ = 'enrollment_forecast'
+    scope = Column(String(20), primary_key=True)  # 'course' or 'department'
+    key = Column(String(20), primary_key=True)  # course_code or dep_code
+    semester = Column(String(20), primary_key=True)
+    model = Column(String(20), primary_key=True)  # 'moving_average', 'linear_trend', 'seasonal'
+    forecast = Column(Float)
+    lower = Column(Float)
+    upper = Column(Float)
+    num_observations = Column(Integer)
+
+class DataVersion(Base):
+    """
+    DataVersion model: single-row counter bumped after every data load,
+    used to invalidate cached analytics
+    """
+    __tablename__ = 'data_version'
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime)
+
+class InstructorLoad(Base):
+    """
+    InstructorLoad model: courses offered and students enrolled per instructor and
+    semester, rebuilt at upload time
+    """
+    __tablename__ = 'instructor_load'
+    andrew_id = Column(Text, primary_key=True)
+    semester = Column(String(20), primary_key=True)
+    num_courses = Column(Integer)
+    enrollment_count = Column(Integer)
+
+class InstructorRequirement(Base):
+    """
+    InstructorRequirement model: requirements covered by each instructor's courses,
+    rebuilt at upload time
+    """
+    __tablename__ = 'instructor_requirement'
+    andrew_id = Column(Text, primary_key=True)
+    requirement = Column(Text, primary_key=True)
+    num_courses = Column(Integer)
+
+class SchemaMigration(Base):
+    """
+    SchemaMigration model: the schema migrations applied to this database
+    """
+    __tablename__ = 'schema_migration'
+    version = Column(Integer, primary_key=True)
+    name = Column(Text)
+    applied_at = Column(DateTime)
+
+class RowHash(Base):
+    """
+    RowHash model: content hash of each row written by the loader, used to skip
+    unchanged rows on the next upload
+    """
+    __tablename__ = 'row_hash'
+    table_name = Column(String(50), primary_key=True)
+    row_key = Column(Text, primary_key=True)
+    hash = Column(String(32), nullable=False)
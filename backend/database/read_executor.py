@@ -0,0 +1,78 @@
+"""
+This script runs the read-only services on a dedicated, explicitly sized executor.
+
+Read routes are `async` handlers that hand each service call to this executor, so
+they do not queue behind uploads or other blocking work in the shared anyio
+threadpool. The executor has exactly as many threads as the read engine has
+pooled connections (DB_READ_POOL_SIZE), so a read never waits for a connection
+while holding a thread, and excess requests wait on the event loop instead.
+
+Each call gets its own read-only session, opened and closed on the worker thread, and
+runs in a copy of the caller's context (so per-request context variables, such as the
+request metrics, follow the call).
+"""
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+from backend.database.db import ReadSessionLocal, DB_READ_POOL_SIZE, sync_database_binding
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_read_executor() -> ThreadPoolExecutor:
+    """Returns the read executor, creating it on first use."""
+    global _executor  # pylint: disable=global-statement
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DB_READ_POOL_SIZE,
+                                               thread_name_prefix="db-read")
+    return _executor
+
+
+def shutdown_read_executor() -> None:
+    """Waits for running reads to finish and releases the executor threads."""
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def _call_with_session(func: Callable[..., Any], *args, **kwargs) -> Any:
+    sync_database_binding()
+    with ReadSessionLocal() as db:
+        return func(db, *args, **kwargs)
+
+
+async def run_read(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Runs func(db, *args, **kwargs) on the read executor with a fresh read-only session."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_read_executor(),
+                                      partial(context.run, _call_with_session, func,
+                                              *args, **kwargs))
+
+
+class ReadExecutorService:
+    """
+    Proxy for a read-only service class: awaiting `proxy.method(...)` runs
+    `ServiceClass(db).method(...)` on the read executor.
+    """
+
+    def __init__(self, service_cls: type):
+        self._service_cls = service_cls
+
+    def __getattr__(self, name: str):
+        service_cls = self._service_cls
+
+        async def call(*args, **kwargs):
+            return await run_read(lambda db: getattr(service_cls(db), name)(*args, **kwargs))
+
+        call.__name__ = name
+        return call
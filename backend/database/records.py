@@ -0,0 +1,132 @@
+"""
+This script prepares the records handed to the loader for writing.
+
+Each record is converted once into a new row keyed by column key, leaving the caller's
+dicts untouched:
+
+- keys that are not columns of the table are dropped,
+- values are converted to the column's type by a converter compiled once per model:
+  integers stay integers (an integral float such as 12.0 becomes 12, 12.5 is
+  rejected), NaN and empty strings in non-text columns become None,
+- columns that are None in every record are dropped, so they keep their stored values,
+- records with the same primary key are collapsed, the last one winning.
+
+Records that fail conversion or have no primary key are rejected with a message.
+"""
+
+import math
+import operator
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from sqlalchemy import Boolean, Float, Integer, String, inspect
+
+TRUE_STRINGS = {"true", "t", "yes", "y", "1"}
+FALSE_STRINGS = {"false", "f", "no", "n", "0"}
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _to_int(value: Any) -> int:
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"{value!r} is not an integer")
+        return int(value)
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            return int(text)
+        except ValueError:
+            return _to_int(float(text))
+    return operator.index(value)  # int, bool and numpy integers
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in TRUE_STRINGS or text in FALSE_STRINGS:
+            return text in TRUE_STRINGS
+        raise ValueError(f"{value!r} is not a boolean")
+    if value in (0, 1):
+        return bool(value)
+    raise ValueError(f"{value!r} is not a boolean")
+
+
+def _to_str(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (int, float)):
+        return str(value)
+    raise ValueError(f"{value!r} is not text")
+
+
+def _nullable(convert: Callable[[Any], Any], empty_is_none: bool) -> Callable[[Any], Any]:
+    def converter(value: Any) -> Any:
+        if _is_missing(value) or (empty_is_none and value == ""):
+            return None
+        return convert(value)
+    return converter
+
+
+def _converter_for(column) -> Callable[[Any], Any]:
+    if isinstance(column.type, Boolean):
+        return _nullable(_to_bool, empty_is_none=True)
+    if isinstance(column.type, Integer):
+        return _nullable(_to_int, empty_is_none=True)
+    if isinstance(column.type, Float):
+        return _nullable(float, empty_is_none=True)
+    if isinstance(column.type, String):
+        return _nullable(_to_str, empty_is_none=False)
+    return _nullable(lambda value: value, empty_is_none=False)
+
+
+@lru_cache(maxsize=None)
+def column_converters(model) -> Dict[str, Tuple[str, Callable[[Any], Any]]]:
+    """Maps attribute and column names of a model to (column key, converter)."""
+    converters = {}
+    for attr in inspect(model).column_attrs:
+        column = attr.columns[0]
+        converters[attr.key] = converters[column.name] = (column.key, _converter_for(column))
+    return converters
+
+
+def prepare_records(model, records: Iterable[dict],
+                    key_columns: List[str]) -> Tuple[List[dict], List[Tuple[dict, str]]]:
+    """
+    Converts `records` (dicts keyed by attribute or column name) into rows of the table of
+    `model`, deduplicated on `key_columns`. Returns the rows and the rejected records
+    with the reason.
+    """
+    converters = column_converters(model)
+    key_columns = [converters[k][0] for k in key_columns]
+    rows: Dict[tuple, dict] = {}
+    rejected: List[Tuple[dict, str]] = []
+    seen, present = set(), set()
+
+    for record in records:
+        row = {}
+        try:
+            for name, value in record.items():
+                if name in converters:
+                    column, convert = converters[name]
+                    row[column] = convert(value)
+        except (ValueError, TypeError) as e:
+            rejected.append((record, f"{name}: {e}"))
+            continue
+        key = tuple(row.get(k) for k in key_columns)
+        if None in key:
+            rejected.append((record, "missing primary key"))
+            continue
+        seen.update(row)
+        present.update(k for k, v in row.items() if v is not None)
+        rows.pop(key, None)  # re-insert, so the order is that of the last occurrence
+        rows[key] = row
+
+    all_none = seen - present
+    if all_none:
+        return [{k: v for k, v in row.items() if k not in all_none}
+                for row in rows.values()], rejected
+    return list(rows.values()), rejected
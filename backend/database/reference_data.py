@@ -0,0 +1,202 @@
+"""
+This script keeps an immutable in-memory snapshot of the reference data
+(requirements, departments, semesters and the requirement tree) served on every page load.
+
+The snapshot holds the rows and the pre-serialized JSON response bodies. It is built
+at startup and after each data load, and swapped in with a single assignment, so
+readers always see one consistent version without touching the database. Other
+worker processes notice a new data version within REFRESH_CHECK_SECONDS, or on their
+first read after switching to another snapshot database (see db.sync_database_binding),
+so the reference bodies switch together with every other endpoint.
+"""
+
+import json
+import logging
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
+from sqlalchemy.orm import Session
+from .models import Requirement, Audit, Department, Course, Offering, CountsFor
+from .data_version import get_data_version
+from .forecasts import semester_sort_key
+
+REFRESH_CHECK_SECONDS = 30
+REQUIREMENT_SEPARATOR = "---"
+QATAR_CAMPUS_ID = 2
+
+
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    """Reference rows and their serialized responses for one data version."""
+    data_version: int
+    requirements: tuple
+    departments: tuple
+    department_names: Mapping[str, str]
+    semesters: tuple
+    requirements_body: bytes
+    departments_body: bytes
+    semesters_body: bytes
+    requirement_tree_body: bytes
+
+
+_snapshot: Optional[ReferenceSnapshot] = None
+_checked_at = 0.0
+# Database the data version was last checked against
+_checked_url: Optional[str] = None
+
+
+def _dumps(payload: dict) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _department_sort_key(dep_code: str):
+    """Numeric codes in numeric order, then the others alphabetically."""
+    return (int(dep_code) if dep_code.isdigit() else 999999, dep_code)
+
+
+def _new_node(name: str, path: Optional[str]) -> dict:
+    return {"name": name, "path": path, "is_requirement": False,
+            "courses": set(), "children": {}}
+
+
+def _finish_node(node: dict, qatar_courses: set) -> set:
+    """
+    Aggregates distinct courses bottom-up, replacing the working fields of a node
+    with its counts and ordered children. Returns the node's course set.
+    """
+    courses = node.pop("courses")
+    children = []
+    for child in node.pop("children").values():
+        courses |= _finish_node(child, qatar_courses)
+        children.append(child)
+    node["num_courses"] = len(courses)
+    node["num_qatar_courses"] = len(courses & qatar_courses)
+    node["children"] = children
+    return courses
+
+
+def build_requirement_tree(requirement_rows, countsfor_rows, qatar_courses: set) -> list[dict]:
+    """
+    Parses the `---`-joined requirement chains of each audit into a tree. Every node
+    carries the number of distinct courses satisfying it or any requirement below it,
+    and how many of those are offered in Qatar.
+
+    requirement_rows: (requirement, audit_id, audit_name, audit_type, major) tuples.
+    countsfor_rows: (requirement, course_code) tuples.
+    """
+    courses_by_requirement: dict[str, set] = {}
+    for requirement, course_code in countsfor_rows:
+        courses_by_requirement.setdefault(requirement, set()).add(course_code)
+
+    audits: dict[str, dict] = {}
+    for requirement, audit_id, audit_name, audit_type, major in sorted(requirement_rows):
+        audit = audits.get(audit_id)
+        if audit is None:
+            audit = _new_node(audit_name or audit_id, None)
+            audit.update({"audit_id": audit_id, "major": major, "type": bool(audit_type)})
+            audits[audit_id] = audit
+
+        node = audit
+        parts = requirement.split(REQUIREMENT_SEPARATOR)
+        # The chains start with the audit name, which the audit root already stands for
+        start = 2 if len(parts) > 1 and parts[0] == audit["name"] else 1
+        for depth, part in enumerate(parts[start - 1:], start=start):
+            if part not in node["children"]:
+                node["children"][part] = _new_node(
+                    part, REQUIREMENT_SEPARATOR.join(parts[:depth]))
+            node = node["children"][part]
+        node["is_requirement"] = True
+        node["courses"] |= courses_by_requirement.get(requirement, set())
+
+    trees = []
+    for audit_id in sorted(audits, key=lambda a: (audits[a]["major"] or "", a)):
+        audit = audits[audit_id]
+        _finish_node(audit, qatar_courses)
+        del audit["path"], audit["is_requirement"]
+        trees.append(audit)
+    return trees
+
+
+def build_reference_snapshot(db: Session) -> ReferenceSnapshot:
+    """Reads the reference tables once and serializes their responses."""
+    version = get_data_version(db)
+
+    requirements = tuple(
+        {"requirement": requirement, "type": bool(audit_type), "major": major}
+        for requirement, audit_type, major in (
+            db.query(Requirement.requirement, Audit.type, Audit.major)
+            .join(Audit, Requirement.audit_id == Audit.audit_id)
+            .all()
+        )
+    )
+
+    department_rows = db.query(Department.dep_code, Department.name).all()
+    with_courses = {code for (code,) in db.query(Course.dep_code).distinct().all()}
+    departments = tuple(sorted(
+        ((code, name or "") for code, name in department_rows if code in with_courses),
+        key=lambda dep: _department_sort_key(dep[0])
+    ))
+
+    semesters = tuple(sorted(
+        (sem for (sem,) in db.query(Offering.semester).distinct().all() if sem),
+        key=semester_sort_key
+    ))
+
+    requirement_tree = build_requirement_tree(
+        db.query(Requirement.requirement, Audit.audit_id, Audit.name, Audit.type, Audit.major)
+        .join(Audit, Requirement.audit_id == Audit.audit_id)
+        .all(),
+        db.query(CountsFor.requirement, CountsFor.course_code).all(),
+        {code for (code,) in db.query(Offering.course_code)
+         .filter(Offering.campus_id == QATAR_CAMPUS_ID).distinct().all()},
+    )
+
+    return ReferenceSnapshot(
+        data_version=version,
+        requirements=requirements,
+        departments=departments,
+        department_names=MappingProxyType({code: name for code, name in department_rows}),
+        semesters=semesters,
+        requirements_body=_dumps({"requirements": list(requirements)}),
+        departments_body=_dumps({"departments": [
+            {"dep_code": code, "name": name} for code, name in departments
+        ]}),
+        semesters_body=_dumps({"semesters": list(semesters)}),
+        requirement_tree_body=_dumps({"audits": requirement_tree}),
+    )
+
+
+def _database_url(db: Session) -> str:
+    return str(db.get_bind().url)
+
+
+def refresh_reference_snapshot(db: Session) -> ReferenceSnapshot:
+    """Builds a new snapshot and swaps it in atomically."""
+    global _snapshot, _checked_at, _checked_url  # pylint: disable=global-statement
+    snapshot = build_reference_snapshot(db)
+    _snapshot = snapshot
+    _checked_at = time.monotonic()
+    _checked_url = _database_url(db)
+    logging.info("Reference data snapshot refreshed (data version %d).", snapshot.data_version)
+    return snapshot
+
+
+def get_reference_snapshot(db: Session) -> ReferenceSnapshot:
+    """
+    Returns the current snapshot, building it on first use. At most every
+    REFRESH_CHECK_SECONDS, and whenever `db` is bound to another database than at the
+    last check (a published or rolled back snapshot), the data version is compared, so
+    snapshots built by another process's upload are picked up.
+    """
+    global _checked_at, _checked_url  # pylint: disable=global-statement
+    snapshot = _snapshot
+    now = time.monotonic()
+    url = _database_url(db)
+    if snapshot is not None and url == _checked_url and now - _checked_at < REFRESH_CHECK_SECONDS:
+        return snapshot
+
+    _checked_at, _checked_url = now, url
+    if snapshot is not None and get_data_version(db) == snapshot.data_version:
+        return snapshot
+    return refresh_reference_snapshot(db)
@@ -0,0 +1,154 @@
+"""
+This script maintains the enrollment rollup tables.
+
+The rollups hold enrollment totals per department and per requirement (by semester,
+class year and campus) so that analytics never have to scan and join the raw
+enrollment table. They are refreshed incrementally by the loader: only the
+semesters present in a new enrollment file are recomputed.
+
+The instructor aggregates (teaching load per semester and requirements covered)
+are small and are rebuilt in full whenever instructors, countsfor or enrollment change.
+"""
+
+import logging
+from typing import Iterable, Optional
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from .models import Course, CountsFor, CourseInstructor, Enrollment, Offering
+from .models import EnrollmentDepartmentRollup, EnrollmentRequirementRollup
+from .models import InstructorLoad, InstructorRequirement
+
+ROLLUP_COLUMNS = ["semester", "class", "campus_id", "enrollment_count"]
+
+
+def _grouped_enrollment(key_column, semesters: Optional[list[str]]):
+    """Builds the SELECT summing enrollment per (key, semester, class, campus)."""
+    class_col = func.coalesce(Enrollment.class_, 0)
+    campus_col = func.coalesce(Offering.campus_id, 0)
+    query = (
+        select(
+            key_column,
+            Offering.semester,
+            class_col,
+            campus_col,
+            func.sum(Enrollment.enrollment_count),
+        )
+        .select_from(Enrollment)
+        .join(Offering, Enrollment.offering_id == Offering.offering_id)
+    )
+    if semesters is not None:
+        query = query.where(Offering.semester.in_(semesters))
+    return query, [key_column, Offering.semester, class_col, campus_col]
+
+
+def refresh_department_rollup(db: Session, semesters: Optional[Iterable[str]] = None) -> None:
+    """Recomputes department enrollment totals for the given semesters (all when None)."""
+    semesters = sorted(set(semesters)) if semesters is not None else None
+
+    query, group_cols = _grouped_enrollment(Course.dep_code, semesters)
+    query = (
+        query.join(Course, Course.course_code == Offering.course_code)
+        .where(Course.dep_code.isnot(None))
+        .group_by(*group_cols)
+    )
+
+    stale = delete(EnrollmentDepartmentRollup)
+    if semesters is not None:
+        stale = stale.where(EnrollmentDepartmentRollup.semester.in_(semesters))
+    db.execute(stale)
+    db.execute(insert(EnrollmentDepartmentRollup).from_select(["dep_code"] + ROLLUP_COLUMNS,
+                                                              query))
+
+
+def refresh_requirement_rollup(db: Session, semesters: Optional[Iterable[str]] = None) -> None:
+    """Recomputes requirement enrollment totals for the given semesters (all when None)."""
+    semesters = sorted(set(semesters)) if semesters is not None else None
+
+    query, group_cols = _grouped_enrollment(CountsFor.requirement, semesters)
+    query = (
+        query.join(CountsFor, CountsFor.course_code == Offering.course_code)
+        .group_by(*group_cols)
+    )
+
+    stale = delete(EnrollmentRequirementRollup)
+    if semesters is not None:
+        stale = stale.where(EnrollmentRequirementRollup.semester.in_(semesters))
+    db.execute(stale)
+    db.execute(insert(EnrollmentRequirementRollup).from_select(["requirement"] + ROLLUP_COLUMNS,
+                                                               query))
+
+
+def refresh_enrollment_rollups(db: Session, semesters: Optional[Iterable[str]] = None) -> None:
+    """
+    Recomputes every enrollment rollup for the given semesters and commits.
+    Passing None rebuilds the rollups from scratch.
+    """
+    semesters = sorted(set(semesters)) if semesters is not None else None
+    logging.info("Refreshing enrollment rollups for semesters: %s",
+                 semesters if semesters is not None else "ALL")
+    try:
+        refresh_department_rollup(db, semesters)
+        refresh_requirement_rollup(db, semesters)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def backfill_enrollment_rollups(db: Session) -> None:
+    """Builds the rollups from scratch if they are empty but enrollment data exists."""
+    has_rollups = db.query(EnrollmentDepartmentRollup.dep_code).first() is not None
+    has_enrollment = db.query(Enrollment.enrollment_id).first() is not None
+    if has_enrollment and not has_rollups:
+        refresh_enrollment_rollups(db)
+
+
+def refresh_instructor_rollups(db: Session) -> None:
+    """
+    Rebuilds the instructor load and requirement aggregates and commits.
+    course_instructor has no semester, so every instructor of a course is credited
+    with the course's full enrollment in each semester it was offered.
+    """
+    logging.info("Refreshing instructor rollups...")
+    offered = (
+        select(
+            CourseInstructor.andrew_id,
+            Offering.semester,
+            func.count(func.distinct(Offering.course_code)),
+            func.coalesce(func.sum(Enrollment.enrollment_count), 0),
+        )
+        .select_from(CourseInstructor)
+        .join(Offering, Offering.course_code == CourseInstructor.course_code)
+        .outerjoin(Enrollment, Enrollment.offering_id == Offering.offering_id)
+        .group_by(CourseInstructor.andrew_id, Offering.semester)
+    )
+    covered = (
+        select(
+            CourseInstructor.andrew_id,
+            CountsFor.requirement,
+            func.count(func.distinct(CourseInstructor.course_code)),
+        )
+        .select_from(CourseInstructor)
+        .join(CountsFor, CountsFor.course_code == CourseInstructor.course_code)
+        .group_by(CourseInstructor.andrew_id, CountsFor.requirement)
+    )
+    try:
+        db.execute(delete(InstructorLoad))
+        db.execute(insert(InstructorLoad).from_select(
+            ["andrew_id", "semester", "num_courses", "enrollment_count"], offered))
+        db.execute(delete(InstructorRequirement))
+        db.execute(insert(InstructorRequirement).from_select(
+            ["andrew_id", "requirement", "num_courses"], covered))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def backfill_instructor_rollups(db: Session) -> None:
+    """Builds the instructor aggregates if they are empty but instructors exist."""
+    has_rollups = db.query(InstructorRequirement.andrew_id).first() is not None \
+        or db.query(InstructorLoad.andrew_id).first() is not None
+    has_instructors = db.query(CourseInstructor.andrew_id).first() is not None
+    if has_instructors and not has_rollups:
+        refresh_instructor_rollups(db)
@@ -0,0 +1,237 @@
+"""
+This script computes the diff of a load against the current tables.
+
+The loader stores a content hash of every row it writes in the row_hash table. Before
+writing, the incoming rows of a table are compared with the stored hashes:
+
+- rows whose key is not in the table are inserted,
+- rows whose hash differs (or that have no stored hash yet) are updated,
+- rows whose hash matches are skipped.
+
+When the load is the complete source of a table, rows of the table that are missing
+from it are stale and deleted, except rows still referenced by another table (e.g. a
+dropped course that has enrollment history), which are kept. Tables in PRUNE_SCOPES
+are only complete per scope value: only stale rows sharing a scope value with the
+incoming rows are deleted. A scope value may be reached through foreign keys, e.g. the
+major of the audit that a countsfor row's requirement belongs to.
+"""
+
+import hashlib
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.orm import Session
+from .models import Base, RowHash
+from .upsert import MAX_REPORTED_ERRORS, column_keys
+
+# Columns limiting which stale rows a load may delete, by table: an enrollment file
+# replaces the sections of the offerings it contains, not every other semester, and an
+# audit upload replaces the audits of the majors it contains, not every other major.
+# A path starts at a column of the table and follows its foreign key at every step.
+PRUNE_SCOPES = {
+    "enrollment": ["offering_id"],
+    "audit": ["major"],
+    "requirement": ["audit_id", "major"],
+    "countsfor": ["requirement", "audit_id", "major"],
+}
+
+DELETE_CHUNK_SIZE = 500
+
+KEY_SEPARATOR = "\x1f"
+
+
+@dataclass
+class ChunkStats:
+    """Outcome of writing one chunk (one transaction) of a table's changed rows."""
+    rows: int
+    written: int
+    failed: int
+    seconds: float
+
+
+@dataclass
+class TableDiff:
+    """Rows inserted, updated, left unchanged, deleted and failed while loading a table."""
+    table: str
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    failed: int = 0
+    chunks: List[ChunkStats] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    changed_rows: List[dict] = field(default_factory=list, repr=False)
+    # key of each changed row (None for rows without a primary key), hash of every row
+    changed_keys: List[Optional[str]] = field(default_factory=list, repr=False)
+    hashes: Dict[str, str] = field(default_factory=dict, repr=False)
+
+    @property
+    def changed(self) -> bool:
+        """Whether the load modified the table."""
+        return bool(self.inserted or self.updated or self.deleted)
+
+    def report_errors(self, errors: Iterable[Tuple[dict, str]]) -> None:
+        """Keeps the errors of failed records for the report, up to MAX_REPORTED_ERRORS
+        (the records are counted in `failed` separately)."""
+        for record, error in errors:
+            if len(self.errors) >= MAX_REPORTED_ERRORS:
+                break
+            self.errors.append(f"{error} (record: {record!r:.200})")
+
+    def summary(self) -> dict:
+        """The counts and reported errors, as returned by the upload job."""
+        counts = asdict(self)
+        for name in ("table", "changed_rows", "hashes", "changed_keys"):
+            del counts[name]
+        return counts
+
+    def hash_records(self, keys: Iterable[Optional[str]]) -> List[dict]:
+        """row_hash records for the rows with the given keys."""
+        return [{"table_name": self.table, "row_key": key, "hash": self.hashes[key]}
+                for key in keys if key is not None]
+
+
+def _key_value(value):
+    # pandas turns integer columns with gaps into floats; 3.0 and 3 are the same key
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def row_key(row: dict, key_columns: Sequence[str]) -> str:
+    """The primary key of a row as stored in row_hash."""
+    if len(key_columns) == 1:
+        return str(_key_value(row[key_columns[0]]))
+    return KEY_SEPARATOR.join(str(_key_value(row[k])) for k in key_columns)
+
+
+def row_hash(row: dict) -> str:
+    """Content hash of the columns present in a row."""
+    return hashlib.blake2b(repr(sorted(row.items())).encode(), digest_size=16).hexdigest()
+
+
+def _chunks(values: Sequence, size: int = DELETE_CHUNK_SIZE) -> Iterable[Sequence]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _referencing_columns(table) -> List[Tuple[object, str]]:
+    """(referencing column, referenced column key) for every foreign key to `table`."""
+    return [(fk.parent, fk.column.key)
+            for other in Base.metadata.sorted_tables if other is not table
+            for fk in other.foreign_keys if fk.column.table is table]
+
+
+def _scope_values(db: Session, table, path: List[str], values: set) -> dict:
+    """Maps values of the first column of a PRUNE_SCOPES path to the scope they belong to."""
+    mapping = {value: value for value in values}
+    column = table.c[path[0]]
+    for next_key in path[1:]:
+        (fk,) = column.foreign_keys
+        parent = fk.column.table
+        reached = {}
+        for chunk in _chunks(sorted({v for v in mapping.values() if v is not None})):
+            reached.update(db.execute(select(fk.column, parent.c[next_key])
+                                      .where(fk.column.in_(chunk))).all())
+        mapping = {value: reached.get(step) for value, step in mapping.items()}
+        column = parent.c[next_key]
+    return mapping
+
+
+def diff_rows(db: Session, model, records: Iterable[dict], key_columns: List[str],
+              prune: bool = False) -> Tuple[TableDiff, List[dict]]:
+    """
+    Compares `records` (dicts keyed by attribute or column name) with the current rows
+    of the table of `model`. Returns the diff, whose `changed_rows` are the records to
+    write, and the stale rows to delete when `prune` is set (else an empty list).
+    """
+    table = model.__table__
+    keys = column_keys(model)
+    key_columns = [keys[k] for k in key_columns]
+    scope_path = PRUNE_SCOPES.get(table.name)
+    scope_column = scope_path[0] if scope_path else None
+    diff = TableDiff(table.name)
+
+    incoming: Dict[str, dict] = {}
+    incoming_scopes = set()
+    for record in records:
+        row = {keys[k]: v for k, v in record.items() if k in keys}
+        if any(row.get(k) is None for k in key_columns):
+            diff.changed_rows.append(record)  # the upsert reports it as failed
+            diff.changed_keys.append(None)
+            continue
+        key = row_key(row, key_columns)
+        incoming[key] = record
+        diff.hashes[key] = row_hash(row)
+        if scope_column:
+            incoming_scopes.add(row.get(scope_column))
+
+    referenced = {key for _, key in _referencing_columns(table)}
+    columns = [table.c[k] for k in dict.fromkeys(
+        key_columns + ([scope_column] if scope_column else []) + sorted(referenced))]
+    names = [c.key for c in columns]
+    existing = {}
+    for values in db.execute(select(*columns)).all():
+        row = dict(zip(names, values))
+        existing[row_key(row, key_columns)] = row
+    # Core columns: loading ORM rows costs more than the comparison itself
+    hashes = RowHash.__table__.c
+    stored = dict(db.execute(select(hashes.row_key, hashes.hash)
+                             .where(hashes.table_name == table.name)).all())
+
+    for key, record in incoming.items():
+        if key not in existing:
+            diff.inserted += 1
+        elif stored.get(key) != diff.hashes[key]:
+            diff.updated += 1
+        else:
+            diff.unchanged += 1
+            continue
+        diff.changed_rows.append(record)
+        diff.changed_keys.append(key)
+
+    stale = []
+    if prune:
+        stale = [row for key, row in existing.items() if key not in incoming]
+        if scope_column:
+            scope_of = _scope_values(db, table, scope_path,
+                                     incoming_scopes | {row[scope_column] for row in stale})
+            scopes = {scope_of[value] for value in incoming_scopes} - {None}
+            stale = [row for row in stale if scope_of[row[scope_column]] in scopes]
+    return diff, stale
+
+
+def _still_referenced(db: Session, table, stale: List[dict]) -> set:
+    """Values of the referenced columns of `stale` rows that other tables still use."""
+    used = set()
+    for column, key in _referencing_columns(table):
+        values = sorted({row[key] for row in stale if row[key] is not None})
+        for chunk in _chunks(values):
+            used.update((key, value) for (value,) in
+                        db.execute(select(column).where(column.in_(chunk)).distinct()))
+    return used
+
+
+def delete_stale_rows(db: Session, model, stale: List[dict], key_columns: List[str]) -> int:
+    """
+    Deletes the `stale` rows (as returned by `diff_rows`) that no other table references,
+    along with their hashes. Returns the number of rows deleted. Does not commit.
+    """
+    table = model.__table__
+    keys = column_keys(model)
+    key_columns = [keys[k] for k in key_columns]
+    used = _still_referenced(db, table, stale)
+    deletable = [row for row in stale
+                 if not any((key, value) in used for key, value in row.items())]
+
+    for chunk in _chunks(deletable):
+        if len(key_columns) == 1:
+            condition = table.c[key_columns[0]].in_([row[key_columns[0]] for row in chunk])
+        else:
+            condition = tuple_(*(table.c[k] for k in key_columns)).in_(
+                [tuple(row[k] for k in key_columns) for row in chunk])
+        db.execute(delete(table).where(condition))
+        db.execute(delete(RowHash).where(
+            RowHash.table_name == table.name,
+            RowHash.row_key.in_([row_key(row, key_columns) for row in chunk])))
+    return len(deletable)
@@ -0,0 +1,244 @@
+"""
+This script implements zero-downtime data refreshes with database snapshots.
+
+An upload never writes to the database that is being served. Instead:
+
+1. `staging_snapshot()` copies the live SQLite file (with SQLite's online backup
+   API, so concurrent readers are not disturbed) into a new staging file next to it
+   (`<db>.staging-<timestamp>`) and hands out a session factory bound to that copy;
+2. every load stage writes into the copy;
+3. on success the copy is renamed to `<db>.snapshot-<timestamp>` (old snapshots are
+   pruned by name, so a copy still loading is never pruned), the pointer file is
+   replaced atomically to name it, and
+   this process rebinds its session factories to it (other workers follow within
+   POINTER_CHECK_SECONDS). On failure the copy is deleted and nothing changes.
+
+Requests already running keep their connection to the old snapshot; the old engines
+are disposed once those connections have been returned. The pointer also remembers
+the previous snapshot, so `rollback_snapshot()` is a pointer flip. A snapshot whose
+data changed is published with a data version above that of every other snapshot, so
+a version is never reused after a rollback (caches are keyed on it).
+
+Databases other than SQLite files are loaded in place.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+from backend.database import db as database
+from backend.database.data_version import get_data_version
+from backend.database.models import DataVersion
+from backend.database.reference_data import refresh_reference_snapshot
+
+SNAPSHOT_INFIX = ".snapshot-"
+# Snapshots being loaded; renamed to SNAPSHOT_INFIX when published, so pruning (which
+# may run in another process) never deletes a load in progress
+STAGING_INFIX = ".staging-"
+DRAIN_TIMEOUT_SECONDS = 60.0
+
+
+@dataclass
+class StagingSnapshot:
+    """A database being loaded. `in_place` is True when it is the live database."""
+    url: str
+    session_factory: sessionmaker
+    engine: Optional[Engine] = None
+    path: Optional[str] = None
+    in_place: bool = False
+
+
+def _base_path() -> Optional[str]:
+    return database.sqlite_file_path(database.DATABASE_URL)
+
+
+def _snapshot_path(infix: str = SNAPSHOT_INFIX, stamp: Optional[str] = None) -> str:
+    base, ext = os.path.splitext(_base_path())
+    stamp = stamp or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    return f"{base}{infix}{stamp}{ext or '.sqlite'}"
+
+
+def _copy_database(source_path: str, target_path: str) -> None:
+    """Copies a consistent image of a (possibly busy) SQLite database."""
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        with target:
+            source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def _remove_database_file(path: str) -> None:
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def _read_data_version(path: str) -> int:
+    """The data version stored in a SQLite file (0 if it has none or can't be read)."""
+    try:
+        # mode=rw: never creates the file, and sees commits still in the WAL
+        connection = sqlite3.connect(f"file:{path}?mode=rw", uri=True)
+    except sqlite3.Error:
+        return 0
+    try:
+        row = connection.execute("SELECT version FROM data_version WHERE id = 1").fetchone()
+        return (row[0] or 0) if row else 0
+    except sqlite3.Error:
+        return 0
+    finally:
+        connection.close()
+
+
+def _snapshot_files() -> list:
+    """Paths of the base database file and of every snapshot file next to it."""
+    directory = os.path.dirname(_base_path()) or "."
+    stem = os.path.splitext(os.path.basename(_base_path()))[0] + SNAPSHOT_INFIX
+    return [_base_path()] + [
+        os.path.join(directory, name) for name in sorted(os.listdir(directory))
+        if name.startswith(stem) and not name.endswith(("-wal", "-shm", "-journal"))]
+
+
+def _staged_data_version(staging: StagingSnapshot) -> int:
+    with staging.session_factory() as db:
+        return get_data_version(db)
+
+
+def _make_data_version_unique(staging: StagingSnapshot) -> None:
+    """
+    Sets the data version of a changed snapshot above that of every other snapshot.
+    Versions key the analytics caches, so a version must never name two different data
+    sets: after a rollback, the next upload would otherwise bump the restored snapshot
+    to the version of the snapshot rolled back from.
+    """
+    highest = max((_read_data_version(p) for p in _snapshot_files()
+                   if p != staging.path and os.path.exists(p)), default=0)
+    with staging.session_factory() as db:
+        row = db.get(DataVersion, 1)
+        if row.version <= highest:
+            row.version = highest + 1
+            db.commit()
+        logging.info("Snapshot %s has data version %d", staging.path, row.version)
+
+
+def _write_pointer(current: str, previous: Optional[str]) -> None:
+    """Atomically replaces the pointer file."""
+    pointer = database.pointer_file_path()
+    tmp = f"{pointer}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"current": current, "previous": previous}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, pointer)
+
+
+def _current_snapshot_name() -> str:
+    return os.path.basename(database.sqlite_file_path(database.active_database_url()))
+
+
+def _prune_snapshots(keep: set) -> None:
+    """Deletes snapshot files other than the current and previous ones."""
+    directory = os.path.dirname(_base_path()) or "."
+    stem = os.path.splitext(os.path.basename(_base_path()))[0] + SNAPSHOT_INFIX
+    for name in os.listdir(directory):
+        if name.startswith(stem) and name not in keep and not name.endswith(
+                ("-wal", "-shm", "-journal")):
+            logging.info("Removing old database snapshot %s", name)
+            _remove_database_file(os.path.join(directory, name))
+
+
+def _switch_to(current: str, previous: Optional[str]) -> None:
+    """Points the pointer and this process at `current`, then drains the old engines."""
+    _write_pointer(current, previous)
+    directory = os.path.dirname(_base_path())
+    old_engines = database.bind_database(f"sqlite:///{os.path.join(directory, current)}")
+
+    with database.SessionLocal() as db:
+        refresh_reference_snapshot(db)
+
+    def drain():
+        database.drain_engines(old_engines, timeout=DRAIN_TIMEOUT_SECONDS)
+        _prune_snapshots({current, previous})
+
+    threading.Thread(target=drain, name="db-snapshot-drain", daemon=True).start()
+
+
+def publish_snapshot(path: str) -> None:
+    """Makes the snapshot at `path` the live database."""
+    previous = _current_snapshot_name()
+    logging.info("Publishing database snapshot %s (previous: %s)", path, previous)
+    _switch_to(os.path.basename(path), previous)
+
+
+def rollback_snapshot() -> str:
+    """
+    Switches back to the previous snapshot (and remembers the current one as previous).
+    Returns the name of the snapshot now live. Raises ValueError if there is none.
+    """
+    if not _base_path():
+        raise ValueError("Snapshots are only supported for SQLite database files.")
+    pointer = database.read_pointer()
+    previous = pointer.get("previous")
+    directory = os.path.dirname(_base_path())
+    if not previous or not os.path.exists(os.path.join(directory, previous)):
+        raise ValueError("No previous database snapshot to roll back to.")
+    current = pointer.get("current") or _current_snapshot_name()
+    logging.info("Rolling back database snapshot %s to %s", current, previous)
+    _switch_to(previous, current)
+    return previous
+
+
+@contextmanager
+def staging_snapshot(before_publish: Optional[Callable[[], None]] = None):
+    """
+    Yields a StagingSnapshot to load data into. The snapshot is published when the
+    block exits normally and discarded when it raises. `before_publish` is called right
+    before publishing; if it raises, the snapshot is discarded instead.
+    """
+    database.sync_database_binding()
+    if not _base_path():
+        yield StagingSnapshot(url=database.bound_database_url,
+                              session_factory=database.SessionLocal, in_place=True)
+        if before_publish is not None:
+            before_publish()
+        return
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    path = _snapshot_path(STAGING_INFIX, stamp)
+    live_path = database.sqlite_file_path(database.bound_database_url)
+    logging.info("Staging database snapshot %s from %s", path, live_path)
+    _copy_database(live_path, path)
+
+    url = f"sqlite:///{path}"
+    engine = database.create_db_engine(url, database.DB_PROFILE)
+    staging = StagingSnapshot(url=url, engine=engine, path=path,
+                              session_factory=sessionmaker(autocommit=False, autoflush=False,
+                                                           bind=engine))
+    source_version = _staged_data_version(staging)
+    try:
+        yield staging
+        if _staged_data_version(staging) != source_version:
+            _make_data_version_unique(staging)
+        if before_publish is not None:
+            before_publish()
+    except BaseException:
+        engine.dispose()
+        _remove_database_file(path)
+        logging.info("Discarded database snapshot %s", path)
+        raise
+    # closing the last connection checkpoints the WAL into the snapshot file
+    engine.dispose()
+    staging.path = _snapshot_path(SNAPSHOT_INFIX, stamp)
+    os.replace(path, staging.path)
+    publish_snapshot(staging.path)
@@ -1,22 +1,30 @@
 """
 This script is used to export the database tables to CSV files. for easy viewing and editing.
+
+Rows are streamed from the database EXPORT_CHUNK_SIZE at a time, so memory stays bounded,
+and each file is written to a temporary file that then replaces the CSV atomically:
+readers never see a half-written export. After an upload only the tables whose contents
+changed are exported again (`export_changed_tables`).
 """
+import csv
 import os
-import pandas as pd
-from sqlalchemy import create_engine
+import tempfile
+from typing import Iterable, Optional
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 from sqlalchemy.orm import Session
 from .models import Base
+from .db import SessionLocal
+
+DEFAULT_OUTPUT_DIR = os.getenv("CSV_EXPORT_DIR", os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "../../data/csv_exports")))
 
-# Load database URL (Default: SQLite)
-DATABASE_URL = "sqlite:///backend/database/gened_db.sqlite"
+EXPORT_CHUNK_SIZE = 2000
 
 # Define the tables you want to export
 # tables = [ ... ] # Removed hardcoded list
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
 # Define the models explicitly if Base.metadata.tables isn't reliable or desired
 # Alternatively, rely on Base.metadata.tables which should be populated after model definition
 # Example: table_models = { 'department': Department, 'course': Course, ... }
@@ -45,7 +53,7 @@ def export_tables_to_csv(session: Session = None,
 
     if output_dir is None:
         # Default output directory relative to this file's location
-        output_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../data/csv_exports"))
+        output_dir = DEFAULT_OUTPUT_DIR
 
     logging.info(f"Exporting tables to CSV in directory: {output_dir}")
 
@@ -74,10 +82,8 @@ def export_tables_to_csv(session: Session = None,
             csv_file_path = os.path.join(output_dir, f"{table_name}.csv")
             logging.debug(f"Attempting to export table '{table_name}' to '{csv_file_path}'")
             try:
-                # Use pandas to read SQL table and write to CSV
                 # Using the session's connection for transaction context
-                df = pd.read_sql_table(table_name, con=session.connection())
-                df.to_csv(csv_file_path, index=False, encoding='utf-8')
+                _write_table_csv(session, Base.metadata.tables[table_name], csv_file_path)
                 results[table_name] = "success"
                 logging.info(f"Successfully exported table '{table_name}' to {csv_file_path}")
             except SQLAlchemyError as e:
@@ -88,7 +94,7 @@ def export_tables_to_csv(session: Session = None,
                 error_msg = f"IOError writing CSV for table {table_name} to {csv_file_path}: {e}"
                 logging.error(error_msg)
                 results[table_name] = error_msg
-            except Exception as e: # Catch other potential errors like pandas issues
+            except Exception as e: # Catch other potential errors like unknown tables
                 error_msg = f"Unexpected error exporting table {table_name}: {e}"
                 logging.exception(error_msg) # Use exception for full traceback
                 results[table_name] = error_msg
@@ -111,5 +117,41 @@ def export_tables_to_csv(session: Session = None,
 
     return results
 
+def _write_table_csv(session: Session, table, csv_file_path: str) -> None:
+    """Streams the rows of `table` into a temporary file that then replaces `csv_file_path`."""
+    directory, name = os.path.split(csv_file_path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow([column.name for column in table.columns])
+            result = session.connection().execution_options(yield_per=EXPORT_CHUNK_SIZE) \
+                .execute(select(table))
+            for rows in result.partitions():
+                writer.writerows(rows)
+        os.replace(tmp_path, csv_file_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def export_changed_tables(changed_tables: Iterable[str], table_names: list[str],
+                          output_dir: Optional[str] = None,
+                          session: Optional[Session] = None) -> dict:
+    """
+    Post-ingestion export: rewrites the CSVs of the tables in `table_names` whose contents
+    changed, or that have no CSV yet, from `session` (by default the live database).
+    """
+    output_dir = output_dir or DEFAULT_OUTPUT_DIR
+    changed_tables = set(changed_tables)
+    to_export = [t for t in table_names if t in changed_tables
+                 or not os.path.exists(os.path.join(output_dir, f"{t}.csv"))]
+    if not to_export:
+        logging.info("CSV exports are up to date.")
+        return {}
+    return export_tables_to_csv(session=session, output_dir=output_dir, table_names=to_export)
+
+
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     export_tables_to_csv()
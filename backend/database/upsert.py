@@ -0,0 +1,147 @@
+"""
+This script implements the bulk upserts used by the loader.
+
+Records are written with `INSERT ... ON CONFLICT (primary key) DO UPDATE` on SQLite and
+PostgreSQL, UPSERT_BATCH_SIZE rows per statement execution (executemany). Only the
+columns present in a record are written, so columns missing from the source keep their
+stored values. Other dialects fall back to `Session.merge` per record.
+
+Each batch runs in a savepoint. When a batch fails it is rolled back and retried row by
+row, each row in its own savepoint, so only the offending rows fail; they are reported
+in the UpsertResult.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence, Tuple
+from sqlalchemy import inspect
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+UPSERT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 20
+
+DIALECT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+@dataclass
+class UpsertResult:
+    """Outcome of upserting the records of one table."""
+    table: str
+    written: int = 0
+    failed: int = 0
+    errors: List[Tuple[dict, str]] = field(default_factory=list)
+
+    def add_error(self, record: dict, message: str) -> None:
+        """Counts a failed record, keeping the first MAX_REPORTED_ERRORS for reporting."""
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((record, message))
+
+
+def column_keys(model) -> Dict[str, str]:
+    """Maps attribute names and column names of a model to its table's column keys."""
+    keys = {}
+    for attr in inspect(model).column_attrs:
+        column = attr.columns[0]
+        keys[attr.key] = column.key
+        keys[column.name] = column.key
+    return keys
+
+
+def _chunks(rows: Sequence[dict], size: int) -> Iterable[Sequence[dict]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _upsert_statement(insert, table, columns: Tuple[str, ...], key_columns: List[str]):
+    stmt = insert(table)
+    update_columns = [c for c in columns if c not in key_columns]
+    if not update_columns:
+        return stmt.on_conflict_do_nothing(index_elements=key_columns)
+    return stmt.on_conflict_do_update(index_elements=key_columns,
+                                      set_={c: stmt.excluded[c] for c in update_columns})
+
+
+def _begin_sqlite_transaction(db: Session) -> None:
+    """
+    pysqlite opens its transaction lazily before the first DML statement; a SAVEPOINT
+    issued before that would start an independent transaction that RELEASE commits.
+    """
+    dbapi_connection = db.connection().connection.dbapi_connection
+    if not dbapi_connection.in_transaction:
+        dbapi_connection.execute("BEGIN")
+
+
+def _write_batch(db: Session, stmt, batch: Sequence[dict], result: UpsertResult) -> None:
+    try:
+        with db.begin_nested():
+            db.execute(stmt, list(batch))
+        result.written += len(batch)
+        return
+    except SQLAlchemyError as e:
+        if len(batch) == 1:
+            result.add_error(batch[0], str(e.orig if hasattr(e, "orig") else e))
+            return
+        logging.warning("Batch of %d rows for %s failed, retrying row by row: %s",
+                        len(batch), result.table, e)
+
+    for row in batch:
+        try:
+            with db.begin_nested():
+                db.execute(stmt, [row])
+            result.written += 1
+        except SQLAlchemyError as e:
+            result.add_error(row, str(e.orig if hasattr(e, "orig") else e))
+
+
+def _merge_records(db: Session, model, rows: List[dict], result: UpsertResult) -> None:
+    """Per-record fallback for dialects without ON CONFLICT support."""
+    attributes = {column.key: attr.key for attr in inspect(model).column_attrs
+                  for column in attr.columns}
+    for row in rows:
+        try:
+            with db.begin_nested():
+                db.merge(model(**{attributes[k]: v for k, v in row.items()}))
+            result.written += 1
+        except SQLAlchemyError as e:
+            result.add_error(row, str(e))
+
+
+def upsert_records(db: Session, model, records: Iterable[dict], key_columns: List[str],
+                   batch_size: int = UPSERT_BATCH_SIZE) -> UpsertResult:
+    """
+    Inserts or updates `records` (dicts keyed by attribute or column name; unknown keys
+    are ignored) into the table of `model`, matching existing rows on `key_columns`.
+    Does not commit.
+    """
+    table = model.__table__
+    keys = column_keys(model)
+    key_columns = [keys[k] for k in key_columns]
+    result = UpsertResult(table.name)
+
+    # group by the set of columns present, so a record only overwrites what it contains
+    groups: Dict[Tuple[str, ...], List[dict]] = {}
+    for record in records:
+        row = {keys[k]: v for k, v in record.items() if k in keys}
+        if any(row.get(k) is None for k in key_columns):
+            result.add_error(record, "missing primary key")
+            continue
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+
+    dialect = db.get_bind().dialect.name
+    insert = DIALECT_INSERTS.get(dialect)
+    if insert is None:
+        for rows in groups.values():
+            _merge_records(db, model, rows, result)
+        return result
+
+    if dialect == "sqlite":
+        _begin_sqlite_transaction(db)
+    for columns, rows in groups.items():
+        stmt = _upsert_statement(insert, table, columns, key_columns)
+        for batch in _chunks(rows, batch_size):
+            _write_batch(db, stmt, batch, result)
+    return result
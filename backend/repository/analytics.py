@@ -3,9 +3,13 @@ this module contains the AnalyticsRepository class, which encapsulates
 database operations for analytics-related queries.
 """
 
-from typing import Optional
+from typing import List, Optional
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from backend.database.models import CountsFor, Requirement, Offering, Course, Audit, Enrollment
+from backend.database.models import EnrollmentDepartmentRollup, EnrollmentRequirementRollup
+from backend.database.models import EnrollmentForecast
+from backend.database.data_version import get_data_version
 import logging # Add logging
 
 class AnalyticsRepository:
@@ -54,43 +58,29 @@ class AnalyticsRepository:
         return result
 
     def get_enrollment_data(self, course_code: str):
-        """Fetch past enrollment data for a specific course, including offering_id and semester."""
+        """Fetch past enrollment data for a specific course, summed per semester and class."""
         logging.info(f"[AnalyticsRepository] Fetching enrollment data for course: {course_code}")
         try:
-            enrollment_data = (
-                self.db.query(Enrollment, Offering.semester, Offering.offering_id)
+            # Core select: plain (semester, class_, count) rows, no ORM query machinery
+            enrollment_data = self.db.execute(
+                select(
+                    Offering.semester,
+                    Enrollment.class_,
+                    func.sum(Enrollment.enrollment_count).label("enrollment_count"),
+                )
                 .join(Offering, Enrollment.offering_id == Offering.offering_id)  # Join on offering_id
-                .filter(Offering.course_code == course_code)  # Filter by course_code from Offering
-                .all()
-            )
-            logging.info(f"[AnalyticsRepository] Raw DB query returned {len(enrollment_data)} rows.")
-            # Log first few results if available
-            if enrollment_data:
-                 logging.debug(f"[AnalyticsRepository] First raw result example: {enrollment_data[0]}")
-                 if len(enrollment_data) > 1:
-                      logging.debug(f"[AnalyticsRepository] Second raw result example: {enrollment_data[1]}")
-
-            # Create a dictionary to aggregate results
-            aggregated_data = {}
-
-            for enrollment, semester, _ in enrollment_data: # offering_id is fetched but not used in key
-                class_ = enrollment.class_  # Use class_ from Enrollment
-                enrollment_count = enrollment.enrollment_count
-
-                # Create a unique key for each semester and class combination
-                key = (semester, class_)
-
-                if key not in aggregated_data:
-                    aggregated_data[key] = {
-                        "semester": semester,
-                        "class_": class_,
-                        "enrollment_count": 0
-                    }
-
-                # Sum the enrollment counts
-                aggregated_data[key]["enrollment_count"] += enrollment_count
-
-            final_result = list(aggregated_data.values())
+                .where(Offering.course_code == course_code)  # Filter by course_code from Offering
+                .group_by(Offering.semester, Enrollment.class_)
+            ).all()
+
+            final_result = [
+                {
+                    "semester": semester,
+                    "class_": class_,
+                    "enrollment_count": enrollment_count or 0
+                }
+                for semester, class_, enrollment_count in enrollment_data
+            ]
             logging.info(f"[AnalyticsRepository] Aggregated enrollment data into {len(final_result)} records.")
             if final_result:
                  logging.debug(f"[AnalyticsRepository] First aggregated result example: {final_result[0]}")
@@ -100,3 +90,145 @@ class AnalyticsRepository:
              logging.error(f"[AnalyticsRepository] Error fetching enrollment data for {course_code}: {e}")
              # Re-raise or return empty list depending on desired error handling
              raise
+
+    def get_enrollment_data_for_courses(self,
+                                        course_codes: Optional[List[str]] = None,
+                                        department: Optional[str] = None):
+        """Fetch enrollment data for several courses (or a whole department) in one query,
+        summed per course, semester and class."""
+        logging.info(f"[AnalyticsRepository] Fetching enrollment data for courses={course_codes}, "
+                     f"department={department}")
+        try:
+            # Core select returning the row mappings: no ORM query machinery or per-row dicts
+            query = (
+                select(
+                    Offering.course_code,
+                    Offering.semester,
+                    Enrollment.class_.label("class_"),
+                    func.coalesce(func.sum(Enrollment.enrollment_count), 0)
+                    .label("enrollment_count"),
+                )
+                .join(Offering, Enrollment.offering_id == Offering.offering_id)
+            )
+            if course_codes:
+                query = query.where(Offering.course_code.in_(course_codes))
+            if department:
+                query = (
+                    query.join(Course, Course.course_code == Offering.course_code)
+                    .where(Course.dep_code == department)
+                )
+
+            final_result = self.db.execute(
+                query.group_by(Offering.course_code, Offering.semester, Enrollment.class_)
+                .order_by(Offering.course_code)
+            ).mappings().all()
+            logging.info(f"[AnalyticsRepository] Aggregated multi-course enrollment data into "
+                         f"{len(final_result)} records.")
+            return final_result
+        except Exception as e:
+             logging.error(f"[AnalyticsRepository] Error fetching enrollment data for "
+                           f"courses={course_codes}, department={department}: {e}")
+             raise
+
+    def get_enrollment_totals(self, group_by: str,
+                              semester: Optional[str] = None,
+                              campus_id: Optional[int] = None,
+                              major: Optional[str] = None):
+        """Fetch enrollment totals per group ('department', 'requirement' or 'campus'),
+        semester and class from the enrollment rollup tables."""
+        if group_by == "requirement":
+            rollup = EnrollmentRequirementRollup
+            group_col = rollup.requirement
+        elif group_by == "campus":
+            rollup = EnrollmentDepartmentRollup
+            group_col = rollup.campus_id
+        else:
+            rollup = EnrollmentDepartmentRollup
+            group_col = rollup.dep_code
+
+        query = self.db.query(
+            group_col,
+            rollup.semester,
+            rollup.class_,
+            func.sum(rollup.enrollment_count),
+        )
+        if semester:
+            query = query.filter(rollup.semester == semester)
+        if campus_id is not None:
+            query = query.filter(rollup.campus_id == campus_id)
+        if major and group_by == "requirement":
+            query = (
+                query.join(Requirement, Requirement.requirement == rollup.requirement)
+                .join(Audit, Requirement.audit_id == Audit.audit_id)
+                .filter(Audit.major == major)
+            )
+
+        totals = (
+            query.group_by(group_col, rollup.semester, rollup.class_)
+            .order_by(group_col, rollup.semester, rollup.class_)
+            .all()
+        )
+        return [
+            {
+                "group": str(group),
+                "semester": sem,
+                "class_": class_,
+                "enrollment_count": count or 0
+            }
+            for group, sem, class_, count in totals
+        ]
+
+    def get_enrollment_forecasts(self, scope: str, key: str):
+        """Fetch the stored enrollment forecasts of a course or department."""
+        forecasts = (
+            self.db.query(EnrollmentForecast)
+            .filter(EnrollmentForecast.scope == scope, EnrollmentForecast.key == key)
+            .order_by(EnrollmentForecast.semester, EnrollmentForecast.model)
+            .all()
+        )
+        return [
+            {
+                "semester": f.semester,
+                "model": f.model,
+                "forecast": f.forecast,
+                "lower": f.lower,
+                "upper": f.upper,
+                "num_observations": f.num_observations
+            }
+            for f in forecasts
+        ]
+
+    def get_data_version(self) -> int:
+        """Fetch the current data version, used to key cached analytics."""
+        return get_data_version(self.db)
+
+    def get_requirement_incidence(self, majors: Optional[List[str]] = None):
+        """Fetch (course_code, requirement, major) triples from countsfor,
+        optionally restricted to some majors."""
+        query = (
+            self.db.query(CountsFor.course_code, CountsFor.requirement, Audit.major)
+            .join(Requirement, CountsFor.requirement == Requirement.requirement)
+            .join(Audit, Requirement.audit_id == Audit.audit_id)
+        )
+        if majors:
+            query = query.filter(Audit.major.in_(majors))
+        return query.all()
+
+    def get_course_forecasts(self, model: str):
+        """Fetch (course_code, semester, forecast, lower, upper) for every course and one model."""
+        return (
+            self.db.query(EnrollmentForecast.key, EnrollmentForecast.semester,
+                          EnrollmentForecast.forecast, EnrollmentForecast.lower,
+                          EnrollmentForecast.upper)
+            .filter(EnrollmentForecast.scope == "course", EnrollmentForecast.model == model)
+            .all()
+        )
+
+    def get_campus_offerings(self, campus_id: int = 2):
+        """Fetch the distinct (course_code, semester) pairs offered on a campus (2 = Qatar)."""
+        return (
+            self.db.query(Offering.course_code, Offering.semester)
+            .filter(Offering.campus_id == campus_id)
+            .distinct()
+            .all()
+        )
@@ -3,14 +3,58 @@ This script implements the data access layer for courses.
 """
 
 import logging
-from typing import Optional
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
 
-from sqlalchemy import or_
+from sqlalchemy import or_, select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from backend.database.models import Course, CountsFor, Requirement, Offering, Audit
 
+# audit_id prefix -> requirements key
+MAJOR_PREFIXES = (("cs", "CS"), ("is", "IS"), ("ba", "BA"), ("bio", "BS"))
+# course codes per IN (...) query, well below SQLite's bound parameter limit
+IN_CHUNK_SIZE = 500
+
+
+@dataclass(slots=True)
+class CourseRow:
+    """The columns of a course needed by the read endpoints, without ORM state."""
+    course_code: str
+    name: Optional[str]
+    dep_code: Optional[str]
+    units: Optional[int]
+    description: Optional[str]
+    prereqs_text: Optional[str]
+    offered_qatar: Optional[bool]
+    offered_pitts: Optional[bool]
+
+
+COURSE_ROW_COLUMNS = (Course.course_code, Course.name, Course.dep_code, Course.units,
+                      Course.description, Course.prereqs_text, Course.offered_qatar,
+                      Course.offered_pitts)
+
+
+def _chunks(values: List[str], size: int = IN_CHUNK_SIZE) -> Iterable[List[str]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _empty_requirements() -> Dict[str, list]:
+    return {"CS": [], "IS": [], "BA": [], "BS": []}
+
+
+def _add_requirement(requirements: Dict[str, list], req: str, audit_id: str, req_bool) -> None:
+    for prefix, major in MAJOR_PREFIXES:
+        if audit_id.startswith(prefix):
+            requirements[major].append({
+                "requirement": req,
+                "type": bool(req_bool),
+                "major": major
+            })
+            return
+
 
 class CourseRepository:
     """encapsulates all database operations for the 'Course' entity."""
@@ -18,56 +62,51 @@ class CourseRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_course_by_code(self, course_code: str):
+    def get_course_by_code(self, course_code: str) -> Optional[CourseRow]:
         """fetch course details by course code (raw data only)."""
-        return self.db.query(Course).filter(Course.course_code == course_code).first()
+        row = self.db.execute(
+            select(*COURSE_ROW_COLUMNS).where(Course.course_code == course_code)
+        ).first()
+        return CourseRow(*row) if row else None
 
     def get_offered_semesters(self, course_code: str):
         """fetch semesters in which a course is offered."""
-        offered_semesters = (
-            self.db.query(Offering.semester)
-            .filter(Offering.course_code == course_code)
-            .all()
-        )
-        return [semester[0] for semester in offered_semesters]
+        return self.get_offered_semesters_for([course_code]).get(course_code, [])
+
+    def get_offered_semesters_for(self, course_codes: List[str]) -> Dict[str, List[str]]:
+        """fetch the semesters in which each of the given courses is offered."""
+        offered: Dict[str, List[str]] = {}
+        for chunk in _chunks(course_codes):
+            rows = self.db.execute(
+                select(Offering.course_code, Offering.semester)
+                .where(Offering.course_code.in_(chunk))
+                .order_by(Offering.course_code, Offering.semester, Offering.campus_id)
+            )
+            for course_code, semester in rows:
+                offered.setdefault(course_code, []).append(semester)
+        return offered
 
     def get_course_requirements(self, course_code: str):
         """fetch requirements per major for a course."""
-        requirements = {"CS": [], "IS": [], "BA": [], "BS": []}
-        requirements_query = (
-            self.db.query(CountsFor.requirement, Requirement.audit_id, Audit.type)
-            .join(Requirement, CountsFor.requirement == Requirement.requirement)
-            .join(Audit, Requirement.audit_id == Audit.audit_id)
-            .filter(CountsFor.course_code == course_code)
-            .all()
-        )
-
-        for req, audit_id, req_bool in requirements_query:
-            if audit_id.startswith("cs"):
-                requirements["CS"].append({
-                    "requirement": req,
-                    "type": bool(req_bool),
-                    "major": "CS"
-                })
-            elif audit_id.startswith("is"):
-                requirements["IS"].append({
-                    "requirement": req,
-                    "type": bool(req_bool),
-                    "major": "IS"
-                })
-            elif audit_id.startswith("ba"):
-                requirements["BA"].append({
-                    "requirement": req,
-                    "type": bool(req_bool),
-                    "major": "BA"
-                })
-            elif audit_id.startswith("bio"):
-                requirements["BS"].append({
-                    "requirement": req,
-                    "type": bool(req_bool),
-                    "major": "BS"
-                })
-
+        return self.get_course_requirements_for([course_code]).get(course_code,
+                                                                   _empty_requirements())
+
+    def get_course_requirements_for(self, course_codes: List[str]) -> Dict[str, Dict[str, list]]:
+        """fetch requirements per major for each of the given courses."""
+        requirements: Dict[str, Dict[str, list]] = {}
+        for chunk in _chunks(course_codes):
+            rows = self.db.execute(
+                select(CountsFor.course_code, CountsFor.requirement, Requirement.audit_id,
+                       Audit.type)
+                .join(Requirement, CountsFor.requirement == Requirement.requirement)
+                .join(Audit, Requirement.audit_id == Audit.audit_id)
+                .where(CountsFor.course_code.in_(chunk))
+                .order_by(CountsFor.course_code, CountsFor.requirement)
+            )
+            for course_code, req, audit_id, req_bool in rows:
+                if course_code not in requirements:
+                    requirements[course_code] = _empty_requirements()
+                _add_requirement(requirements[course_code], req, audit_id, req_bool)
         return requirements
 
     def get_all_semesters(self):
@@ -88,7 +127,7 @@ class CourseRepository:
                             offered_qatar: Optional[bool] = None,
                             offered_pitts: Optional[bool] = None):
         """Fetch courses matching any combination of provided filters."""
-        query = self.db.query(Course)
+        query = select(*COURSE_ROW_COLUMNS)
 
         # Filter by department.
         if department:
@@ -121,7 +160,7 @@ class CourseRepository:
         needs_offering_join = semester or (offered_qatar is not None) or (offered_pitts is not None)
         if needs_offering_join:
             # Base subquery on Offerings
-            offering_subquery = self.db.query(Offering.course_code).distinct()
+            offering_subquery = select(Offering.course_code).distinct()
 
             # Filter by semester if provided
             if semester:
@@ -167,11 +206,14 @@ class CourseRepository:
             query = query.filter(Course.course_code.in_(offering_subquery.scalar_subquery()))
 
 
-        # Execute the query to get candidate courses
+        # Execute the query to get candidate courses, then the requirements of all
+        # candidates in one batch (used both for filtering and in the response)
         try:
-            candidate_courses = query.distinct().all()
+            candidate_courses = [CourseRow(*row) for row in self.db.execute(query.distinct())]
             logging.info("Initial filter query returned %d candidate courses.",
                          len(candidate_courses))
+            requirements_by_code = self.get_course_requirements_for(
+                [course.course_code for course in candidate_courses])
         except SQLAlchemyError as e: # Catch specific DB errors
             logging.error("Error executing initial course filter query: %s", e)
             return [] # Return empty list on query error
@@ -205,7 +247,7 @@ class CourseRepository:
                          required_cs_set, required_is_set,
                          required_ba_set, required_bs_set)
             for course in candidate_courses:
-                requirements_dict = self.get_course_requirements(course.course_code)
+                requirements_dict = requirements_by_code.get(course.course_code, {})
 
                 actual_cs = set(r['requirement']
                                 for r in requirements_dict.get('CS', []))
@@ -241,38 +283,31 @@ class CourseRepository:
 
 
         # Format the final list of courses
-        result = []
         logging.info("Processing %d filtered courses to add details...",
                      len(filtered_courses))
-        for course in filtered_courses:
-            try:
-                # Fetch details needed for the response object
-                offered_semesters = self.get_offered_semesters(course.course_code)
-                # Fetch requirements again to ensure the final response object has
-                # the full, correct structure
-                requirements = self.get_course_requirements(course.course_code)
-                # Log the fetched requirements for debugging
-                # logging.debug(
-                #    f"Course: {course.course_code}, "
-                #    f"Requirements for response: {requirements}"
-                # )
-
-                result.append({
-                    "course_code": course.course_code,
-                    "course_name": course.name,
-                    "department": course.dep_code,
-                    "units": course.units,
-                    "description": course.description,
-                    "prerequisites": course.prereqs_text or "None",
-                    "offered_qatar": course.offered_qatar,
-                    "offered_pitts": course.offered_pitts,
-                    "offered": offered_semesters,
-                    "requirements": requirements, # Ensure this is the structured dict
-                })
-            except SQLAlchemyError as e: # Catch specific DB errors during detail fetch
-                logging.error("Error processing details for course %s: %s",
-                              course.course_code, e)
-                continue
+        try:
+            offered_by_code = self.get_offered_semesters_for(
+                [course.course_code for course in filtered_courses])
+        except SQLAlchemyError as e: # Catch specific DB errors during detail fetch
+            logging.error("Error fetching offered semesters for filtered courses: %s", e)
+            return []
+
+        result = [
+            {
+                "course_code": course.course_code,
+                "course_name": course.name,
+                "department": course.dep_code,
+                "units": course.units,
+                "description": course.description,
+                "prerequisites": course.prereqs_text or "None",
+                "offered_qatar": course.offered_qatar,
+                "offered_pitts": course.offered_pitts,
+                "offered": offered_by_code.get(course.course_code, []),
+                "requirements": requirements_by_code.get(course.course_code,
+                                                         _empty_requirements()),
+            }
+            for course in filtered_courses
+        ]
 
         logging.info("Finished processing filters. Returning %d courses with details.",
                      len(result))
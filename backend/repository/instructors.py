@@ -0,0 +1,77 @@
+"""
+This script implements the data access layer for instructor analytics.
+"""
+
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from backend.database.models import (Instructor, CourseInstructor, Course, Requirement, Audit,
+                                     InstructorLoad, InstructorRequirement)
+
+
+class InstructorRepository:
+    """Encapsulates database operations for instructors and their precomputed aggregates."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_instructors(self, department: Optional[str] = None):
+        """Fetch every instructor with the number of courses they teach,
+        optionally restricted to the courses of one department."""
+        course_counts = self.db.query(
+            CourseInstructor.andrew_id,
+            func.count(CourseInstructor.course_code).label("num_courses"),
+        )
+        if department:
+            # Range on the course_code prefix so the lookup stays on the course_code index
+            course_counts = course_counts.filter(
+                CourseInstructor.course_code >= f"{department}-",
+                CourseInstructor.course_code < f"{department}.",
+            )
+        course_counts = course_counts.group_by(CourseInstructor.andrew_id).subquery()
+
+        return (
+            self.db.query(Instructor.andrew_id, Instructor.first_name, Instructor.last_name,
+                          course_counts.c.num_courses)
+            .join(course_counts, course_counts.c.andrew_id == Instructor.andrew_id)
+            .order_by(Instructor.last_name, Instructor.first_name)
+            .all()
+        )
+
+    def get_instructor(self, andrew_id: str):
+        """Fetch an instructor's name by andrew id."""
+        return (
+            self.db.query(Instructor.andrew_id, Instructor.first_name, Instructor.last_name)
+            .filter(Instructor.andrew_id == andrew_id)
+            .first()
+        )
+
+    def get_instructor_courses(self, andrew_id: str):
+        """Fetch (course_code, name) of the courses taught by an instructor."""
+        return (
+            self.db.query(CourseInstructor.course_code, Course.name)
+            .join(Course, Course.course_code == CourseInstructor.course_code)
+            .filter(CourseInstructor.andrew_id == andrew_id)
+            .order_by(CourseInstructor.course_code)
+            .all()
+        )
+
+    def get_instructor_requirements(self, andrew_id: str):
+        """Fetch (requirement, major, num_courses) covered by an instructor's courses."""
+        return (
+            self.db.query(InstructorRequirement.requirement, Audit.major,
+                          InstructorRequirement.num_courses)
+            .join(Requirement, Requirement.requirement == InstructorRequirement.requirement)
+            .join(Audit, Requirement.audit_id == Audit.audit_id)
+            .filter(InstructorRequirement.andrew_id == andrew_id)
+            .all()
+        )
+
+    def get_instructor_load(self, andrew_id: str):
+        """Fetch (semester, num_courses, enrollment_count) taught by an instructor."""
+        return (
+            self.db.query(InstructorLoad.semester, InstructorLoad.num_courses,
+                          InstructorLoad.enrollment_count)
+            .filter(InstructorLoad.andrew_id == andrew_id)
+            .all()
+        )
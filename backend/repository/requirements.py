@@ -2,8 +2,10 @@
 this script implements the data access layer for requirements.
 """
 
+from typing import Optional
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from backend.database.models import Requirement, Audit
+from backend.database.models import Requirement, Audit, CountsFor, Course, Offering
 
 class RequirementRepository:
     """Encapsulates all database operations for requirements."""
@@ -28,4 +30,60 @@ class RequirementRepository:
             for requirement, audit_type, major in requirements
         ]
 
-    # Removed unused search_requirements method
+    def requirement_exists(self, requirement: str) -> bool:
+        """Check whether a requirement is known."""
+        return self.db.query(Requirement.requirement) \
+            .filter(Requirement.requirement == requirement).first() is not None
+
+    def get_requirement_courses(self, requirement: str, semester: Optional[str] = None,
+                                campus_id: Optional[int] = None,
+                                offset: int = 0, limit: int = 50):
+        """
+        Fetch one page of the courses counting for a requirement, ordered by course code,
+        together with the total number of matching courses. Uses the
+        countsfor(requirement, course_code) index.
+        """
+        query = (
+            self.db.query(Course.course_code, Course.name, Course.dep_code, Course.units)
+            .join(CountsFor, CountsFor.course_code == Course.course_code)
+            .filter(CountsFor.requirement == requirement)
+        )
+        if semester or campus_id is not None:
+            offered = self.db.query(Offering.offering_id) \
+                .filter(Offering.course_code == Course.course_code)
+            if semester:
+                offered = offered.filter(Offering.semester == semester)
+            if campus_id is not None:
+                offered = offered.filter(Offering.campus_id == campus_id)
+            query = query.filter(offered.exists())
+
+        total = query.with_entities(func.count()).scalar()
+        rows = query.order_by(Course.course_code).offset(offset).limit(limit).all()
+        return total, [
+            {"course_code": code, "course_name": name, "department": dep_code, "units": units}
+            for code, name, dep_code, units in rows
+        ]
+
+    def get_course_details(self, course_codes: list[str]):
+        """Fetch description, prerequisites, campus flags and offered semesters of courses."""
+        if not course_codes:
+            return {}
+        details = {
+            code: {"description": description, "prerequisites": prereqs or "None",
+                   "offered_qatar": offered_qatar, "offered_pitts": offered_pitts,
+                   "offered": []}
+            for code, description, prereqs, offered_qatar, offered_pitts in (
+                self.db.query(Course.course_code, Course.description, Course.prereqs_text,
+                              Course.offered_qatar, Course.offered_pitts)
+                .filter(Course.course_code.in_(course_codes))
+                .all()
+            )
+        }
+        for code, semester in (
+            self.db.query(Offering.course_code, Offering.semester)
+            .filter(Offering.course_code.in_(course_codes))
+            .distinct()
+            .all()
+        ):
+            details[code]["offered"].append(semester)
+        return details
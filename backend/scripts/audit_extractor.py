@@ -17,7 +17,6 @@ from backend.scripts.data_extractor import DataExtractor
 
 # Ensure pandas displays full column width
 pd.set_option('display.max_colwidth', None)
-logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
 
 class AuditDataExtractor(DataExtractor):
@@ -0,0 +1,78 @@
+"""
+Measures latency and memory of the hot course read paths.
+
+Runs a full-catalog course search (`get_courses_by_filters` without filters), a
+requirement-filtered search and `get_enrollment_data` against the given database
+with statement echo off. For each, the median and best wall time over `--repeat` runs
+and the peak Python memory allocated during one run (tracemalloc) are printed.
+
+Usage:
+    python -m backend.scripts.benchmark_course_search --db backend/database/gened_db.sqlite
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from sqlalchemy.orm import sessionmaker
+from backend.database.db import create_db_engine
+from backend.repository.analytics import AnalyticsRepository
+from backend.repository.courses import CourseRepository
+
+
+def _cases(course_code: str, requirement: str):
+    return {
+        "full-catalog search": lambda db: CourseRepository(db).get_courses_by_filters(),
+        "requirement search": lambda db: CourseRepository(db).get_courses_by_filters(
+            cs_requirement=requirement),
+        "enrollment data": lambda db: AnalyticsRepository(db).get_enrollment_data(course_code),
+    }
+
+
+def measure(session_factory, case, repeat: int) -> dict:
+    """Times `repeat` runs of case(db), each in a fresh session, and traces one more."""
+    timings = []
+    for _ in range(repeat):
+        with session_factory() as db:
+            start = time.perf_counter()
+            rows = case(db)
+            timings.append(time.perf_counter() - start)
+
+    with session_factory() as db:
+        tracemalloc.start()
+        case(db)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "rows": len(rows),
+        "median_ms": statistics.median(timings) * 1000,
+        "best_ms": min(timings) * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+def main():
+    """Parses the arguments and prints one result line per read path."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="backend/database/gened_db.sqlite")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--course", default="76-101")
+    parser.add_argument("--requirement",
+                        default="GenEd---Humanities/Arts Electives")
+    args = parser.parse_args()
+
+    engine = create_db_engine(f"sqlite:///{args.db}", "production", echo=False)
+    session_factory = sessionmaker(bind=engine)
+
+    print(f"{'read path':<22} {'rows':>6} {'median ms':>10} {'best ms':>9} {'peak KiB':>10}")
+    for name, case in _cases(args.course, args.requirement).items():
+        result = measure(session_factory, case, args.repeat)
+        print(f"{name:<22} {result['rows']:>6} {result['median_ms']:>10.1f} "
+              f"{result['best_ms']:>9.1f} {result['peak_kib']:>10.0f}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmarks the read path under concurrent load for each database engine profile.
+
+For every profile the database is copied to a temporary file, an engine is created
+with that profile (query-only connections for the readers, as the read routes use)
+and a number of reader threads run the hot read queries for a fixed time while an
+optional writer thread keeps committing small transactions, like an upload would.
+Latency percentiles and throughput are printed per profile.
+
+Usage:
+    python -m backend.scripts.benchmark_db_profiles --db backend/database/gened_db.sqlite \
+        --threads 8 --seconds 10 --writer
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from backend.database.db import PROFILES, create_db_engine
+from backend.repository.courses import CourseRepository
+from backend.repository.requirements import RequirementRepository
+
+
+def _read_path(db):
+    """One request's worth of the most frequent read queries."""
+    requirements = RequirementRepository(db)
+    courses = CourseRepository(db)
+    requirements.get_all_requirements()
+    courses.get_all_semesters()
+    courses.get_course_by_code("15-122")
+    courses.get_offered_semesters("15-122")
+    courses.get_course_requirements("15-122")
+    requirements.get_requirement_courses("GenEd---Humanities/Arts Electives", limit=20)
+    db.rollback()
+
+
+def _writer(engine, stop: threading.Event, counter: list):
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS benchmark_scratch (value INTEGER)"))
+        conn.commit()
+        while not stop.is_set():
+            conn.execute(text("INSERT INTO benchmark_scratch (value) VALUES (1)"))
+            conn.execute(text("DELETE FROM benchmark_scratch"))
+            conn.commit()
+            counter[0] += 1
+
+
+def run_profile(db_path: str, profile: str, threads: int, seconds: float, writer: bool):
+    """Runs the benchmark against a copy of db_path and returns its latency statistics."""
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = os.path.join(tmp, "benchmark.sqlite")
+        shutil.copyfile(db_path, copy)
+        url = f"sqlite:///{copy}"
+        # statement echo would dominate the timings of the development profile
+        write_engine = create_db_engine(url, profile, echo=False)
+        read_engine = create_db_engine(url, profile, echo=False,
+                                       query_only=PROFILES[profile]["query_only_reads"])
+        session_factory = sessionmaker(bind=read_engine)
+
+        latencies, errors, writes = [], [0], [0]
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def reader():
+            local = []
+            with session_factory() as db:
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    try:
+                        _read_path(db)
+                    except Exception:  # pylint: disable=broad-exception-caught
+                        db.rollback()
+                        errors[0] += 1
+                        continue
+                    local.append(time.perf_counter() - start)
+            with lock:
+                latencies.extend(local)
+
+        workers = [threading.Thread(target=reader) for _ in range(threads)]
+        if writer:
+            workers.append(threading.Thread(target=_writer, args=(write_engine, stop, writes)))
+        for worker in workers:
+            worker.start()
+        time.sleep(seconds)
+        stop.set()
+        for worker in workers:
+            worker.join()
+        write_engine.dispose()
+        read_engine.dispose()
+
+    latencies.sort()
+    return {
+        "profile": profile,
+        "requests": len(latencies),
+        "throughput": len(latencies) / seconds,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else float("nan"),
+        "errors": errors[0],
+        "writes": writes[0],
+    }
+
+
+def main():
+    """Parses the arguments and prints one result line per profile."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="backend/database/gened_db.sqlite")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--writer", action="store_true",
+                        help="commit small write transactions concurrently")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES))
+    args = parser.parse_args()
+
+    print(f"{'profile':<12} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'errors':>7} {'writes':>7}")
+    for profile in args.profiles:
+        result = run_profile(args.db, profile, args.threads, args.seconds, args.writer)
+        print(f"{result['profile']:<12} {result['requests']:>9} {result['throughput']:>8.1f} "
+              f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['errors']:>7} "
+              f"{result['writes']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmarks the read endpoints under many simultaneous clients.
+
+Two ASGI apps serve the same read routes:
+- baseline: sync `def` handlers with a `get_read_db` session, run on anyio's shared
+  threadpool (40 threads) over an engine with the default connection pool,
+  i.e. the previous read path;
+- executor: the application's routers, whose async handlers run the services on
+  the dedicated read executor (DB_READ_POOL_SIZE threads and connections).
+
+Each app is driven in-process through httpx by `--clients` concurrent clients that
+cycle over a mix of read requests (`--mix`) for `--seconds`.
+Statement echo is turned off for both.
+
+Usage:
+    DATABASE_URL=sqlite:///backend/database/gened_db.sqlite \
+        python -m backend.scripts.benchmark_read_concurrency --clients 64 --seconds 10
+"""
+
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+import httpx
+from fastapi import Depends, FastAPI, Response
+from sqlalchemy.orm import Session, sessionmaker
+from backend.database import db as database
+from backend.database.read_executor import shutdown_read_executor
+from backend.app.routers import analytics, courses, requirements
+from backend.services.analytics import AnalyticsService
+from backend.services.courses import CourseService
+from backend.services.requirements import RequirementService
+
+LIGHT_REQUESTS = [
+    "/requirements",
+    "/courses/15-122",
+    "/requirements/GenEd---Humanities%2FArts Electives/courses?page_size=20",
+    "/analytics/enrollment-data?course_code=15-122",
+]
+HEAVY_REQUESTS = [
+    "/courses/search?department=15",
+    "/analytics/course-coverage?major=cs",
+]
+
+
+def build_baseline_app() -> FastAPI:
+    """The same read routes as sync handlers on the shared threadpool."""
+    engine = database.create_db_engine(database.DATABASE_URL, database.DB_PROFILE, echo=False)
+    session_factory = sessionmaker(bind=engine)
+
+    def get_session():
+        with session_factory() as session:
+            yield session
+
+    app = FastAPI()
+
+    @app.get("/requirements")
+    def get_requirements(db: Session = Depends(get_session)):
+        return Response(content=RequirementService(db).fetch_all_requirements_json(),
+                        media_type="application/json")
+
+    @app.get("/courses/search")
+    def search_courses(department: str, db: Session = Depends(get_session)):
+        return CourseService(db).fetch_courses_by_filters(department=department)
+
+    @app.get("/courses/{course_code}")
+    def get_course(course_code: str, db: Session = Depends(get_session)):
+        return CourseService(db).fetch_course_by_code(course_code)
+
+    @app.get("/requirements/{requirement:path}/courses")
+    def get_requirement_courses(requirement: str, page_size: int = 50,
+                                db: Session = Depends(get_session)):
+        return RequirementService(db).fetch_requirement_courses(requirement,
+                                                                page_size=page_size)
+
+    @app.get("/analytics/enrollment-data")
+    def get_enrollment_data(course_code: str, db: Session = Depends(get_session)):
+        return AnalyticsService(db).fetch_enrollment_data(course_code)
+
+    @app.get("/analytics/course-coverage")
+    def get_course_coverage(major: str, db: Session = Depends(get_session)):
+        return AnalyticsService(db).fetch_course_coverage(major)
+
+    return app
+
+
+def build_executor_app() -> FastAPI:
+    """The application's read routers."""
+    database.init_engines()
+    database.read_engine.echo = False
+    app = FastAPI()
+    for router in (courses.router, requirements.router, analytics.router):
+        app.include_router(router)
+    return app
+
+
+async def drive(app: FastAPI, requests: list[str], clients: int, seconds: float) -> dict:
+    """Runs `clients` concurrent loops over `requests` against `app` for `seconds`."""
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+    transport = httpx.ASGITransport(app=app)
+
+    async def client_loop(offset: int):
+        nonlocal errors
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for path in itertools.islice(itertools.cycle(requests), offset, None):
+                if time.perf_counter() >= deadline:
+                    return
+                start = time.perf_counter()
+                response = await client.get(path)
+                if response.status_code >= 500:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(client_loop(i) for i in range(clients)))
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "throughput": len(latencies) / seconds,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    """Parses the arguments and prints one result line per read path."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--mix", choices=["light", "full"], default="full",
+                        help="light: cheap lookups only; full: also course search and coverage")
+    args = parser.parse_args()
+    requests = LIGHT_REQUESTS + (HEAVY_REQUESTS if args.mix == "full" else [])
+
+    print(f"{'read path':<10} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>9} "
+          f"{'errors':>7}")
+    for name, app in (("baseline", build_baseline_app()), ("executor", build_executor_app())):
+        result = asyncio.run(drive(app, requests, args.clients, args.seconds))
+        print(f"{name:<10} {result['requests']:>9} {result['throughput']:>8.1f} "
+              f"{result['p50_ms']:>8.1f} {result['p95_ms']:>9.1f} {result['errors']:>7}")
+    shutdown_read_executor()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,13 +9,12 @@ import os
 import json
 import re
 import logging
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import pandas as pd
 
 from backend.scripts.data_extractor import DataExtractor
 
 # Configuration & Constants
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 COLUMNS_TO_KEEP = [
     "course_code", "name", "units", "min_units", "max_units",
     "offered_qatar", "offered_pitts", "short_name", "description",
@@ -261,9 +260,10 @@ class CourseDataExtractor(DataExtractor):
         self.extract_instructors(data, course_code)
         # logging.info("Successfully processed course data for %s from %s", course_code, source_name)
 
-    def process_all_courses(self) -> None:
+    def process_all_courses(self, on_file: Optional[Callable[[], None]] = None) -> None:
         """
         Walks the folder path, reads JSON files, and processes their data.
+        `on_file`, if given, is called after each JSON file (e.g. to report progress).
         """
         if not os.path.exists(self.folder_path):
             logging.error("Course data folder not found: %s", self.folder_path)
@@ -292,6 +292,8 @@ class CourseDataExtractor(DataExtractor):
                         logging.warning("JSON decoding error in file %s: %s", os.path.basename(file_path), json_error)
                     except Exception as e: # Catch other potential errors during processing
                         logging.error("Unexpected error processing course file %s: %s", os.path.basename(file_path), e)
+                    if on_file is not None:
+                        on_file()
 
         logging.info("Finished processing courses. Processed data from %d JSON files.", json_files_processed)
 
@@ -13,9 +13,6 @@ class DataExtractor:
     Base class for data extraction functionalities.
     Provides common methods for saving data to Excel and loading JSON files.
     """
-    def __init__(self) -> None:
-        logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
-
     @staticmethod
     def save_to_excel(data: Union[pd.DataFrame, List[dict]], output_path: str) -> None:
         """
@@ -2,12 +2,21 @@
 This module contains the AnalyticsService class, which handles business
 logic for analytics-related queries.
 """
-from typing import Optional
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from sqlalchemy.orm import Session
 from backend.repository.analytics import AnalyticsRepository
-from backend.app.schemas import CourseCoverageResponse
+from backend.database.forecasts import semester_sort_key
+from backend.services.cache import VersionedCache
+from backend.app.schemas import (CourseCoverageResponse, EnrollmentTotalsResponse,
+                                 EnrollmentForecastResponse, RequirementDemandResponse,
+                                 RequirementOverlapResponse, CoverageGapResponse)
 import logging
 
+# Derived analytics, recomputed only when the data version changes
+analytics_cache = VersionedCache()
+
 class AnalyticsService:
     """handles business logic for analytics-related queries."""
 
@@ -48,3 +57,241 @@ class AnalyticsService:
             logging.debug(f"[AnalyticsService] First formatted record example: {formatted_data[0]}")
 
         return formatted_data
+
+    def fetch_enrollment_data_for_courses(self,
+                                          course_codes: Optional[List[str]] = None,
+                                          department: Optional[str] = None):
+        """Fetch enrollment series for several courses or a department in a single query."""
+        raw_data = self.analytics_repo.get_enrollment_data_for_courses(
+            course_codes=course_codes, department=department
+        )
+
+        formatted_data = [
+            {
+                "course_code": record["course_code"],
+                "semester": record["semester"],
+                "enrollment_count": record["enrollment_count"],
+                "class_": record["class_"],
+            }
+            for record in raw_data
+        ]
+
+        logging.info(f"[AnalyticsService] Returning {len(formatted_data)} formatted enrollment "
+                     f"records for courses={course_codes}, department={department}")
+        return formatted_data
+
+    def fetch_enrollment_totals(self, group_by: str,
+                                semester: Optional[str] = None,
+                                campus_id: Optional[int] = None,
+                                major: Optional[str] = None) -> EnrollmentTotalsResponse:
+        """Fetch precomputed enrollment totals grouped by department, requirement or campus."""
+        totals = self.analytics_repo.get_enrollment_totals(
+            group_by, semester=semester, campus_id=campus_id, major=major
+        )
+        return EnrollmentTotalsResponse(group_by=group_by, totals=totals)
+
+    def fetch_enrollment_forecast(self, scope: str, key: str) -> EnrollmentForecastResponse:
+        """Fetch the precomputed enrollment forecasts for a course or department."""
+        forecasts = self.analytics_repo.get_enrollment_forecasts(scope, key)
+        return EnrollmentForecastResponse(scope=scope, key=key, forecasts=forecasts)
+
+    def fetch_requirement_demand(self, major: Optional[str] = None,
+                                 class_year: Optional[int] = None,
+                                 model: str = "linear_trend") -> RequirementDemandResponse:
+        """
+        Estimate historical and projected seat demand per requirement.
+        A seat in a course counts toward every requirement the course satisfies.
+        """
+        version = self.analytics_repo.get_data_version()
+        demand = analytics_cache.get(
+            version, ("requirement_demand", major, class_year, model),
+            lambda: self._compute_requirement_demand(major, class_year, model)
+        )
+        return RequirementDemandResponse(major=major, class_year=class_year, model=model,
+                                         demand=demand)
+
+    def _compute_requirement_demand(self, major: Optional[str], class_year: Optional[int],
+                                    model: str) -> list:
+        """Multiplies per-semester enrollment vectors by the course x requirement incidence."""
+        incidence = self.analytics_repo.get_requirement_incidence([major] if major else None)
+        if not incidence:
+            return []
+
+        requirements = sorted({req for _, req, _ in incidence})
+        req_pos = {req: i for i, req in enumerate(requirements)}
+        req_major = {req: req_major for _, req, req_major in incidence}
+        courses = sorted({code for code, _, _ in incidence})
+        course_pos = {code: i for i, code in enumerate(courses)}
+        # COO representation of the sparse incidence matrix R (course x requirement)
+        inc_rows = np.array([course_pos[code] for code, _, _ in incidence])
+        inc_cols = np.array([req_pos[req] for _, req, _ in incidence])
+
+        def times_incidence(vector: np.ndarray) -> np.ndarray:
+            """Sparse vector-matrix product vector @ R."""
+            return np.bincount(inc_cols, weights=vector[inc_rows], minlength=len(requirements))
+
+        records = [r for r in self.analytics_repo.get_enrollment_data_for_courses()
+                   if r["course_code"] in course_pos]
+        semesters = sorted({r["semester"] for r in records}, key=semester_sort_key)
+        sem_pos = {sem: i for i, sem in enumerate(semesters)}
+        all_classes = np.zeros((len(semesters), len(courses)))
+        selected = np.zeros_like(all_classes)
+        for r in records:
+            cell = (sem_pos[r["semester"]], course_pos[r["course_code"]])
+            all_classes[cell] += r["enrollment_count"]
+            if class_year is None or r["class_"] == class_year:
+                selected[cell] += r["enrollment_count"]
+
+        history = np.array([times_incidence(selected[i]) for i in range(len(semesters))])
+
+        # Course forecasts are totals; scale them by each course's historical class-year share
+        totals = all_classes.sum(axis=0)
+        share = np.divide(selected.sum(axis=0), totals, out=np.zeros_like(totals),
+                          where=totals > 0)
+        forecasts = {}
+        for code, sem, point, lower, upper in self.analytics_repo.get_course_forecasts(model):
+            if code in course_pos:
+                vectors = forecasts.setdefault(sem, np.zeros((3, len(courses))))
+                vectors[:, course_pos[code]] = (point, lower, upper)
+        projected_semesters = sorted(forecasts, key=semester_sort_key)
+        projection = {sem: [times_incidence(v * share) for v in forecasts[sem]]
+                      for sem in projected_semesters}
+
+        demand = []
+        for req, j in req_pos.items():
+            demand.append({
+                "requirement": req,
+                "major": req_major[req],
+                "history": [
+                    {"semester": sem, "demand": float(history[i, j])}
+                    for i, sem in enumerate(semesters) if history[i, j] > 0
+                ],
+                "projection": [
+                    {
+                        "semester": sem,
+                        "demand": round(float(projection[sem][0][j]), 2),
+                        "lower": round(float(projection[sem][1][j]), 2),
+                        "upper": round(float(projection[sem][2][j]), 2),
+                    }
+                    for sem in projected_semesters
+                ],
+            })
+        return demand
+
+    def fetch_requirement_overlap(self, majors: Optional[List[str]] = None,
+                                  min_shared: int = 1) -> RequirementOverlapResponse:
+        """
+        Count, for every pair of requirements, the courses counting toward both,
+        with their Jaccard similarity and the shared course lists.
+        """
+        majors = sorted(majors) if majors else None
+        version = self.analytics_repo.get_data_version()
+        requirements, pairs = analytics_cache.get(
+            version, ("requirement_overlap", tuple(majors or ())),
+            lambda: self._compute_requirement_overlap(majors)
+        )
+        return RequirementOverlapResponse(
+            majors=majors,
+            requirements=requirements,
+            overlaps=[pair for pair in pairs if pair["shared_count"] >= min_shared],
+        )
+
+    def _compute_requirement_overlap(self, majors: Optional[List[str]]):
+        """
+        Computes the sparse R^T R of the course x requirement incidence matrix: every
+        course adds to the pairs of the requirements it counts for, so the cost grows
+        with the number of overlapping pairs, not with courses x requirements^2.
+        """
+        incidence = self.analytics_repo.get_requirement_incidence(majors)
+        if not incidence:
+            return [], []
+
+        requirements = sorted({req for _, req, _ in incidence})
+        req_pos = {req: i for i, req in enumerate(requirements)}
+        req_major = {req: req_major for _, req, req_major in incidence}
+        course_reqs: Dict[str, set] = {}
+        for code, req, _ in incidence:
+            course_reqs.setdefault(code, set()).add(req_pos[req])
+
+        sizes = [0] * len(requirements)
+        # (i, j) with i < j -> the shared courses, in course order
+        shared: Dict[Tuple[int, int], List[str]] = {}
+        for code in sorted(course_reqs):
+            positions = sorted(course_reqs[code])
+            for i in positions:
+                sizes[i] += 1
+            for a, i in enumerate(positions):
+                for j in positions[a + 1:]:
+                    shared.setdefault((i, j), []).append(code)
+
+        summary = [
+            {"requirement": req, "major": req_major[req], "num_courses": sizes[i]}
+            for i, req in enumerate(requirements)
+        ]
+        pairs = []
+        for (i, j), shared_courses in sorted(shared.items()):
+            count = len(shared_courses)
+            pairs.append({
+                "requirement_a": requirements[i],
+                "requirement_b": requirements[j],
+                "major_a": req_major[requirements[i]],
+                "major_b": req_major[requirements[j]],
+                "shared_count": count,
+                "jaccard": round(count / (sizes[i] + sizes[j] - count), 4),
+                "shared_courses": shared_courses,
+            })
+        pairs.sort(key=lambda pair: -pair["shared_count"])
+        return summary, pairs
+
+    def fetch_coverage_gaps(self, semester: str, max_courses: int = 0,
+                            majors: Optional[List[str]] = None) -> CoverageGapResponse:
+        """
+        List the requirements offered by at most `max_courses` Qatar courses in a semester,
+        with the nearest semesters before and after in which they were covered.
+        """
+        version = self.analytics_repo.get_data_version()
+        index = analytics_cache.get(version, ("qatar_offering_index",),
+                                    self._build_qatar_offering_index)
+
+        gaps = []
+        for req, major in index["requirements"].items():
+            if majors and major not in majors:
+                continue
+            offered = index["offered"].get(req, {}).get(semester, frozenset())
+            if len(offered) > max_courses:
+                continue
+            covered = index["covered_semesters"].get(req, [])
+            keys = [semester_sort_key(sem) for sem in covered]
+            pos = bisect_left(keys, semester_sort_key(semester))
+            after = pos + 1 if pos < len(covered) and covered[pos] == semester else pos
+            gaps.append({
+                "major": major,
+                "requirement": req,
+                "num_courses": len(offered),
+                "courses": sorted(offered),
+                "previous_covered": covered[pos - 1] if pos > 0 else None,
+                "next_covered": covered[after] if after < len(covered) else None,
+            })
+        gaps.sort(key=lambda gap: (gap["major"], gap["num_courses"], gap["requirement"]))
+        return CoverageGapResponse(semester=semester, max_courses=max_courses, gaps=gaps)
+
+    def _build_qatar_offering_index(self) -> dict:
+        """Builds requirement -> semester -> set of Qatar-offered courses."""
+        semesters_by_course = {}
+        for code, sem in self.analytics_repo.get_campus_offerings(campus_id=2):
+            semesters_by_course.setdefault(code, set()).add(sem)
+
+        requirements, offered = {}, {}
+        for code, req, major in self.analytics_repo.get_requirement_incidence():
+            requirements[req] = major
+            by_semester = offered.setdefault(req, {})
+            for sem in semesters_by_course.get(code, ()):
+                by_semester.setdefault(sem, set()).add(code)
+
+        return {
+            "requirements": requirements,
+            "offered": {req: {sem: frozenset(codes) for sem, codes in by_sem.items()}
+                        for req, by_sem in offered.items()},
+            "covered_semesters": {req: sorted(by_sem, key=semester_sort_key)
+                                  for req, by_sem in offered.items()},
+        }
@@ -5,6 +5,7 @@ This script contains the business logic for handling courses.
 from typing import Optional
 from sqlalchemy.orm import Session
 from backend.repository.courses import CourseRepository
+from backend.database.reference_data import get_reference_snapshot
 from backend.app.schemas import CourseResponse, CourseListResponse
 
 
@@ -12,6 +13,7 @@ class CourseService:
     """encapsulates business logic for handling courses."""
 
     def __init__(self, db: Session):
+        self.db = db
         self.course_repo = CourseRepository(db)
 
     def fetch_course_by_code(self, course_code: str) -> Optional[CourseResponse]:
@@ -33,9 +35,9 @@ class CourseService:
             requirements=self.course_repo.get_course_requirements(course_code),
         )
 
-    def fetch_all_semesters(self):
-        """fetch a list of all semesters available in the offerings table."""
-        return self.course_repo.get_all_semesters()
+    def fetch_all_semesters_json(self) -> bytes:
+        """fetch the pre-serialized semester list from the reference data snapshot."""
+        return get_reference_snapshot(self.db).semesters_body
 
 
     def fetch_courses_by_filters(
@@ -1,20 +1,14 @@
 from backend.repository.departments import DepartmentRepository
-from backend.app.schemas import DepartmentListResponse, DepartmentResponse
+from backend.database.reference_data import get_reference_snapshot
 from sqlalchemy.orm import Session
 
 class DepartmentService:
     """Handles business logic for departments."""
 
     def __init__(self, db: Session):
+        self.db = db
         self.department_repo = DepartmentRepository(db)
 
-    def fetch_all_departments(self) -> DepartmentListResponse:
-        """Fetch a list of departments that have courses."""
-        raw_departments = self.department_repo.get_all_departments()
-
-        departments = [
-            DepartmentResponse(dep_code=dep_code, name=name)
-            for dep_code, name in raw_departments
-        ]
-
-        return DepartmentListResponse(departments=departments)
+    def fetch_all_departments_json(self) -> bytes:
+        """Fetch the pre-serialized department list from the reference data snapshot."""
+        return get_reference_snapshot(self.db).departments_body
@@ -0,0 +1,54 @@
+"""
+This script contains the business logic for instructor analytics.
+"""
+
+from typing import Optional
+from sqlalchemy.orm import Session
+from backend.repository.instructors import InstructorRepository
+from backend.database.forecasts import semester_sort_key
+from backend.app.schemas import (InstructorSummary, InstructorListResponse,
+                                 InstructorDetailResponse)
+
+
+class InstructorService:
+    """Encapsulates business logic for instructor teaching-load analytics."""
+
+    def __init__(self, db: Session):
+        self.instructor_repo = InstructorRepository(db)
+
+    def fetch_instructors(self, department: Optional[str] = None) -> InstructorListResponse:
+        """Fetch instructors with their number of courses."""
+        instructors = self.instructor_repo.get_instructors(department)
+        return InstructorListResponse(instructors=[
+            InstructorSummary(andrew_id=andrew_id, first_name=first_name,
+                              last_name=last_name, num_courses=num_courses)
+            for andrew_id, first_name, last_name, num_courses in instructors
+        ])
+
+    def fetch_instructor(self, andrew_id: str) -> Optional[InstructorDetailResponse]:
+        """Fetch an instructor's courses, covered requirements and load per semester."""
+        instructor = self.instructor_repo.get_instructor(andrew_id)
+        if not instructor:
+            return None
+
+        load = sorted(self.instructor_repo.get_instructor_load(andrew_id),
+                      key=lambda row: semester_sort_key(row[0]))
+        return InstructorDetailResponse(
+            andrew_id=instructor.andrew_id,
+            first_name=instructor.first_name,
+            last_name=instructor.last_name,
+            courses=[
+                {"course_code": code, "course_name": name}
+                for code, name in self.instructor_repo.get_instructor_courses(andrew_id)
+            ],
+            requirements=[
+                {"requirement": req, "major": major, "num_courses": num_courses}
+                for req, major, num_courses
+                in self.instructor_repo.get_instructor_requirements(andrew_id)
+            ],
+            load=[
+                {"semester": sem, "num_courses": num_courses,
+                 "enrollment_count": enrollment_count or 0}
+                for sem, num_courses, enrollment_count in load
+            ],
+        )
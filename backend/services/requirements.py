@@ -2,27 +2,55 @@
 This script contains the business logic for handling requirements.
 """
 
+from typing import Optional
 from sqlalchemy.orm import Session
 from backend.repository.requirements import RequirementRepository
-from backend.app.schemas import RequirementResponse, RequirementsResponse
+from backend.database.reference_data import get_reference_snapshot
+from backend.database.forecasts import semester_sort_key
+from backend.app.schemas import (RequirementCoursesResponse, RequirementCourseSummary,
+                                 RequirementCourseDetail)
 
 class RequirementService:
     """encapsulates business logic for handling requirements."""
 
     def __init__(self, db: Session):
+        self.db = db
         self.requirement_repo = RequirementRepository(db)
 
-    def fetch_all_requirements(self) -> RequirementsResponse:
-        """fetch and structure all requirements."""
-        requirements = self.requirement_repo.get_all_requirements()
+    def fetch_all_requirements_json(self) -> bytes:
+        """Fetch the pre-serialized requirement list from the reference data snapshot."""
+        return get_reference_snapshot(self.db).requirements_body
 
-        structured_requirements = [
-            RequirementResponse(
-                requirement=req["requirement"],
-                type=req["type"],
-                major=req["major"]
+    def fetch_requirement_tree_json(self) -> bytes:
+        """Fetch the pre-serialized requirement trees from the reference data snapshot."""
+        return get_reference_snapshot(self.db).requirement_tree_body
+
+    def fetch_requirement_courses(self, requirement: str, semester: Optional[str] = None,
+                                  campus_id: Optional[int] = None, page: int = 1,
+                                  page_size: int = 50, summary: bool = False
+                                  ) -> Optional[RequirementCoursesResponse]:
+        """
+        fetch one page of the courses satisfying a requirement.
+        Returns None if the requirement does not exist.
+        """
+        if not self.requirement_repo.requirement_exists(requirement):
+            return None
+
+        total, courses = self.requirement_repo.get_requirement_courses(
+            requirement, semester=semester, campus_id=campus_id,
+            offset=(page - 1) * page_size, limit=page_size
+        )
+        if summary:
+            items = [RequirementCourseSummary(**course) for course in courses]
+        else:
+            details = self.requirement_repo.get_course_details(
+                [course["course_code"] for course in courses]
             )
-            for req in requirements
-        ]
+            items = []
+            for course in courses:
+                detail = details.get(course["course_code"], {"offered": []})
+                detail["offered"] = sorted(detail["offered"], key=semester_sort_key)
+                items.append(RequirementCourseDetail(**course, **detail))
 
-        return RequirementsResponse(requirements=structured_requirements)
+        return RequirementCoursesResponse(requirement=requirement, total=total, page=page,
+                                          page_size=page_size, courses=items)
@@ -0,0 +1,175 @@
+# pylint: disable=missing-module-docstring
+"""
+Shared fixtures for the backend tests.
+
+Every test session runs against `catalog_db`, a temporary SQLite database created with
+`init_db` and seeded with a small but representative catalog (CS and GenEd requirements,
+Qatar and Pittsburgh offerings from F20 to F24, enrollment, instructors and the
+aggregates built from them), so the tests never depend on a local database file.
+
+`query_budget` counts the SQL statements executed through any engine (on any thread,
+so reads on the read executor are included) and fails the test when a block exceeds
+its budget:
+
+    def test_search(query_budget):
+        with query_budget(4):
+            client.get("/courses/search", params={"department": "15"})
+"""
+
+from contextlib import contextmanager
+from typing import List
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from backend.database import db as database
+from backend.database.forecasts import backfill_enrollment_forecasts
+from backend.database.models import Audit, CountsFor, Course, CourseInstructor, Department
+from backend.database.models import Enrollment, Instructor, Offering, Prereqs, Requirement
+from backend.database.reference_data import get_reference_snapshot, refresh_reference_snapshot
+from backend.database.rollups import backfill_enrollment_rollups, backfill_instructor_rollups
+
+SEMESTERS = ["F20", "S21", "F21", "S22", "F22", "S23", "F23", "S24", "F24"]
+CS_CORE = "BS in Computer Science---Core"
+CS_MATH = "BS in Computer Science---Mathematics"
+GENED_WRITING = "GenEd---Writing"
+GENED_ETHICS = "GenEd---Ethics"
+# course code: (name, units, dep_code, requirements, Qatar semesters, Pittsburgh semesters)
+CATALOG = {
+    "15-112": ("Fundamentals of Programming and Computer Science", 12, "15", [CS_CORE],
+               SEMESTERS, SEMESTERS[-2:]),
+    "15-122": ("Principles of Imperative Computation", 12, "15", [CS_CORE],
+               SEMESTERS, SEMESTERS[-2:]),
+    "15-213": ("Introduction to Computer Systems", 12, "15", [CS_CORE],
+               SEMESTERS[::2], []),
+    "15-251": ("Great Ideas in Theoretical Computer Science", 12, "15", [CS_CORE, CS_MATH],
+               SEMESTERS[1::2] + ["F24"], []),
+    "21-127": ("Concepts of Mathematics", 10, "21", [CS_MATH], SEMESTERS, []),
+    "76-101": ("Interpretation and Argument", 9, "76", [GENED_WRITING, CS_CORE],
+               SEMESTERS, ["F24"]),
+    "76-270": ("Writing for the Professions", 9, "76", [GENED_WRITING], ["S22", "S24"], []),
+    # not offered in Qatar in F24, a coverage gap
+    "80-130": ("Introduction to Ethics", 9, "80", [GENED_ETHICS], ["S23", "S24"], ["F24"]),
+}
+PREREQUISITES = {"15-122": ["15-112"], "15-213": ["15-122"], "15-251": ["15-122", "21-127"]}
+
+
+class QueryCounter:
+    """Records the SQL statements executed through any engine while active."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    def _record(self, _conn, _cursor, statement, _parameters, _context, _executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(Engine, "after_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(Engine, "after_cursor_execute", self._record)
+
+    @property
+    def count(self) -> int:
+        """Number of statements recorded so far."""
+        return len(self.statements)
+
+
+def _seed_catalog(db) -> None:
+    db.add_all([
+        Department(dep_code="15", name="Computer Science"),
+        Department(dep_code="21", name="Mathematical Sciences"),
+        Department(dep_code="76", name="English"),
+        Department(dep_code="80", name="Philosophy"),
+        Audit(audit_id="cs_0", name="BS in Computer Science", type=False, major="cs"),
+        Audit(audit_id="cs_1", name="GenEd", type=True, major="cs"),
+        Requirement(requirement=CS_CORE, audit_id="cs_0"),
+        Requirement(requirement=CS_MATH, audit_id="cs_0"),
+        Requirement(requirement=GENED_WRITING, audit_id="cs_1"),
+        Requirement(requirement=GENED_ETHICS, audit_id="cs_1"),
+        Instructor(andrew_id="jdoe", first_name="Jane", last_name="Doe"),
+        Instructor(andrew_id="rroe", first_name="Richard", last_name="Roe"),
+        CourseInstructor(andrew_id="jdoe", course_code="15-122"),
+        CourseInstructor(andrew_id="jdoe", course_code="15-213"),
+        CourseInstructor(andrew_id="rroe", course_code="76-101"),
+    ])
+    for number, (code, (name, units, dep_code, requirements, qatar, pitts)) in enumerate(
+            CATALOG.items()):
+        prerequisites = PREREQUISITES.get(code, [])
+        db.add(Course(course_code=code, name=name, units=units, min_units=units,
+                      max_units=units, offered_qatar=bool(qatar), offered_pitts=bool(pitts),
+                      short_name=name[:20].upper(), description=f"{name}.", dep_code=dep_code,
+                      prereqs_text=" and ".join(prerequisites) or None))
+        db.add_all(Prereqs(course_code=code, prerequisite=prerequisite, group_id=1,
+                           logic_type="and") for prerequisite in prerequisites)
+        db.add_all(CountsFor(course_code=code, requirement=req) for req in requirements)
+        for campus_id, semesters in ((2, qatar), (1, pitts)):
+            for index, semester in enumerate(semesters):
+                offering_id = f"{code}_{semester}_{campus_id}"
+                db.add(Offering(offering_id=offering_id, semester=semester,
+                                course_code=code, campus_id=campus_id))
+                # a growing enrollment per class year, different for every course
+                db.add_all(Enrollment(enrollment_id=f"{offering_id}_{class_}_W_{dep_code}",
+                                      class_=class_, section="W", department=dep_code,
+                                      enrollment_count=5 + number + index + class_,
+                                      offering_id=offering_id)
+                           for class_ in (1, 2))
+    db.commit()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def catalog_db(tmp_path_factory):
+    """Binds the backend to a freshly created and seeded database for the test session."""
+    url = f"sqlite:///{tmp_path_factory.mktemp('catalog') / 'catalog.sqlite'}"
+    database.init_engines()
+    original_url = database.bound_database_url
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(database, "DATABASE_URL", url)
+        database.drain_engines(database.bind_database(url))
+        database.init_db()
+        with database.SessionLocal() as db:
+            _seed_catalog(db)
+            backfill_enrollment_rollups(db)
+            backfill_enrollment_forecasts(db)
+            backfill_instructor_rollups(db)
+            refresh_reference_snapshot(db)
+        yield url
+        database.drain_engines(database.bind_database(original_url))
+
+
+def _warm_up() -> None:
+    """
+    Connects once to each engine and builds the reference data snapshot, so dialect
+    initialization and the one-off snapshot build aren't counted against a test.
+    """
+    database.init_engines()
+    for engine in (database.engine, database.read_engine):
+        with engine.connect():
+            pass
+    with database.ReadSessionLocal() as db:
+        get_reference_snapshot(db)
+
+
+@pytest.fixture
+def query_budget():
+    """Returns a context manager factory asserting at most `max_queries` statements."""
+    _warm_up()
+
+    @contextmanager
+    def budget(max_queries: int):
+        with QueryCounter() as counter:
+            yield counter
+        assert counter.count <= max_queries, (
+            f"{counter.count} SQL statements executed, budget is {max_queries}:\n"
+            + "\n".join(counter.statements)
+        )
+
+    return budget
+
+
+@pytest.fixture
+def assert_no_queries():
+    """Fails the test if it executes any SQL statement."""
+    with QueryCounter() as counter:
+        yield counter
+    assert counter.count == 0, "unexpected SQL statements:\n" + "\n".join(counter.statements)
@@ -0,0 +1,57 @@
+# pylint: disable=missing-module-docstring
+"""
+This script contains the test cases for the database engine profiles.
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from backend.database.db import create_db_engine
+
+
+def _pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_production_profile_applies_pragmas(tmp_path):
+    """Test that every production connection is tuned by the connect hook."""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'prod.sqlite'}", "production")
+
+    assert engine.echo is False
+    assert _pragma(engine, "journal_mode") == "wal"
+    assert _pragma(engine, "synchronous") == 1  # NORMAL
+    assert _pragma(engine, "temp_store") == 2  # MEMORY
+    assert _pragma(engine, "busy_timeout") == 5000
+    assert _pragma(engine, "cache_size") == -64000
+    engine.dispose()
+
+
+def test_query_only_connections_reject_writes(tmp_path):
+    """Test that read engines cannot write while the main engine can."""
+    url = f"sqlite:///{tmp_path / 'prod.sqlite'}"
+    engine = create_db_engine(url, "production")
+    read_engine = create_db_engine(url, "production", query_only=True)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+
+    with read_engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 1
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO t VALUES (2)"))
+    engine.dispose()
+    read_engine.dispose()
+
+
+def test_development_profile_keeps_defaults(tmp_path):
+    """Test that the development profile leaves SQLite's defaults alone."""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'dev.sqlite'}", "development")
+    assert _pragma(engine, "journal_mode") == "delete"
+    engine.dispose()
+
+
+def test_unknown_profile_is_rejected():
+    """Test that a typo in DB_PROFILE fails loudly."""
+    with pytest.raises(ValueError):
+        create_db_engine("sqlite://", "prod")
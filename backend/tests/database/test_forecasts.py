@@ -0,0 +1,45 @@
+# pylint: disable=missing-module-docstring
+"""
+This script contains the test cases for the vectorized enrollment forecasts.
+"""
+
+import numpy as np
+from backend.database.forecasts import (semester_index, semester_label, forecast_matrix,
+                                        build_forecast_rows)
+
+
+def test_semester_index_round_trip():
+    """Test that Fall/Spring codes map onto consecutive positions."""
+    assert semester_index("F23") + 1 == semester_index("S24")
+    assert semester_label(semester_index("S24")) == "S24"
+    assert semester_index("M23") is None
+
+
+def test_forecast_matrix_fits_all_series_at_once():
+    """Test the three models on a linear series and a series with gaps."""
+    first = semester_index("S22")
+    values = np.array([
+        [10.0, 20.0, 30.0, 40.0],       # steady growth, every semester
+        [50.0, np.nan, 70.0, np.nan],   # spring-only course
+    ])
+    results = forecast_matrix(values, first, horizon=2)
+
+    trend, lower, upper, count = results["linear_trend"]
+    np.testing.assert_allclose(trend[0], [50.0, 60.0])
+    assert count.tolist() == [4, 2]
+    assert np.all(lower <= trend) and np.all(trend <= upper)
+
+    seasonal = results["seasonal"][0]
+    # S22 + 4 semesters -> the next ones are S24 then F24
+    assert seasonal[1, 0] == 60.0
+    assert np.isnan(seasonal[1, 1])
+
+
+def test_build_forecast_rows_skips_undefined_forecasts():
+    """Test that series without enough history produce no rows for that model."""
+    values = np.array([[np.nan, 12.0]])
+    rows = build_forecast_rows("course", ["15-122"], values, semester_index("S24"), horizon=1)
+
+    models = {row["model"] for row in rows}
+    assert "linear_trend" not in models
+    assert all(row["semester"] == "S25" for row in rows)
@@ -0,0 +1,91 @@
+# pylint: disable=missing-module-docstring, redefined-outer-name, protected-access
+"""
+This script contains the test cases for linking enrollment records to offerings and for
+the stages of load_data_from_endpoint.
+"""
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from backend.database import load_data
+from backend.database.models import Base, Course, Offering
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A session on a file database with two courses, one offered on both campuses."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'load.sqlite'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([Course(course_code="15-122"), Course(course_code="15-150"),
+                         Offering(offering_id="15-122_F22_1", semester="F22",
+                                  course_code="15-122", campus_id=1),
+                         Offering(offering_id="15-122_F22_2", semester="F22",
+                                  course_code="15-122", campus_id=2)])
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def _enrollment(semester, course_code, section="A"):
+    return {"semester": semester, "course_code": course_code, "class_": 2029,
+            "enrollment_count": 10, "department": "CS", "section": section}
+
+
+def test_offerings_are_prefetched_and_created_in_bulk(db, query_budget):
+    """Test that the offering map costs a fixed number of statements, not one per record."""
+    records = [_enrollment(semester, code, section) for semester in ("F22", "S23", "F23")
+               for code in ("15-122", "15-150", "99-999") for section in "ABCDE"]
+
+    with query_budget(5):  # offerings, courses, one bulk insert in a savepoint
+        offering_ids = load_data._ensure_offerings_exist(db, records)
+
+    assert offering_ids[("F22", "15-122")] == "15-122_F22_2"  # Qatar preferred
+    assert offering_ids[("S23", "15-150")] == "15-150_S23_2"
+    assert ("F22", "99-999") not in offering_ids  # no such course
+    assert len(db.execute(select(Offering.offering_id)).all()) == 2 + 5
+
+
+def test_enrollment_records_are_linked_without_modifying_them(db):
+    """Test that linking adds offering and enrollment ids to copies of the records."""
+    records = [_enrollment("F22", "15-122"), _enrollment("F22", "99-999")]
+    offering_ids = load_data._ensure_offerings_exist(db, records)
+
+    linked = load_data._link_enrollment_records(records, offering_ids)
+
+    assert [(r["offering_id"], r["enrollment_id"]) for r in linked] == [
+        ("15-122_F22_2", "15-122_F22_2_2029_A_CS")]
+    assert "offering_id" not in records[0]
+
+
+def test_a_failed_stage_does_not_stop_the_endpoint_load(tmp_path, monkeypatch):
+    """Test that a LoadError in one stage of load_data_from_endpoint skips only that stage."""
+    (tmp_path / "departments").mkdir()
+    (tmp_path / "departments" / "departments.csv").write_text("dep_code,name\n15,CS\n")
+    (tmp_path / "courses").mkdir()
+    loaded = []
+
+    def load(data, **_kwargs):
+        loaded.append(sorted(data))
+        if "department" in data:
+            raise load_data.LoadError("Could not commit a chunk of 1 rows for table department")
+        return {}
+
+    class Extractor:  # pylint: disable=missing-class-docstring
+        def __init__(self, **_kwargs):
+            pass
+
+        def process_all_courses(self):
+            pass
+
+        def get_results(self):
+            return {"course": [{"course_code": "15-122"}]}
+
+    monkeypatch.setattr(load_data, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(load_data, "load_data_from_dicts", load)
+    monkeypatch.setattr(load_data, "CourseDataExtractor", Extractor)
+    monkeypatch.setattr(load_data, "export_changed_tables", lambda *args: None)
+
+    load_data.load_data_from_endpoint()
+
+    assert loaded == [["department"], ["course"]]
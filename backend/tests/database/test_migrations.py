@@ -0,0 +1,96 @@
+# pylint: disable=missing-module-docstring, redefined-outer-name
+"""
+This script contains the test cases for the schema migrations and checks with
+EXPLAIN QUERY PLAN that the repository queries use the secondary indexes.
+"""
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import sessionmaker
+from backend.database.models import Base
+from backend.database.migrations import MIGRATIONS, run_migrations
+from backend.repository.analytics import AnalyticsRepository
+from backend.repository.courses import CourseRepository
+from backend.repository.requirements import RequirementRepository
+
+SECONDARY_INDEXES = {
+    "ix_offering_course_code", "ix_offering_semester", "ix_offering_campus_id",
+    "ix_countsfor_requirement", "ix_requirement_audit_id", "ix_audit_major",
+    "ix_enrollment_offering_id", "ix_course_dep_code",
+}
+
+
+@pytest.fixture
+def engine():
+    """Provides an in-memory database with the current schema."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def _index_names(engine):
+    inspector = inspect(engine)
+    return {index["name"] for table in inspector.get_table_names()
+            for index in inspector.get_indexes(table)}
+
+
+def test_migrations_add_indexes_to_existing_database(engine):
+    """Test that a database created before the indexes existed gets them, once."""
+    with engine.begin() as conn:
+        for name in SECONDARY_INDEXES:
+            conn.execute(text(f"DROP INDEX {name}"))
+    assert not SECONDARY_INDEXES & _index_names(engine)
+
+    assert run_migrations(engine) == [version for version, _, _ in MIGRATIONS]
+    assert SECONDARY_INDEXES <= _index_names(engine)
+    assert run_migrations(engine) == []
+
+
+def _query_plans(engine, call):
+    """Runs `call`, then returns the EXPLAIN QUERY PLAN of every SELECT it issued."""
+    statements = []
+
+    def capture(_conn, _cursor, statement, parameters, _context, _executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    with engine.connect() as conn:
+        return [
+            " | ".join(row[-1] for row in
+                       conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+            for statement, parameters in statements
+        ]
+
+
+@pytest.mark.parametrize("call, expected_indexes", [
+    (lambda db: CourseRepository(db).get_offered_semesters("15-122"),
+     ["ix_offering_course_code"]),
+    (lambda db: CourseRepository(db).get_courses_by_filters(department="15"),
+     ["ix_course_dep_code"]),
+    (lambda db: CourseRepository(db).get_courses_by_filters(semester="F23", offered_qatar=True),
+     ["ix_offering_semester"]),
+    (lambda db: AnalyticsRepository(db).get_enrollment_data("15-122"),
+     ["ix_offering_course_code", "ix_enrollment_offering_id"]),
+    (lambda db: AnalyticsRepository(db).get_course_coverage("cs"),
+     ["ix_audit_major", "ix_requirement_audit_id", "ix_countsfor_requirement"]),
+    (lambda db: AnalyticsRepository(db).get_campus_offerings(2),
+     ["ix_offering_campus_id"]),
+    (lambda db: RequirementRepository(db).get_requirement_courses("GenEd---Writing"),
+     ["ix_countsfor_requirement"]),
+])
+def test_repository_queries_use_indexes(engine, call, expected_indexes):
+    """Test that the hot repository queries are index searches, not table scans."""
+    with sessionmaker(bind=engine)() as db:
+        plans = _query_plans(engine, lambda: call(db))
+
+    plan = plans[0]
+    for index in expected_indexes:
+        assert f"INDEX {index}" in plan, plan
+    assert "SCAN" not in plan, plan
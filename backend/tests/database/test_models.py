@@ -0,0 +1,37 @@
+# pylint: disable=missing-module-docstring
+"""
+This script contains the test cases for the model relationship configuration.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session, selectinload
+from backend.database.models import Base, Course, Offering
+
+
+@pytest.fixture
+def session():
+    """An in-memory database with one course offered once."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(Course(course_code="15-122", name="Principles of Imperative Computation"))
+        db.add(Offering(offering_id="1", semester="F24", course_code="15-122", campus_id=2))
+        db.commit()
+    with Session(engine) as db:
+        yield db
+    engine.dispose()
+
+
+def test_lazy_relationship_load_raises(session):
+    """Test that touching an unloaded relationship raises instead of issuing a query."""
+    course = session.get(Course, "15-122")
+    with pytest.raises(InvalidRequestError):
+        _ = course.offerings
+
+
+def test_eager_relationship_load_is_allowed(session):
+    """Test that relationships can still be loaded explicitly."""
+    course = session.query(Course).options(selectinload(Course.offerings)).one()
+    assert [offering.semester for offering in course.offerings] == ["F24"]
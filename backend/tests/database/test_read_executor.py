@@ -0,0 +1,47 @@
+# pylint: disable=missing-module-docstring
+"""
+This script contains the test cases for the read executor.
+"""
+
+import asyncio
+import threading
+from backend.database import read_executor
+from backend.database.db import DB_READ_POOL_SIZE
+from backend.database.read_executor import ReadExecutorService, run_read
+
+
+class _EchoService:
+    """Minimal service recording the thread and session it ran with."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def fetch(self, value):
+        """Returns the value with the executing thread and session."""
+        return value, threading.current_thread().name, self.db
+
+
+def test_run_read_uses_dedicated_sized_executor():
+    """Test that reads run on the db-read threads, each with its own closed session."""
+    results = asyncio.run(_gather(lambda db, i: (i, threading.current_thread().name, db), 20))
+
+    assert [i for i, _, _ in results] == list(range(20))
+    assert all(name.startswith("db-read") for _, name, _ in results)
+    assert read_executor.get_read_executor()._max_workers == DB_READ_POOL_SIZE  # pylint: disable=protected-access
+    assert len({id(db) for _, _, db in results}) > 1
+    read_executor.shutdown_read_executor()
+
+
+async def _gather(func, count):
+    return await asyncio.gather(*(run_read(func, i) for i in range(count)))
+
+
+def test_read_executor_service_proxies_methods():
+    """Test that awaiting a proxied method runs it on a fresh service instance."""
+    service = ReadExecutorService(_EchoService)
+    value, thread_name, db = asyncio.run(service.fetch("x"))
+
+    assert value == "x"
+    assert thread_name.startswith("db-read")
+    assert db is not None
+    read_executor.shutdown_read_executor()
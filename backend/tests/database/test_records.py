@@ -0,0 +1,71 @@
+# pylint: disable=missing-module-docstring
+"""
+This script contains the test cases for the preparation of loader records.
+"""
+
+import math
+from backend.database.models import Course, Enrollment, Prereqs
+from backend.database.records import prepare_records
+
+
+def test_values_are_converted_to_column_types():
+    """Test that integral floats become ints, NaN becomes None and text stays text."""
+    rows, rejected = prepare_records(Course, [
+        {"course_code": "15-122", "units": 12.0, "min_units": float("nan"), "dep_code": 15,
+         "offered_qatar": 1, "name": "Imperative"},
+        {"course_code": "15-150", "units": "9", "min_units": 3, "dep_code": "15",
+         "offered_qatar": "false", "name": ""},
+    ], ["course_code"])
+
+    assert rejected == []
+    assert rows == [
+        {"course_code": "15-122", "units": 12, "min_units": None, "dep_code": "15",
+         "offered_qatar": True, "name": "Imperative"},
+        {"course_code": "15-150", "units": 9, "min_units": 3, "dep_code": "15",
+         "offered_qatar": False, "name": ""},
+    ]
+    assert isinstance(rows[0]["units"], int)
+
+
+def test_invalid_records_are_rejected():
+    """Test that values that don't fit the column and missing keys reject the record."""
+    records = [{"course_code": "15-122", "units": 12.5},
+               {"course_code": "15-150", "units": "twelve"},
+               {"course_code": float("nan"), "units": 12},
+               {"course_code": "15-213", "units": 12}]
+    rows, rejected = prepare_records(Course, records, ["course_code"])
+
+    assert rows == [{"course_code": "15-213", "units": 12}]
+    assert [record for record, _ in rejected] == records[:3]
+    assert rejected[2][1] == "missing primary key"
+
+
+def test_records_are_deduplicated_on_the_primary_key():
+    """Test that the last record with a key wins, including keys of equal value."""
+    rows, _ = prepare_records(Prereqs, [
+        {"course_code": "15-213", "prerequisite": "15-122", "group_id": 1.0, "logic_type": "A"},
+        {"course_code": "15-150", "prerequisite": "15-122", "group_id": 1, "logic_type": "A"},
+        {"course_code": "15-213", "prerequisite": "15-122", "group_id": 1, "logic_type": "B"},
+    ], ["course_code", "prerequisite", "group_id"])
+
+    assert [(r["course_code"], r["logic_type"]) for r in rows] == [("15-150", "A"),
+                                                                   ("15-213", "B")]
+
+
+def test_unknown_and_all_empty_columns_are_dropped():
+    """Test that a column that is empty in every record is left out, keeping stored values."""
+    rows, _ = prepare_records(Enrollment, [
+        {"enrollment_id": "a", "class_": 2029, "section": None, "semester": "F22"},
+        {"enrollment_id": "b", "class": 2030, "section": float("nan")},
+    ], ["enrollment_id"])
+
+    assert rows == [{"enrollment_id": "a", "class": 2029}, {"enrollment_id": "b", "class": 2030}]
+
+
+def test_records_are_not_modified():
+    """Test that the caller's records are left untouched."""
+    records = [{"course_code": "15-122", "units": 12.0, "min_units": float("nan"), "x": 1}]
+    prepare_records(Course, records, ["course_code"])
+
+    assert records[0]["units"] == 12.0 and isinstance(records[0]["units"], float)
+    assert math.isnan(records[0]["min_units"]) and records[0]["x"] == 1
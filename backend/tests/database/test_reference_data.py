@@ -0,0 +1,122 @@
+# pylint: disable=missing-module-docstring, redefined-outer-name
+"""
+This script contains the test cases for the reference data snapshot.
+"""
+
+import json
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.database.models import Base, Department, Course, Offering, Requirement, Audit
+from backend.database import reference_data
+from backend.database.data_version import bump_data_version
+from backend.database.reference_data import build_reference_snapshot, get_reference_snapshot
+from backend.database.reference_data import build_requirement_tree
+
+
+@pytest.fixture
+def db():
+    """Provides a session on an in-memory database with a few reference rows."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Department(dep_code="15", name="Computer Science"),
+        Department(dep_code="2", name="Computational Biology"),
+        Department(dep_code="99", name="No Courses"),
+        Course(course_code="15-122", dep_code="15"),
+        Course(course_code="02-251", dep_code="2"),
+        Audit(audit_id="cs_0", major="cs", type=False),
+        Requirement(requirement="BS in CS---Core", audit_id="cs_0"),
+        Offering(offering_id="15-122_F23_2", semester="F23", course_code="15-122", campus_id=2),
+        Offering(offering_id="15-122_S23_2", semester="S23", course_code="15-122", campus_id=2),
+        Offering(offering_id="02-251_M23_2", semester="M23", course_code="02-251", campus_id=2),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_snapshot_orders_and_serializes_reference_data(db):
+    """Test that the snapshot sorts departments and semesters and pre-serializes bodies."""
+    snapshot = build_reference_snapshot(db)
+
+    assert [code for code, _ in snapshot.departments] == ["2", "15"]
+    assert snapshot.semesters == ("S23", "M23", "F23")
+    assert snapshot.department_names["99"] == "No Courses"
+    assert json.loads(snapshot.requirements_body) == {
+        "requirements": [{"requirement": "BS in CS---Core", "type": False, "major": "cs"}]
+    }
+    assert json.loads(snapshot.semesters_body) == {"semesters": ["S23", "M23", "F23"]}
+    assert json.loads(snapshot.departments_body)["departments"][0] == {
+        "dep_code": "2", "name": "Computational Biology"
+    }
+
+
+def test_snapshot_rebuilds_when_data_version_changes(db, monkeypatch):
+    """Test that a stale snapshot is replaced once the data version moves on."""
+    monkeypatch.setattr(reference_data, "_snapshot", None)
+    monkeypatch.setattr(reference_data, "REFRESH_CHECK_SECONDS", 0)
+
+    first = get_reference_snapshot(db)
+    assert get_reference_snapshot(db) is first
+
+    db.add(Department(dep_code="3", name="Biological Sciences"))
+    db.add(Course(course_code="03-121", dep_code="3"))
+    bump_data_version(db)
+
+    second = get_reference_snapshot(db)
+    assert second is not first
+    assert [code for code, _ in second.departments] == ["2", "3", "15"]
+
+
+def test_snapshot_is_checked_right_after_switching_database(tmp_path, monkeypatch):
+    """Test that a session on another database (a published snapshot) is checked at once."""
+    monkeypatch.setattr(reference_data, "_snapshot", None)
+    sessions = []
+    for name, version in (("old", 1), ("new", 2)):
+        engine = create_engine(f"sqlite:///{tmp_path / name}.sqlite")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        session.add(Department(dep_code=name, name=name))
+        session.add(Course(course_code=f"{name}-1", dep_code=name))
+        for _ in range(version):
+            bump_data_version(session)
+        sessions.append(session)
+
+    old = get_reference_snapshot(sessions[0])
+    new = get_reference_snapshot(sessions[1])  # well within REFRESH_CHECK_SECONDS
+
+    assert [code for code, _ in old.departments] == ["old"]
+    assert [code for code, _ in new.departments] == ["new"]
+    assert get_reference_snapshot(sessions[1]) is new
+    for session in sessions:
+        session.close()
+        session.get_bind().dispose()
+
+
+def test_requirement_tree_counts_distinct_courses_bottom_up():
+    """Test that parent nodes count the union of their children's courses."""
+    requirement_rows = [
+        ("GenEd---Science---Biology", "cs_1", "GenEd", True, "cs"),
+        ("GenEd---Science---Physics", "cs_1", "GenEd", True, "cs"),
+        ("GenEd---Writing", "cs_1", "GenEd", True, "cs"),
+    ]
+    countsfor_rows = [
+        ("GenEd---Science---Biology", "03-121"),
+        ("GenEd---Science---Biology", "02-251"),
+        ("GenEd---Science---Physics", "33-141"),
+        ("GenEd---Science---Physics", "02-251"),
+        ("GenEd---Writing", "76-101"),
+    ]
+
+    [audit] = build_requirement_tree(requirement_rows, countsfor_rows, {"02-251", "76-101"})
+
+    assert (audit["audit_id"], audit["name"], audit["type"]) == ("cs_1", "GenEd", True)
+    assert (audit["num_courses"], audit["num_qatar_courses"]) == (4, 2)
+    science, writing = audit["children"]
+    assert science["path"] == "GenEd---Science"
+    assert not science["is_requirement"]
+    assert (science["num_courses"], science["num_qatar_courses"]) == (3, 1)
+    assert [child["name"] for child in science["children"]] == ["Biology", "Physics"]
+    assert writing["is_requirement"] and writing["children"] == []
@@ -0,0 +1,93 @@
+# pylint: disable=missing-module-docstring, redefined-outer-name
+"""
+This script contains the test cases for the enrollment rollup maintenance.
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from backend.database.models import Base, Department, Course, Offering, Enrollment
+from backend.database.models import CountsFor, Requirement, Audit, Instructor, CourseInstructor
+from backend.database.models import EnrollmentDepartmentRollup, EnrollmentRequirementRollup
+from backend.database.models import InstructorLoad, InstructorRequirement
+from backend.database.rollups import refresh_enrollment_rollups, refresh_instructor_rollups
+from backend.repository.instructors import InstructorRepository
+
+
+@pytest.fixture
+def db():
+    """Provides a session on an in-memory database with a small enrollment history."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Department(dep_code="15", name="Computer Science"),
+        Course(course_code="15-122", dep_code="15"),
+        Audit(audit_id="cs_0", major="cs", type=False),
+        Requirement(requirement="BS in CS---Core", audit_id="cs_0"),
+        CountsFor(course_code="15-122", requirement="BS in CS---Core"),
+        Offering(offering_id="15-122_F23_2", semester="F23", course_code="15-122", campus_id=2),
+        Offering(offering_id="15-122_S24_2", semester="S24", course_code="15-122", campus_id=2),
+        Enrollment(enrollment_id="a", offering_id="15-122_F23_2", class_=1, enrollment_count=10),
+        Enrollment(enrollment_id="b", offering_id="15-122_F23_2", class_=1, enrollment_count=5),
+        Enrollment(enrollment_id="c", offering_id="15-122_S24_2", class_=2, enrollment_count=7),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def _department_totals(db):
+    return {
+        (r.dep_code, r.semester, r.class_, r.campus_id): r.enrollment_count
+        for r in db.query(EnrollmentDepartmentRollup).all()
+    }
+
+
+def test_full_refresh_sums_enrollment(db):
+    """Test that a full refresh aggregates every semester."""
+    refresh_enrollment_rollups(db)
+
+    assert _department_totals(db) == {("15", "F23", 1, 2): 15, ("15", "S24", 2, 2): 7}
+    requirement_rows = db.query(EnrollmentRequirementRollup).count()
+    assert requirement_rows == 2
+
+
+def test_incremental_refresh_only_touches_given_semesters(db):
+    """Test that only the semesters in a new enrollment file are recomputed."""
+    refresh_enrollment_rollups(db)
+    db.query(Enrollment).filter(Enrollment.enrollment_id == "c").update({"enrollment_count": 9})
+    db.query(Enrollment).filter(Enrollment.enrollment_id == "a").update({"enrollment_count": 0})
+    db.commit()
+
+    refresh_enrollment_rollups(db, {"S24"})
+
+    totals = _department_totals(db)
+    assert totals[("15", "S24", 2, 2)] == 9
+    assert totals[("15", "F23", 1, 2)] == 15  # F23 was not part of the refresh
+
+
+def test_instructor_rollups(db):
+    """Test instructor load per semester and covered requirements."""
+    db.add_all([
+        Instructor(andrew_id="jdoe", first_name="Jane", last_name="Doe"),
+        CourseInstructor(andrew_id="jdoe", course_code="15-122"),
+    ])
+    db.commit()
+
+    refresh_instructor_rollups(db)
+
+    load = {(r.semester, r.num_courses, r.enrollment_count) for r in db.query(InstructorLoad)}
+    assert load == {("F23", 1, 15), ("S24", 1, 7)}
+    covered = [(r.requirement, r.num_courses) for r in db.query(InstructorRequirement)]
+    assert covered == [("BS in CS---Core", 1)]
+    assert InstructorRepository(db).get_instructors("15") == [("jdoe", "Jane", "Doe", 1)]
+
+
+def test_department_instructor_lookup_is_index_only(db):
+    """Test that the department lookup is answered from the course_code index alone."""
+    plan = db.execute(text(
+        "EXPLAIN QUERY PLAN SELECT andrew_id FROM course_instructor "
+        "WHERE course_code >= '15-' AND course_code < '15.'"
+    )).all()
+    assert any("COVERING INDEX ix_course_instructor_course_code" in row[-1] for row in plan)
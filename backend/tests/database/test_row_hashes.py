@@ -0,0 +1,187 @@
+# pylint: disable=missing-module-docstring, redefined-outer-name
+"""
+This script contains the test cases for the diff-based loading (row hashes and pruning).
+"""
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from backend.database import load_data
+from backend.database.models import Base, Course, Enrollment, Offering, Prereqs, RowHash
+from backend.database.models import Audit, CountsFor, DataVersion, Requirement
+
+COURSES = [
+    {"course_code": "15-122", "name": "Imperative Computation", "units": 12},
+    {"course_code": "15-150", "name": "Functional Programming", "units": 12},
+    {"course_code": "15-213", "name": "Computer Systems", "units": 12},
+]
+PREREQS = [
+    {"course_code": "15-213", "prerequisite": "15-122", "group_id": 1, "logic_type": "ALL"},
+    {"course_code": "15-150", "prerequisite": "15-122", "group_id": 1, "logic_type": "ALL"},
+]
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """A session factory on an empty file database."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'diff.sqlite'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _load(session_factory, data, prune=False):
+    return {table: diff.summary() for table, diff in load_data.load_data_from_dicts(
+        {table: [dict(r) for r in records] for table, records in data.items()},
+        session_factory=session_factory, prune=prune).items()}
+
+
+def _rows(session_factory, *columns):
+    with session_factory() as db:
+        return sorted(tuple(row) for row in db.execute(select(*columns)))
+
+
+def _data_version(session_factory):
+    with session_factory() as db:
+        return db.execute(select(DataVersion.version)).scalar()
+
+
+def test_unchanged_rows_are_skipped(session_factory):
+    """Test that reloading the same data writes nothing and keeps the data version."""
+    first = _load(session_factory, {"course": COURSES})
+    chunks = first["course"].pop("chunks")
+    assert first["course"] == {"inserted": 3, "updated": 0, "unchanged": 0, "deleted": 0,
+                               "failed": 0, "errors": []}
+    assert [(c["rows"], c["written"], c["failed"]) for c in chunks] == [(3, 3, 0)]
+    version = _data_version(session_factory)
+
+    second = _load(session_factory, {"course": COURSES})
+    assert second["course"]["unchanged"] == 3
+    assert second["course"]["inserted"] == second["course"]["updated"] == 0
+    assert second["course"]["chunks"] == []
+    assert _data_version(session_factory) == version
+
+
+def test_changed_and_new_rows_are_written(session_factory):
+    """Test that only rows whose content changed are updated, and new rows inserted."""
+    _load(session_factory, {"course": COURSES})
+    renamed = [dict(COURSES[0], name="Principles of Imperative Computation"), *COURSES[1:],
+               {"course_code": "15-251", "name": "Great Ideas", "units": 12}]
+
+    summary = _load(session_factory, {"course": renamed})
+
+    assert (summary["course"]["inserted"], summary["course"]["updated"],
+            summary["course"]["unchanged"]) == (1, 1, 2)
+    assert ("15-122", "Principles of Imperative Computation") in \
+        _rows(session_factory, Course.course_code, Course.name)
+
+
+def test_bad_record_only_fails_its_own_chunk(session_factory, monkeypatch):
+    """Test that chunks commit independently and a failed chunk is retried next load."""
+    monkeypatch.setattr(load_data, "LOAD_CHUNK_SIZE", 2)
+    engine = session_factory.kw["bind"]
+    event.listen(engine, "connect",
+                 lambda conn, _: conn.execute("PRAGMA foreign_keys=ON"))
+    engine.dispose()
+    _load(session_factory, {"course": COURSES})
+    offerings = [{"offering_id": f"{code}_F22_2", "semester": "F22", "course_code": code,
+                  "campus_id": 2} for code in ("15-122", "15-150", "15-213", "15-999")]
+
+    summary = _load(session_factory, {"offering": offerings})
+
+    # 15-999 is not a course, so the foreign key fails for that row only
+    assert [(c["rows"], c["written"], c["failed"]) for c in summary["offering"]["chunks"]] \
+        == [(2, 2, 0), (2, 1, 1)]
+    assert summary["offering"]["failed"] == 1
+    assert len(_rows(session_factory, Offering.offering_id)) == 3
+
+    # the failed chunk kept no hashes, so its good row is written again
+    retry = _load(session_factory, {"offering": offerings[:3]})
+    assert (retry["offering"]["updated"], retry["offering"]["unchanged"]) == (1, 2)
+
+
+def test_rows_missing_from_the_source_are_kept_without_prune(session_factory):
+    """Test that a partial load does not delete anything."""
+    _load(session_factory, {"course": COURSES, "prereqs": PREREQS})
+    summary = _load(session_factory, {"course": COURSES[:1]})
+    assert summary["course"]["deleted"] == 0
+    assert len(_rows(session_factory, Course.course_code)) == 3
+
+
+def test_prune_deletes_stale_rows_that_are_not_referenced(session_factory):
+    """Test that pruning removes dropped rows and their hashes, but keeps referenced ones."""
+    _load(session_factory, {"course": COURSES, "prereqs": PREREQS,
+                            "offering": [{"offering_id": "15-213_F22_2", "semester": "F22",
+                                          "course_code": "15-213", "campus_id": 2}]})
+
+    # 15-150 and 15-213 are dropped; 15-213 still has an offering (history) and stays
+    summary = _load(session_factory, {"course": COURSES[:1], "prereqs": PREREQS[:1]},
+                    prune=True)
+
+    assert summary["course"]["deleted"] == 1
+    assert summary["prereqs"]["deleted"] == 1
+    assert _rows(session_factory, Course.course_code) == [("15-122",), ("15-213",)]
+    assert _rows(session_factory, Prereqs.course_code) == [("15-213",)]
+    assert ("course", "15-150") not in _rows(session_factory, RowHash.table_name,
+                                             RowHash.row_key)
+
+
+def test_enrollment_is_pruned_per_offering(session_factory):
+    """Test that an enrollment load only replaces the sections of the offerings it has."""
+    offerings = [{"offering_id": f"15-122_{s}_2", "semester": s, "course_code": "15-122",
+                  "campus_id": 2} for s in ("F22", "S23")]
+    _load(session_factory, {"course": COURSES[:1], "offering": offerings})
+
+    def section(semester, name):
+        return {"semester": semester, "course_code": "15-122", "class_": 2029,
+                "enrollment_count": 10, "department": "CS", "section": name}
+
+    _load(session_factory, {"enrollment": [section("F22", "A"), section("F22", "B"),
+                                           section("S23", "A")]}, prune=True)
+    summary = _load(session_factory, {"enrollment": [section("F22", "A")]}, prune=True)
+
+    assert summary["enrollment"]["deleted"] == 1
+    assert _rows(session_factory, Enrollment.enrollment_id) == [
+        ("15-122_F22_2_2029_A_CS",), ("15-122_S23_2_2029_A_CS",)]
+    assert len(_rows(session_factory, Offering.offering_id)) == 2
+
+
+def _audits(*majors, drop=None):
+    audits, requirements, countsfor = [], [], []
+    for major in majors:
+        audits.append({"audit_id": f"{major}_0", "name": major.upper(), "type": False,
+                       "major": major})
+        for name in ("Core", "Electives"):
+            requirement = f"{major.upper()}---{name}"
+            if requirement == drop:
+                continue
+            requirements.append({"requirement": requirement, "audit_id": f"{major}_0"})
+            countsfor.append({"course_code": "15-122", "requirement": requirement})
+    return {"audit": audits, "requirement": requirements, "countsfor": countsfor}
+
+
+def test_audits_are_pruned_per_major(session_factory):
+    """Test that an audit upload with some of the majors leaves the other majors alone."""
+    _load(session_factory, {"course": COURSES[:1], **_audits("ba", "cs")})
+
+    summary = _load(session_factory, _audits("cs", drop="CS---Electives"), prune=True)
+
+    assert (summary["requirement"]["deleted"], summary["countsfor"]["deleted"]) == (1, 1)
+    assert summary["audit"]["deleted"] == 0
+    assert _rows(session_factory, Audit.audit_id) == [("ba_0",), ("cs_0",)]
+    assert _rows(session_factory, Requirement.requirement) == [
+        ("BA---Core",), ("BA---Electives",), ("CS---Core",)]
+    assert _rows(session_factory, CountsFor.requirement) == [
+        ("BA---Core",), ("BA---Electives",), ("CS---Core",)]
+
+
+def test_database_errors_are_raised_after_rollback(session_factory, monkeypatch):
+    """Test that a failure after the rows are written (e.g. the data version bump) raises."""
+    def fail(_db):
+        raise OperationalError("UPDATE data_version", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(load_data, "bump_data_version", fail)
+
+    with pytest.raises(load_data.LoadError, match="database is locked"):
+        _load(session_factory, {"course": COURSES})
@@ -0,0 +1,108 @@
+# pylint: disable=missing-module-docstring, redefined-outer-name
+"""
+This script contains the test cases for the zero-downtime database snapshots.
+"""
+
+import os
+import pytest
+from backend.database import db as database
+from backend.database import load_data, reference_data
+from backend.database.data_version import get_data_version
+from backend.database.models import Base, Department
+from backend.database.snapshots import staging_snapshot, rollback_snapshot
+
+
+@pytest.fixture
+def live_db(tmp_path, monkeypatch):
+    """Binds the application to a fresh SQLite file for the duration of a test."""
+    base_url = f"sqlite:///{tmp_path / 'live.sqlite'}"
+    database.init_engines()
+    original_url = database.bound_database_url
+    monkeypatch.setattr(database, "DATABASE_URL", base_url)
+    monkeypatch.setattr(reference_data, "_snapshot", None)
+    database.drain_engines(database.bind_database(base_url))
+    Base.metadata.create_all(database.engine)
+    with database.SessionLocal() as db:
+        db.add(Department(dep_code="15", name="Computer Science"))
+        db.commit()
+    yield tmp_path
+    database.drain_engines(database.bind_database(original_url))
+
+
+def _department_codes():
+    with database.ReadSessionLocal() as db:
+        return sorted(code for (code,) in db.query(Department.dep_code).all())
+
+
+def test_upload_is_invisible_until_published(live_db):
+    """Test that readers see the old data while a snapshot is loaded, then the new data."""
+    with staging_snapshot() as staging:
+        load_data.load_data_from_dicts(
+            {"department": [{"dep_code": "3", "name": "Biology"}]},
+            session_factory=staging.session_factory)
+        assert _department_codes() == ["15"]
+
+    assert _department_codes() == ["15", "3"]
+    assert database.read_pointer()["current"] == os.path.basename(staging.path)
+    assert reference_data.get_reference_snapshot(database.ReadSessionLocal()).department_names \
+        == {"15": "Computer Science", "3": "Biology"}
+
+
+def test_failed_upload_is_discarded(live_db):
+    """Test that an error while loading leaves the live database and pointer untouched."""
+    with pytest.raises(RuntimeError):
+        with staging_snapshot() as staging:
+            load_data.load_data_from_dicts(
+                {"department": [{"dep_code": "3", "name": "Biology"}]},
+                session_factory=staging.session_factory)
+            raise RuntimeError("extraction failed")
+
+    assert _department_codes() == ["15"]
+    assert not os.path.exists(staging.path)
+    assert database.read_pointer() == {}
+
+
+def test_rollback_flips_the_pointer(live_db):
+    """Test that rolling back switches to the previous snapshot and back again."""
+    with staging_snapshot() as staging:
+        load_data.load_data_from_dicts(
+            {"department": [{"dep_code": "3", "name": "Biology"}]},
+            session_factory=staging.session_factory)
+
+    assert rollback_snapshot() == "live.sqlite"
+    assert _department_codes() == ["15"]
+    assert rollback_snapshot() == os.path.basename(staging.path)
+    assert _department_codes() == ["15", "3"]
+
+
+def _data_version():
+    with database.ReadSessionLocal() as db:
+        return get_data_version(db)
+
+
+def _upload(dep_code, name):
+    with staging_snapshot() as staging:
+        load_data.load_data_from_dicts({"department": [{"dep_code": dep_code, "name": name}]},
+                                       session_factory=staging.session_factory)
+
+
+def test_data_versions_are_not_reused_after_a_rollback(live_db):
+    """Test that an upload after a rollback gets a version no other snapshot had."""
+    _upload("3", "Biology")
+    rolled_back = _data_version()
+    rollback_snapshot()
+
+    _upload("18", "Electrical Engineering")
+
+    assert _department_codes() == ["15", "18"]
+    assert _data_version() > rolled_back
+
+
+def test_unchanged_upload_keeps_the_data_version(live_db):
+    """Test that a snapshot without changes keeps the version, so caches stay valid."""
+    _upload("3", "Biology")
+    version = _data_version()
+
+    _upload("3", "Biology")
+
+    assert _data_version() == version
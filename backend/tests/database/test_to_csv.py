@@ -0,0 +1,81 @@
+# pylint: disable=missing-module-docstring, redefined-outer-name
+"""
+This script contains the test cases for the CSV export of the database tables.
+"""
+
+import os
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from backend.database import to_csv
+from backend.database.models import Base, Course, Department
+from backend.database.to_csv import export_changed_tables, export_tables_to_csv
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A session on a file database with a department and two courses."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'export.sqlite'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([
+            Department(dep_code="15", name="Computer Science"),
+            Course(course_code="15-122", name="Imperative, Computation", units=12,
+                   offered_qatar=True, dep_code="15"),
+            Course(course_code="15-150", name="Functional", offered_qatar=False),
+        ])
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_tables_are_streamed_to_csv(db, tmp_path, monkeypatch):
+    """Test the CSV format: a header, quoted commas, True/False and empty NULLs."""
+    monkeypatch.setattr(to_csv, "EXPORT_CHUNK_SIZE", 1)
+    out = tmp_path / "csv"
+
+    assert export_tables_to_csv(session=db, output_dir=str(out), table_names=["course"]) \
+        == {"course": "success"}
+
+    assert _read(out / "course.csv") == (
+        "course_code,name,units,min_units,max_units,offered_qatar,offered_pitts,short_name,"
+        "description,dep_code,prereqs_text\n"
+        '15-122,"Imperative, Computation",12,,,True,,,,15,\n'
+        "15-150,Functional,,,,False,,,,,\n"
+    )
+    assert sorted(os.listdir(out)) == ["course.csv"]
+
+
+def test_only_changed_or_missing_tables_are_exported(db, tmp_path):
+    """Test that the post-ingestion export skips tables that did not change."""
+    out = tmp_path / "csv"
+    export_tables_to_csv(session=db, output_dir=str(out), table_names=["course", "department"])
+    (out / "course.csv").write_text("stale", encoding="utf-8")
+    (out / "department.csv").write_text("stale", encoding="utf-8")
+
+    results = export_changed_tables({"course"}, ["course", "department", "audit"],
+                                    output_dir=str(out), session=db)
+
+    assert results == {"course": "success", "audit": "success"}  # audit had no CSV yet
+    assert _read(out / "course.csv").startswith("course_code,")
+    assert _read(out / "department.csv") == "stale"
+    assert export_changed_tables(set(), ["course", "audit"], str(out), session=db) == {}
+
+
+def test_failed_export_keeps_the_previous_file(db, tmp_path):
+    """Test that a failing export leaves the old CSV in place and no temporary file."""
+    out = tmp_path / "csv"
+    export_tables_to_csv(session=db, output_dir=str(out), table_names=["department"])
+    previous = _read(out / "department.csv")
+    db.execute(text("DROP TABLE department"))
+
+    results = export_tables_to_csv(session=db, output_dir=str(out), table_names=["department"])
+
+    assert results["department"] != "success"
+    assert _read(out / "department.csv") == previous
+    assert sorted(os.listdir(out)) == ["department.csv"]
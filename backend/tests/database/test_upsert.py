@@ -0,0 +1,74 @@
+# pylint: disable=missing-module-docstring, redefined-outer-name
+"""
+This script contains the test cases for the bulk upserts used by the loader.
+"""
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from backend.database.models import Base, Course, Enrollment
+from backend.database.upsert import upsert_records
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A session on an empty file database."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'upsert.sqlite'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def _courses(db):
+    return {c.course_code: (c.name, c.units) for c in db.execute(select(Course)).scalars()}
+
+
+def test_upsert_inserts_and_updates(db):
+    """Test that new rows are inserted and existing ones updated in place."""
+    upsert_records(db, Course, [{"course_code": "15-122", "name": "Old", "units": 10}],
+                   ["course_code"])
+    db.commit()
+
+    result = upsert_records(db, Course, [
+        {"course_code": "15-122", "name": "Principles of Imperative Computation", "units": 12},
+        {"course_code": "15-213", "name": "Computer Systems", "units": 12},
+    ], ["course_code"], batch_size=1)
+    db.commit()
+
+    assert (result.written, result.failed) == (2, 0)
+    assert _courses(db) == {"15-122": ("Principles of Imperative Computation", 12),
+                            "15-213": ("Computer Systems", 12)}
+
+
+def test_upsert_keeps_columns_missing_from_the_record(db):
+    """Test that a record only overwrites the columns it contains."""
+    upsert_records(db, Course, [{"course_code": "15-122", "name": "Imperative", "units": 12}],
+                   ["course_code"])
+    upsert_records(db, Course, [{"course_code": "15-122", "name": "Renamed"}], ["course_code"])
+    db.commit()
+    assert _courses(db) == {"15-122": ("Renamed", 12)}
+
+
+def test_upsert_reports_failing_rows_only(db):
+    """Test that a bad row fails alone while the rest of its batch is written."""
+    result = upsert_records(db, Course, [
+        {"course_code": "15-122", "name": "Imperative"},
+        {"course_code": "15-150", "name": {"not": "bindable"}},
+        {"course_code": None, "name": "No key"},
+        {"course_code": "15-213", "name": "Systems"},
+    ], ["course_code"])
+    db.commit()
+
+    assert (result.written, result.failed) == (2, 2)
+    assert [record["course_code"] for record, _ in result.errors] == [None, "15-150"]
+    assert set(_courses(db)) == {"15-122", "15-213"}
+
+
+def test_upsert_maps_attribute_names_to_columns(db):
+    """Test that attribute names differing from their column (class_) are written."""
+    upsert_records(db, Enrollment, [{"enrollment_id": "e1", "class_": 3, "enrollment_count": 7,
+                                     "unknown_key": "ignored"}], ["enrollment_id"])
+    db.commit()
+    enrollment = db.get(Enrollment, "e1")
+    assert (enrollment.class_, enrollment.enrollment_count) == (3, 7)
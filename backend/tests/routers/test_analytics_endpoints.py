@@ -1 +1,137 @@
- 
\ No newline at end of file
+# pylint: disable=missing-module-docstring
+"""
+This script contains the test cases for the analytics endpoints.
+"""
+
+from fastapi.testclient import TestClient
+from backend.app.main import app
+client = TestClient(app)
+
+# ---------------------------
+# Analytics Endpoints (from analytics router)
+# ---------------------------
+
+def test_get_enrollment_data_single_course(query_budget):
+    """
+    Test enrollment data endpoint for a single course
+    """
+    with query_budget(1):
+        response = client.get("/analytics/enrollment-data", params={"course_code": "15-122"})
+    assert response.status_code == 200
+    data = response.json()
+    assert isinstance(data["enrollment_data"], list)
+    # two class years in each of the nine Qatar semesters, summed with Pittsburgh
+    assert len(data["enrollment_data"]) == 18
+    for record in data["enrollment_data"]:
+        assert "semester" in record
+        assert "class_" in record
+        assert "enrollment_count" in record
+
+def test_get_enrollment_data_multiple_courses(query_budget):
+    """
+    Test enrollment data endpoint returning several series in one response
+    """
+    codes = ["15-122", "15-213"]
+    with query_budget(1):
+        response = client.get("/analytics/enrollment-data",
+                              params={"course_codes": ",".join(codes)})
+    assert response.status_code == 200
+    data = response.json()
+    assert isinstance(data["enrollment_data"], list)
+    assert {record["course_code"] for record in data["enrollment_data"]} == set(codes)
+    assert data["enrollment_data"][0] == {"course_code": "15-122", "semester": "F20",
+                                          "class_": 1, "enrollment_count": 7}
+    for record in data["enrollment_data"]:
+        assert record["course_code"] in codes
+
+def test_get_enrollment_data_requires_a_filter(query_budget):
+    """
+    Test enrollment data endpoint without any course selector
+    """
+    with query_budget(0):
+        response = client.get("/analytics/enrollment-data")
+    assert response.status_code == 400
+
+def test_get_enrollment_totals_by_department(query_budget):
+    """
+    Test enrollment totals endpoint served from the rollup tables
+    """
+    with query_budget(1):
+        response = client.get("/analytics/enrollment-totals",
+                              params={"group_by": "department", "semester": "F24"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["group_by"] == "department"
+    assert {total["group"] for total in data["totals"]} == {"15", "21", "76", "80"}
+    for total in data["totals"]:
+        assert total["semester"] == "F24"
+        assert {"group", "class_", "enrollment_count"} <= total.keys()
+
+def test_get_enrollment_totals_rejects_unknown_group(query_budget):
+    """
+    Test enrollment totals endpoint with an unsupported grouping
+    """
+    with query_budget(0):
+        response = client.get("/analytics/enrollment-totals", params={"group_by": "instructor"})
+    assert response.status_code == 422
+
+def test_get_enrollment_forecast(query_budget):
+    """
+    Test enrollment forecast endpoint for a course
+    """
+    with query_budget(1):
+        response = client.get("/analytics/enrollment-forecast", params={"course_code": "15-122"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["scope"] == "course"
+    assert {f["model"] for f in data["forecasts"]} == {"moving_average", "linear_trend", "seasonal"}
+    for forecast in data["forecasts"]:
+        assert forecast["model"] in ("moving_average", "linear_trend", "seasonal")
+        assert forecast["lower"] <= forecast["forecast"] <= forecast["upper"]
+
+def test_get_requirement_demand(query_budget):
+    """
+    Test requirement demand endpoint for one major
+    """
+    with query_budget(4):
+        response = client.get("/analytics/requirement-demand", params={"major": "cs"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["model"] == "linear_trend"
+    assert len(data["demand"]) == 4
+    for item in data["demand"]:
+        assert item["major"] == "cs"
+        assert isinstance(item["history"], list)
+        assert isinstance(item["projection"], list)
+        assert item["history"] and item["projection"]
+
+def test_get_requirement_overlap(query_budget):
+    """
+    Test requirement overlap endpoint within one major
+    """
+    with query_budget(2):
+        response = client.get("/analytics/requirement-overlap", params={"major": "cs"})
+    assert response.status_code == 200
+    data = response.json()
+    assert {(pair["requirement_b"], tuple(pair["shared_courses"])) for pair in data["overlaps"]} \
+        == {("BS in Computer Science---Mathematics", ("15-251",)),
+            ("GenEd---Writing", ("76-101",))}
+    for pair in data["overlaps"]:
+        assert pair["shared_count"] == len(pair["shared_courses"])
+        assert 0 < pair["jaccard"] <= 1
+
+def test_get_coverage_gaps(query_budget):
+    """
+    Test coverage gap endpoint for one semester
+    """
+    with query_budget(3):
+        response = client.get("/analytics/coverage-gaps", params={"semester": "F24", "major": "cs"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["semester"] == "F24"
+    # Ethics is only taught in Pittsburgh in F24
+    assert [(gap["requirement"], gap["previous_covered"]) for gap in data["gaps"]] == [
+        ("GenEd---Ethics", "S24")]
+    for gap in data["gaps"]:
+        assert gap["major"] == "cs"
+        assert gap["num_courses"] <= data["max_courses"]
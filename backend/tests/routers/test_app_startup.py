@@ -0,0 +1,72 @@
+# pylint: disable=missing-module-docstring
+"""
+This script contains the startup-time tests for the application.
+Each test starts a fresh interpreter, so that modules imported by other tests don't hide
+slow or eager imports.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+# Wall-clock budgets depend on the machine, so they are only checked with
+# RUN_BENCHMARKS=1; the module and engine checks catch eager imports in every run
+RUN_BENCHMARKS = os.getenv("RUN_BENCHMARKS") == "1"
+IMPORT_BUDGET_SECONDS = 3.0
+STARTUP_BUDGET_SECONDS = 5.0
+
+DEFERRED_MODULES = [
+    "pandas",
+    "openpyxl",
+    "backend.database.load_data",
+    "backend.scripts.course_extractor",
+    "backend.scripts.audit_extractor",
+    "backend.scripts.enrollment_extractor",
+]
+
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import backend.app.main as main
+from backend.database import db
+imported = time.perf_counter() - start
+result = {"import_seconds": imported,
+          "engine_created_on_import": db.engine is not None,
+          "loaded": [name for name in json.loads(sys.argv[1]) if name in sys.modules]}
+from fastapi.testclient import TestClient
+with TestClient(main.app):
+    result["startup_seconds"] = time.perf_counter() - start
+    result["engine_created_on_startup"] = db.engine is not None
+print(json.dumps(result))
+"""
+
+
+def _run_startup(database_url: str) -> dict:
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+    completed = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT, json.dumps(DEFERRED_MODULES)],
+        cwd=project_root,
+        env={**os.environ, "PYTHONPATH": project_root, "DATABASE_URL": database_url},
+        capture_output=True, text=True, timeout=120, check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_app_startup_is_lazy(catalog_db):
+    """Test that importing the app defers the upload modules and the engines to startup."""
+    result = _run_startup(catalog_db)
+
+    assert result["loaded"] == [], "upload-only modules imported at startup"
+    assert not result["engine_created_on_import"]
+    assert result["engine_created_on_startup"]
+
+
+@pytest.mark.skipif(not RUN_BENCHMARKS, reason="timing budgets run with RUN_BENCHMARKS=1")
+def test_app_startup_within_budget(catalog_db):
+    """Test that importing and starting the app fits the startup budget."""
+    result = _run_startup(catalog_db)
+
+    assert result["import_seconds"] < IMPORT_BUDGET_SECONDS, result
+    assert result["startup_seconds"] < STARTUP_BUDGET_SECONDS, result
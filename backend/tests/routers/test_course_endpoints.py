@@ -11,74 +11,101 @@ client = TestClient(app)
 # Courses Endpoints (from courses router)
 # ---------------------------
 
-def test_search_courses():
+def test_search_courses(query_budget):
     """
     Test course search endpoint
     """
     params = {
-        "department": "CS",
+        "department": "15",
         "semester": "F20",
     }
-    response = client.get("/courses/search", params=params)
-    # Expect 200 if matching courses found, 404 otherwise
-    assert response.status_code in (200, 404), f"Search failed ({response.status_code}): {response.text[:100]}"
-    if response.status_code == 200:
-        data = response.json()
-        assert isinstance(data, dict)
-        assert "courses" in data
-        assert isinstance(data["courses"], list)
-        if data["courses"]:
-            course = data["courses"][0]
-            assert isinstance(course, dict)
+    with query_budget(3):
+        response = client.get("/courses/search", params=params)
+    assert response.status_code == 200, f"Search failed ({response.status_code}): {response.text[:100]}"
+    data = response.json()
+    assert isinstance(data, dict)
+    assert "courses" in data
+    assert isinstance(data["courses"], list)
+    # 15-213 is only offered in fall semesters, 15-251 only in spring ones (and F24)
+    assert [course["course_code"] for course in data["courses"]] == ["15-112", "15-122", "15-213"]
+    course = data["courses"][0]
+    assert isinstance(course, dict)
+
+    assert "course_code" in course
+    assert "course_name" in course
+    assert "department" in course
+    assert "units" in course
+    assert "description" in course
+    assert "prerequisites" in course
+    assert "offered" in course
+    assert isinstance(course["offered"], list)
+    assert "F20" in course["offered"]
+    assert "offered_qatar" in course
+    assert "offered_pitts" in course
+    assert "requirements" in course
+    assert isinstance(course["requirements"], dict)
+    assert course["requirements"]["CS"]
+    assert all(course.get("department") == params["department"] for course in data["courses"])
 
-            assert "course_code" in course
-            assert "course_name" in course
-            assert "department" in course
-            assert "units" in course
-            assert "description" in course
-            assert "prerequisites" in course
-            assert "offered" in course
-            assert isinstance(course["offered"], list)
-            assert "offered_qatar" in course
-            assert "offered_pitts" in course
-            assert "requirements" in course
-            assert isinstance(course["requirements"], dict)
-            if "department" in params:
-                assert course.get("department") == params["department"]
+def test_search_courses_batches_course_details(query_budget):
+    """
+    Test that course search fetches the details of all matching courses in batches:
+    one query for the courses, one for their requirements and one for their semesters
+    """
+    with query_budget(3):
+        response = client.get("/courses/search", params={"department": "15"})
+    assert response.status_code == 200
+    courses = response.json()["courses"]
+    assert len(courses) == 4
+    assert all(course["department"] == "15" for course in courses)
+    assert all(course["offered"] and course["requirements"]["CS"] for course in courses)
 
-def test_get_all_semesters():
+def test_get_all_semesters(query_budget):
     """
     Test get all semesters endpoint
     """
-    response = client.get("/courses/semesters")
+    with query_budget(1):
+        response = client.get("/courses/semesters")
     assert response.status_code == 200
     data = response.json()
     assert isinstance(data, dict)
     assert "semesters" in data
     assert isinstance(data["semesters"], list)
-    if data["semesters"]:
-        assert isinstance(data["semesters"][0], str)
+    assert data["semesters"] == ["F20", "S21", "F21", "S22", "F22", "S23", "F23", "S24", "F24"]
 
-def test_get_course_by_code():
+def test_get_course_by_code(query_budget):
     """
     Test get course by code endpoint
     """
-    course_code_to_test = "15122"
-    response = client.get(f"/courses/{course_code_to_test}")
-    assert response.status_code in (200, 404)
-    if response.status_code == 200:
-        data = response.json()
-        assert isinstance(data, dict)
-        assert "course_code" in data
-        assert "course_name" in data
-        assert "department" in data
-        assert "units" in data
-        assert "description" in data
-        assert "prerequisites" in data
-        assert "offered" in data
-        assert isinstance(data["offered"], list)
-        assert "offered_qatar" in data
-        assert "offered_pitts" in data
-        assert "requirements" in data
-        assert isinstance(data["requirements"], dict)
-        assert data["course_code"] == course_code_to_test
+    course_code_to_test = "15-122"
+    with query_budget(3):
+        response = client.get(f"/courses/{course_code_to_test}")
+    assert response.status_code == 200
+    data = response.json()
+    assert isinstance(data, dict)
+    assert "course_code" in data
+    assert "course_name" in data
+    assert "department" in data
+    assert "units" in data
+    assert "description" in data
+    assert "prerequisites" in data
+    assert "offered" in data
+    assert isinstance(data["offered"], list)
+    assert "offered_qatar" in data
+    assert "offered_pitts" in data
+    assert "requirements" in data
+    assert isinstance(data["requirements"], dict)
+    assert data["course_code"] == course_code_to_test
+    assert data["course_name"] == "Principles of Imperative Computation"
+    assert data["prerequisites"] == "15-112"
+    assert {"F20", "F24"} <= set(data["offered"])
+    assert data["requirements"]["CS"] == [
+        {"requirement": "BS in Computer Science---Core", "type": False, "major": "CS"}]
+
+def test_get_unknown_course(query_budget):
+    """
+    Test get course by code endpoint for a code without a dash
+    """
+    with query_budget(1):
+        response = client.get("/courses/15122")
+    assert response.status_code == 404
@@ -11,19 +11,18 @@ client = TestClient(app)
 # Departments Endpoint (from departments router)
 # ---------------------------
 
-def test_get_departments():
+def test_get_departments(query_budget):
     """
     Test get departments endpoint
     """
-    response = client.get("/departments")
-    assert response.status_code in (200, 404)
-    if response.status_code == 200:
-        data = response.json()
-        assert isinstance(data, dict)
-        assert "departments" in data
-        assert isinstance(data["departments"], list)
-        if data["departments"]:
-            dept = data["departments"][0]
-            assert isinstance(dept, dict)
-            assert "dep_code" in dept
-            assert "name" in dept
\ No newline at end of file
+    with query_budget(1):
+        response = client.get("/departments")
+    assert response.status_code == 200
+    data = response.json()
+    assert isinstance(data, dict)
+    assert "departments" in data
+    assert isinstance(data["departments"], list)
+    assert len(data["departments"]) == 4
+    dept = data["departments"][0]
+    assert isinstance(dept, dict)
+    assert dept == {"dep_code": "15", "name": "Computer Science"}
@@ -0,0 +1,34 @@
+# pylint: disable=missing-module-docstring
+"""
+This script contains the test cases for the instructor analytics endpoints.
+"""
+
+from fastapi.testclient import TestClient
+from backend.app.main import app
+client = TestClient(app)
+
+# ---------------------------
+# Instructor Endpoints (from instructors router)
+# ---------------------------
+
+def test_get_instructors(query_budget):
+    """
+    Test instructor list endpoint
+    """
+    with query_budget(1):
+        response = client.get("/analytics/instructors", params={"department": "15"})
+    assert response.status_code == 200
+    data = response.json()
+    assert isinstance(data["instructors"], list)
+    assert [i["andrew_id"] for i in data["instructors"]] == ["jdoe"]
+    for instructor in data["instructors"]:
+        assert "andrew_id" in instructor
+        assert instructor["num_courses"] > 0
+
+def test_get_unknown_instructor(query_budget):
+    """
+    Test instructor detail endpoint for an unknown andrew id
+    """
+    with query_budget(1):
+        response = client.get("/analytics/instructors/not-an-instructor")
+    assert response.status_code == 404
@@ -0,0 +1,48 @@
+# pylint: disable=missing-module-docstring
+"""
+This script contains the test cases for the /metrics endpoint.
+"""
+
+import re
+from fastapi.testclient import TestClient
+from backend.app.main import app
+from backend.app.metrics import registry
+client = TestClient(app)
+
+
+def _value(body: str, sample: str) -> float:
+    match = re.search(rf"^{re.escape(sample)} (\S+)$", body, re.MULTILINE)
+    assert match, f"{sample} missing from /metrics"
+    return float(match.group(1))
+
+
+def test_metrics_record_route_and_sql_work(query_budget):
+    """Test that a request is recorded under its route template with its SQL work."""
+    registry.reset()
+    with query_budget(3):
+        response = client.get("/courses/15-122")
+    assert response.status_code == 200
+
+    with query_budget(0):
+        metrics = client.get("/metrics")
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    labels = '{method="GET",route="/courses/{course_code}"}'
+    body = metrics.text
+    assert _value(body, 'http_requests_total{method="GET",route="/courses/{course_code}",'
+                        f'status="{response.status_code}"}}') == 1
+    assert _value(body, f"http_request_duration_seconds_count{labels}") == 1
+    assert _value(body, f"http_request_sql_statements_sum{labels}") >= 1
+    assert _value(body, f"http_request_db_seconds_total{labels}") > 0
+    assert _value(body, f"http_response_size_bytes_total{labels}") == len(response.content)
+    assert "/courses/15-122" not in body
+
+
+def test_metrics_expose_cache_and_process_gauges(query_budget):
+    """Test that cache hit ratios and process memory are exported."""
+    with query_budget(0):
+        body = client.get("/metrics").text
+    assert 0.0 <= _value(body, 'cache_hit_ratio{cache="analytics"}') <= 1.0
+    assert _value(body, "process_resident_memory_bytes") > 0
+    assert "# TYPE http_request_duration_seconds histogram" in body
@@ -11,23 +11,109 @@ client = TestClient(app)
 # Requirements Endpoints (from requirements router)
 # ---------------------------
 
-def test_get_requirements():
+def test_get_requirements(query_budget):
     """
     Test get requirements endpoint
     """
-    response = client.get("/requirements")
-    assert response.status_code in (200, 404)
-    if response.status_code == 200:
-        data = response.json()
-
-        assert isinstance(data, dict)
-        assert "requirements" in data
-        assert isinstance(data["requirements"], list)
-
-        if data["requirements"]:
-            req = data["requirements"][0]
-            assert isinstance(req, dict)
-            assert "requirement" in req
-            assert "type" in req
-            assert "major" in req
-            assert isinstance(req["type"], bool)
\ No newline at end of file
+    with query_budget(1):
+        response = client.get("/requirements")
+    assert response.status_code == 200
+    data = response.json()
+
+    assert isinstance(data, dict)
+    assert "requirements" in data
+    assert isinstance(data["requirements"], list)
+    assert len(data["requirements"]) == 4
+
+    req = data["requirements"][0]
+    assert isinstance(req, dict)
+    assert "requirement" in req
+    assert "type" in req
+    assert "major" in req
+    assert isinstance(req["type"], bool)
+    assert {r["major"] for r in data["requirements"]} == {"cs"}
+
+def test_get_requirement_tree(query_budget):
+    """
+    Test get requirement tree endpoint
+    """
+    with query_budget(1):
+        response = client.get("/requirements/tree")
+    assert response.status_code == 200
+    data = response.json()
+    assert isinstance(data["audits"], list)
+    assert [audit["audit_id"] for audit in data["audits"]] == ["cs_0", "cs_1"]
+
+    for audit in data["audits"]:
+        assert {"audit_id", "name", "major", "type", "num_courses",
+                "num_qatar_courses", "children"} <= audit.keys()
+        assert audit["num_qatar_courses"] <= audit["num_courses"]
+        assert audit["children"]
+        for node in audit["children"]:
+            assert 0 < node["num_courses"] <= audit["num_courses"]
+
+
+def test_get_requirement_courses(query_budget):
+    """
+    Test the paginated courses of a requirement endpoint
+    """
+    requirement = "BS in Computer Science---Core"
+
+    with query_budget(3):
+        response = client.get(f"/requirements/{requirement}/courses",
+                              params={"page_size": 2, "summary": True})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["requirement"] == requirement
+    assert data["page"] == 1 and data["page_size"] == 2
+    assert data["total"] == 5
+    assert data["courses"] == [
+        {"course_code": "15-112", "course_name": "Fundamentals of Programming and Computer Science",
+         "department": "15", "units": 12},
+        {"course_code": "15-122", "course_name": "Principles of Imperative Computation",
+         "department": "15", "units": 12},
+    ]
+
+
+def test_get_requirement_courses_pages(query_budget):
+    """
+    Test that the pages of a requirement's courses cover every course once, in order
+    """
+    requirement = "BS in Computer Science---Core"
+    pages = []
+    for page in (1, 2, 3, 4):
+        with query_budget(3):
+            response = client.get(f"/requirements/{requirement}/courses",
+                                  params={"page": page, "page_size": 2, "summary": True})
+        assert response.status_code == 200
+        assert response.json()["total"] == 5
+        pages.append([course["course_code"] for course in response.json()["courses"]])
+
+    # the last page is partial and a page beyond the end is empty
+    assert pages == [["15-112", "15-122"], ["15-213", "15-251"], ["76-101"], []]
+
+
+def test_get_requirement_courses_details(query_budget):
+    """
+    Test the full course details on a page of a requirement's courses
+    """
+    with query_budget(5):
+        response = client.get("/requirements/GenEd---Writing/courses", params={"page_size": 1})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert [course["course_code"] for course in data["courses"]] == ["76-101"]
+    course = data["courses"][0]
+    assert course["offered_qatar"] and course["offered_pitts"]
+    assert {"F20", "F24"} <= set(course["offered"])
+
+
+def test_get_requirement_courses_unknown(query_budget):
+    """
+    Test the courses of an unknown requirement
+    """
+    with query_budget(1):
+        response = client.get("/requirements/Not a requirement/courses")
+        assert response.status_code == 404
+        response = client.get("/requirements/Not a requirement/courses", params={"page": 0})
+    assert response.status_code == 422
@@ -0,0 +1,325 @@
+# pylint: disable=missing-module-docstring, redefined-outer-name
+"""
+This script contains the test cases for the background ingestion jobs of /upload/init-db/.
+Most tests run the jobs on a thread instead of the worker process, so they can inspect
+the database the job loaded into; one test runs a job in a real worker process.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi.testclient import TestClient
+from backend.app.main import app
+from backend.app.routers import upload
+from backend.app.utils import ingestion, jobs
+from backend.database import db as database
+from backend.database import load_data, reference_data, to_csv
+from backend.database.models import Base, Department
+client = TestClient(app)
+
+DEPARTMENT_CSV = b"dep_code,name\n15,Computer Science\n3,Biology\n"
+UPLOAD_CONTENT = {"departments": True, "courses": False, "audits": False,
+                  "enrollment": False}
+
+
+@pytest.fixture
+def upload_env(tmp_path, monkeypatch):
+    """A fresh live database, upload, export and jobs directories, and a job thread."""
+    base_url = f"sqlite:///{tmp_path / 'live.sqlite'}"
+    database.init_engines()
+    original_url = database.bound_database_url
+    monkeypatch.setattr(database, "DATABASE_URL", base_url)
+    monkeypatch.setattr(reference_data, "_snapshot", None)
+    database.drain_engines(database.bind_database(base_url))
+    Base.metadata.create_all(database.engine)
+    with database.SessionLocal() as db:
+        db.add(Department(dep_code="15", name="Computer Science"))
+        db.commit()
+    monkeypatch.setattr(upload, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(to_csv, "DEFAULT_OUTPUT_DIR", str(tmp_path / "csv"))
+    monkeypatch.setattr(jobs, "JOBS_DIR", str(tmp_path / "jobs"))
+    monkeypatch.setattr(jobs, "_executor", ThreadPoolExecutor(max_workers=1))
+    yield tmp_path
+    jobs.shutdown_job_executor()
+    database.drain_engines(database.bind_database(original_url))
+
+
+def _department_codes():
+    database.sync_database_binding()
+    with database.ReadSessionLocal() as db:
+        return sorted(code for (code,) in db.query(Department.dep_code).all())
+
+
+def _wait_for(job_id, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        state = jobs.read_job(job_id)
+        if state["status"] in jobs.TERMINAL_STATUSES:
+            return state
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish: {state}")
+
+
+def _upload_departments():
+    response = client.post("/upload/init-db/", files={
+        "department_csv": ("departments.csv", DEPARTMENT_CSV, "text/csv")})
+    assert response.status_code == 202, response.text
+    return response.json()
+
+
+def test_upload_returns_a_job_that_loads_in_the_background(upload_env):
+    """Test that the upload is queued as a job recording its stages, progress and result."""
+    accepted = _upload_departments()
+    assert accepted["status_url"] == f"/upload/jobs/{accepted['job_id']}"
+    _wait_for(accepted["job_id"])
+
+    state = client.get(accepted["status_url"]).json()
+    assert state["status"] == "succeeded", state
+    assert [(s["name"], s["status"]) for s in state["stages"]] == [
+        ("departments", "succeeded"), ("export", "succeeded")]
+    assert all(s["seconds"] >= 0 for s in state["stages"])
+    # 15 was not loaded by the loader (no stored hash), so it is written again
+    assert state["progress"] == {"files_parsed": 1, "rows_written": 2}
+    assert state["result"]["loaded_data"] == ["departments"]
+    assert (state["result"]["diff"]["department"]["inserted"],
+            state["result"]["diff"]["department"]["updated"]) == (1, 1)
+    assert _department_codes() == ["15", "3"]
+    assert os.path.exists(upload_env / "csv" / "department.csv")
+
+
+def test_events_stream_the_job_state_until_it_finishes(upload_env):
+    """Test that the SSE stream sends status events and ends with the final state."""
+    accepted = _upload_departments()
+
+    with client.stream("GET", accepted["events_url"]) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+
+    events = [block for block in body.split("\n\n") if block.startswith("event: status")]
+    assert events
+    assert '"status": "succeeded"' in events[-1]
+    assert '"rows_written": 2' in events[-1]
+
+
+def test_unknown_and_finished_jobs(upload_env):
+    """Test the 404 for unknown jobs and the 409 when cancelling a finished one."""
+    assert client.get("/upload/jobs/0123abcd").status_code == 404
+    assert client.get("/upload/jobs/0123abcd/events").status_code == 404
+    assert client.post("/upload/jobs/0123abcd/cancel").status_code == 404
+
+    job_id = _upload_departments()["job_id"]
+    _wait_for(job_id)
+    assert client.post(f"/upload/jobs/{job_id}/cancel").status_code == 409
+
+
+def test_upload_is_rejected_while_a_job_is_active(upload_env):
+    """Test that a second upload cannot overwrite the files of a queued or running job."""
+    os.makedirs(jobs.JOBS_DIR)
+    jobs._write_state(jobs.JOBS_DIR, {  # pylint: disable=protected-access
+        "job_id": "0123abcd", "status": "running", "pid": os.getpid(),
+        "created_at": "2026-01-01T00:00:00+00:00"})
+
+    response = client.post("/upload/init-db/", files={
+        "department_csv": ("departments.csv", DEPARTMENT_CSV, "text/csv")})
+
+    assert response.status_code == 409
+    assert not os.path.exists(upload_env / "uploads" / "departments")
+
+
+def test_concurrent_uploads_reserve_a_single_job(upload_env, monkeypatch):
+    """Test that of two uploads saving their files at the same time, only one is accepted."""
+    save = upload.save_upload_file
+
+    async def slow_save(*args):
+        await asyncio.sleep(0.3)  # both requests would pass a check made before the save
+        return await save(*args)
+
+    monkeypatch.setattr(upload, "save_upload_file", slow_save)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        responses = list(pool.map(lambda _: client.post("/upload/init-db/", files={
+            "department_csv": ("departments.csv", DEPARTMENT_CSV, "text/csv")}), range(2)))
+
+    assert sorted(r.status_code for r in responses) == [202, 409]
+    accepted = next(r.json() for r in responses if r.status_code == 202)
+    assert _wait_for(accepted["job_id"])["status"] == "succeeded"
+
+
+def test_rejected_upload_releases_its_reservation(upload_env):
+    """Test that an upload failing validation does not block the next one."""
+    response = client.post("/upload/init-db/", files={
+        "enrollment_file": ("enrollment.xlsx", b"not excel", "application/octet-stream")})
+
+    assert response.status_code == 400
+    assert jobs.active_job() is None
+    assert _wait_for(_upload_departments()["job_id"])["status"] == "succeeded"
+
+
+def test_stale_reservation_lock_is_taken_over(upload_env):
+    """Test that a reservation lock left by a process that died does not block uploads."""
+    os.makedirs(jobs.JOBS_DIR)
+    lock_path = os.path.join(jobs.JOBS_DIR, jobs.RESERVATION_LOCK)
+    with open(lock_path, "w", encoding="utf-8"):
+        pass
+    stale = time.time() - jobs.RESERVATION_LOCK_STALE_SECONDS - 1
+    os.utime(lock_path, (stale, stale))
+
+    job_id = jobs.reserve_job()
+
+    assert jobs.read_job(job_id)["status"] == "queued"
+    assert not os.path.exists(lock_path)
+    with pytest.raises(jobs.JobConflict):
+        jobs.reserve_job()
+
+
+def test_job_of_a_dead_process_is_reported_failed(upload_env):
+    """Test that a job left running by a process that exited is marked as failed."""
+    exited = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                            capture_output=True, text=True, check=True)
+    os.makedirs(jobs.JOBS_DIR)
+    jobs._write_state(jobs.JOBS_DIR, {  # pylint: disable=protected-access
+        "job_id": "0123abcd", "status": "running", "pid": int(exited.stdout),
+        "created_at": "2026-01-01T00:00:00+00:00"})
+
+    state = client.get("/upload/jobs/0123abcd").json()
+
+    assert state["status"] == "failed"
+    assert jobs.active_job() is None
+
+
+def test_cancelled_job_discards_what_it_loaded(upload_env, monkeypatch):
+    """Test that a job cancelled mid-way stops at its next check and publishes nothing."""
+    load = ingestion.load_data_from_dicts
+
+    def load_then_cancel(*args, **kwargs):
+        diffs = load(*args, **kwargs)
+        client.post(f"/upload/jobs/{job_id}/cancel")
+        return diffs
+
+    monkeypatch.setattr(ingestion, "load_data_from_dicts", load_then_cancel)
+    csv_path = upload_env / "departments.csv"
+    csv_path.write_bytes(DEPARTMENT_CSV)
+    course_dir = upload_env / "courses"
+    course_dir.mkdir()
+    job_id = jobs.submit_job(
+        "backend.app.utils.ingestion:run_ingestion",
+        {"dept_csv_path": csv_path, "course_dir": str(course_dir), "audit_root": None,
+         "enrollment_excel_path": None},
+        dict(UPLOAD_CONTENT, courses=True))
+
+    state = _wait_for(job_id)
+
+    assert state["status"] == "cancelled", state
+    assert [s["name"] for s in state["stages"]] == ["departments"]
+    assert state["result"] is None
+    assert _department_codes() == ["15"]
+    assert database.read_pointer() == {}
+
+
+def test_cancel_right_before_publishing_discards_the_upload(upload_env, monkeypatch):
+    """Test that a cancel arriving after the last stage still stops the publish."""
+    begin_publish = jobs.JobReporter.begin_publish
+
+    def cancel_then_publish(reporter):
+        assert client.post(f"/upload/jobs/{reporter.job_id}/cancel").status_code == 200
+        begin_publish(reporter)
+
+    monkeypatch.setattr(jobs.JobReporter, "begin_publish", cancel_then_publish)
+    job_id = _upload_departments()["job_id"]
+
+    state = _wait_for(job_id)
+
+    assert state["status"] == "cancelled", state
+    assert not state["publishing"]
+    assert _department_codes() == ["15"]
+    assert database.read_pointer() == {}
+
+
+def test_cancel_after_publishing_started_is_refused(upload_env, monkeypatch):
+    """Test that a job publishing its upload answers 409 to a cancel and still succeeds."""
+    responses = []
+    export = ingestion.export_changed_tables
+
+    def cancel_then_export(*args):
+        state = jobs.active_job()
+        responses.append(client.post(f"/upload/jobs/{state['job_id']}/cancel"))
+        export(*args)
+
+    monkeypatch.setattr(ingestion, "export_changed_tables", cancel_then_export)
+    job_id = _upload_departments()["job_id"]
+
+    state = _wait_for(job_id)
+
+    assert responses[0].status_code == 409
+    assert "too late to cancel" in responses[0].json()["detail"]
+    assert state["status"] == "succeeded", state
+    assert state["publishing"]
+    assert _department_codes() == ["15", "3"]
+
+
+@pytest.fixture
+def failing_biology(monkeypatch):
+    """Makes the write of the Biology department (dep_code 3) fail."""
+    upsert = load_data.upsert_records
+
+    def upsert_failing_biology(db, model, records, key_columns):
+        records = list(records)
+        result = upsert(db, model, [r for r in records if r.get("dep_code") != "3"],
+                        key_columns)
+        for record in records:
+            if record.get("dep_code") == "3":
+                result.add_error(record, "simulated constraint failure")
+        return result
+
+    monkeypatch.setattr(load_data, "upsert_records", upsert_failing_biology)
+
+
+def test_job_with_a_failed_row_publishes_the_other_rows(upload_env, failing_biology):
+    """Test that a record that cannot be written is reported without failing the upload."""
+    state = _wait_for(_upload_departments()["job_id"])
+
+    assert state["status"] == "succeeded", state
+    department = state["result"]["diff"]["department"]
+    assert department["failed"] == 1
+    assert department["errors"] == [
+        "simulated constraint failure (record: {'name': 'Biology', 'dep_code': '3'})"]
+    assert _department_codes() == ["15"]
+    assert database.read_pointer() != {}
+
+
+def test_job_over_the_failed_row_limit_publishes_nothing(upload_env, failing_biology,
+                                                         monkeypatch):
+    """Test that an upload with more failed records than UPLOAD_MAX_FAILED_ROWS is discarded."""
+    monkeypatch.setattr(ingestion, "MAX_FAILED_ROWS", 0)
+
+    state = _wait_for(_upload_departments()["job_id"])
+
+    assert state["status"] == "failed"
+    assert "1 in department" in state["error"]
+    assert _department_codes() == ["15"]
+    assert database.read_pointer() == {}
+
+
+def test_job_runs_in_a_worker_process(upload_env, monkeypatch):
+    """Test that the job executor loads the upload in a separate process."""
+    jobs.shutdown_job_executor()
+    # the worker process reads its configuration from the environment
+    monkeypatch.setenv("DATABASE_URL", database.DATABASE_URL)
+    monkeypatch.setenv("CSV_EXPORT_DIR", str(upload_env / "csv"))
+    monkeypatch.setattr(database, "POINTER_CHECK_SECONDS", 0.0)
+    csv_path = upload_env / "departments.csv"
+    csv_path.write_bytes(DEPARTMENT_CSV)
+
+    job_id = jobs.submit_job(
+        "backend.app.utils.ingestion:run_ingestion",
+        {"dept_csv_path": csv_path, "course_dir": None, "audit_root": None,
+         "enrollment_excel_path": None}, UPLOAD_CONTENT)
+    state = _wait_for(job_id, timeout=120.0)
+
+    assert state["status"] == "succeeded", state
+    assert state["pid"] != os.getpid()
+    assert _department_codes() == ["15", "3"]
@@ -0,0 +1,8 @@
+# pylint: disable=missing-module-docstring, unused-argument
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def no_database_queries(assert_no_queries):
+    """Service tests mock their repositories, so no test may reach the database."""
+    yield
@@ -1,8 +1,8 @@
 # pylint: disable=missing-module-docstring, redefined-outer-name
 import pytest
 from unittest.mock import patch, MagicMock
-from backend.services.analytics import AnalyticsService
-from backend.app.schemas import CourseCoverageResponse, CourseCoverageItem
+from backend.services.analytics import AnalyticsService, analytics_cache
+from backend.app.schemas import CourseCoverageResponse, CourseCoverageItem, EnrollmentTotalsResponse
 
 # Mock data for course coverage (repo returns Dict[str, int])
 MOCK_COVERAGE_DATA = {
@@ -97,4 +97,143 @@ def test_fetch_enrollment_data(mock_analytics_repo, db_session_mock):
 
     # Verify repo call
     mock_analytics_repo.assert_called_once_with(db_session_mock)
-    mock_repo_instance.get_enrollment_data.assert_called_once_with(course_code_to_fetch)
\ No newline at end of file
+    mock_repo_instance.get_enrollment_data.assert_called_once_with(course_code_to_fetch)
+
+@patch('backend.services.analytics.AnalyticsRepository')
+def test_fetch_enrollment_data_for_courses(mock_analytics_repo, db_session_mock):
+    """Test fetching enrollment series for several courses in one call."""
+    mock_repo_instance = mock_analytics_repo.return_value
+    mock_repo_instance.get_enrollment_data_for_courses.return_value = [
+        {"course_code": "15-121", "semester": "F23", "enrollment_count": 50, "class_": 1},
+        {"course_code": "15-122", "semester": "F23", "enrollment_count": 40, "class_": 2},
+    ]
+
+    service = AnalyticsService(db=db_session_mock)
+    result = service.fetch_enrollment_data_for_courses(course_codes=["15-121", "15-122"])
+
+    assert [r["course_code"] for r in result] == ["15-121", "15-122"]
+    assert result[1]["enrollment_count"] == 40
+    mock_repo_instance.get_enrollment_data_for_courses.assert_called_once_with(
+        course_codes=["15-121", "15-122"], department=None
+    )
+
+@patch('backend.services.analytics.AnalyticsRepository')
+def test_fetch_enrollment_totals(mock_analytics_repo, db_session_mock):
+    """Test fetching enrollment totals read from the rollups."""
+    mock_repo_instance = mock_analytics_repo.return_value
+    mock_repo_instance.get_enrollment_totals.return_value = [
+        {"group": "15", "semester": "F23", "class_": 1, "enrollment_count": 120},
+    ]
+
+    service = AnalyticsService(db=db_session_mock)
+    result = service.fetch_enrollment_totals("department", semester="F23")
+
+    assert isinstance(result, EnrollmentTotalsResponse)
+    assert result.group_by == "department"
+    assert result.totals[0].enrollment_count == 120
+    mock_repo_instance.get_enrollment_totals.assert_called_once_with(
+        "department", semester="F23", campus_id=None, major=None
+    )
+
+@patch('backend.services.analytics.AnalyticsRepository')
+def test_fetch_enrollment_forecast(mock_analytics_repo, db_session_mock):
+    """Test fetching stored enrollment forecasts for a department."""
+    mock_repo_instance = mock_analytics_repo.return_value
+    mock_repo_instance.get_enrollment_forecasts.return_value = [
+        {"semester": "F25", "model": "seasonal", "forecast": 80.0,
+         "lower": 70.0, "upper": 90.0, "num_observations": 3},
+    ]
+
+    service = AnalyticsService(db=db_session_mock)
+    result = service.fetch_enrollment_forecast("department", "15")
+
+    assert result.scope == "department"
+    assert result.forecasts[0].model == "seasonal"
+    mock_repo_instance.get_enrollment_forecasts.assert_called_once_with("department", "15")
+
+@patch('backend.services.analytics.AnalyticsRepository')
+def test_fetch_requirement_demand(mock_analytics_repo, db_session_mock):
+    """Test that seat demand is enrollment projected through the countsfor incidence."""
+    analytics_cache.clear()
+    mock_repo_instance = mock_analytics_repo.return_value
+    mock_repo_instance.get_data_version.return_value = 7
+    mock_repo_instance.get_requirement_incidence.return_value = [
+        ("15-122", "CS Core", "cs"),
+        ("15-122", "CS Electives", "cs"),
+        ("15-213", "CS Core", "cs"),
+    ]
+    mock_repo_instance.get_enrollment_data_for_courses.return_value = [
+        {"course_code": "15-122", "semester": "F23", "class_": 1, "enrollment_count": 30},
+        {"course_code": "15-122", "semester": "F23", "class_": 2, "enrollment_count": 10},
+        {"course_code": "15-213", "semester": "F23", "class_": 2, "enrollment_count": 20},
+    ]
+    mock_repo_instance.get_course_forecasts.return_value = [
+        ("15-122", "S24", 50.0, 40.0, 60.0),
+    ]
+
+    service = AnalyticsService(db=db_session_mock)
+    result = service.fetch_requirement_demand(major="cs", class_year=2)
+    demand = {item.requirement: item for item in result.demand}
+
+    assert demand["CS Core"].history[0].demand == 30  # 10 from 15-122 + 20 from 15-213
+    assert demand["CS Electives"].history[0].demand == 10
+    # 15-122 projects 50 seats, a quarter of which historically came from class year 2
+    assert demand["CS Electives"].projection[0].demand == 12.5
+
+    # A second call with the same data version is served from the cache
+    service.fetch_requirement_demand(major="cs", class_year=2)
+    mock_repo_instance.get_requirement_incidence.assert_called_once_with(["cs"])
+
+@patch('backend.services.analytics.AnalyticsRepository')
+def test_fetch_requirement_overlap(mock_analytics_repo, db_session_mock):
+    """Test pairwise shared course counts and Jaccard similarity."""
+    analytics_cache.clear()
+    mock_repo_instance = mock_analytics_repo.return_value
+    mock_repo_instance.get_data_version.return_value = 1
+    mock_repo_instance.get_requirement_incidence.return_value = [
+        ("15-122", "CS Core", "cs"),
+        ("15-213", "CS Core", "cs"),
+        ("15-213", "IS Electives", "is"),
+        ("67-250", "IS Electives", "is"),
+        ("67-272", "IS Core", "is"),
+    ]
+
+    service = AnalyticsService(db=db_session_mock)
+    result = service.fetch_requirement_overlap(majors=["is", "cs"])
+
+    assert result.majors == ["cs", "is"]
+    assert len(result.requirements) == 3
+    assert len(result.overlaps) == 1
+    pair = result.overlaps[0]
+    assert {pair.requirement_a, pair.requirement_b} == {"CS Core", "IS Electives"}
+    assert pair.shared_count == 1
+    assert pair.jaccard == round(1 / 3, 4)
+    assert pair.shared_courses == ["15-213"]
+
+@patch('backend.services.analytics.AnalyticsRepository')
+def test_fetch_coverage_gaps(mock_analytics_repo, db_session_mock):
+    """Test gap detection and the nearest covered semesters."""
+    analytics_cache.clear()
+    mock_repo_instance = mock_analytics_repo.return_value
+    mock_repo_instance.get_data_version.return_value = 1
+    mock_repo_instance.get_requirement_incidence.return_value = [
+        ("76-101", "GenEd---Writing", "cs"),
+        ("79-104", "GenEd---History", "cs"),
+        ("15-122", "BS in CS---Core", "cs"),
+    ]
+    mock_repo_instance.get_campus_offerings.return_value = [
+        ("76-101", "F24"), ("79-104", "S24"), ("79-104", "F25"),
+    ]
+
+    service = AnalyticsService(db=db_session_mock)
+    result = service.fetch_coverage_gaps("F24")
+    gaps = {gap.requirement: gap for gap in result.gaps}
+
+    assert set(gaps) == {"GenEd---History", "BS in CS---Core"}
+    assert gaps["GenEd---History"].previous_covered == "S24"
+    assert gaps["GenEd---History"].next_covered == "F25"
+    assert gaps["BS in CS---Core"].previous_covered is None
+
+    result = service.fetch_coverage_gaps("F24", max_courses=1, majors=["cs"])
+    assert len(result.gaps) == 3
+    mock_repo_instance.get_campus_offerings.assert_called_once_with(campus_id=2)
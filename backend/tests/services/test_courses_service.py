@@ -143,21 +143,6 @@ def test_fetch_course_by_code_not_found(mock_course_repo, db_session_mock):
     mock_repo_instance.get_offered_semesters.assert_not_called()
     mock_repo_instance.get_course_requirements.assert_not_called()
 
-@patch('backend.services.courses.CourseRepository')
-def test_fetch_all_semesters(mock_course_repo, db_session_mock):
-    """Test fetching all available semesters."""
-    mock_semesters = ["F22", "S23", "F23", "S24"]
-    mock_repo_instance = mock_course_repo.return_value
-    mock_repo_instance.get_all_semesters.return_value = mock_semesters
-
-    service = CourseService(db=db_session_mock)
-    result = service.fetch_all_semesters()
-
-    assert result == mock_semesters
-    mock_course_repo.assert_called_once_with(db_session_mock)
-    mock_repo_instance.get_all_semesters.assert_called_once()
-
-
 @patch('backend.services.courses.CourseRepository')
 def test_fetch_courses_by_filters_no_filters(mock_course_repo, db_session_mock):
     """Test fetching courses with no filters, checking sorting."""
@@ -0,0 +1,52 @@
+# pylint: disable=missing-module-docstring, redefined-outer-name
+import types
+import pytest
+from unittest.mock import patch, MagicMock
+from backend.services.instructors import InstructorService
+from backend.app.schemas import InstructorListResponse, InstructorDetailResponse
+
+MOCK_INSTRUCTOR = types.SimpleNamespace(andrew_id="jdoe", first_name="Jane", last_name="Doe")
+
+@pytest.fixture
+def db_session_mock():
+    """Provides a mock database session."""
+    return MagicMock()
+
+@patch('backend.services.instructors.InstructorRepository')
+def test_fetch_instructors(mock_instructor_repo, db_session_mock):
+    """Test listing instructors for a department."""
+    mock_repo_instance = mock_instructor_repo.return_value
+    mock_repo_instance.get_instructors.return_value = [("jdoe", "Jane", "Doe", 3)]
+
+    service = InstructorService(db=db_session_mock)
+    result = service.fetch_instructors(department="15")
+
+    assert isinstance(result, InstructorListResponse)
+    assert result.instructors[0].num_courses == 3
+    mock_repo_instance.get_instructors.assert_called_once_with("15")
+
+@patch('backend.services.instructors.InstructorRepository')
+def test_fetch_instructor(mock_instructor_repo, db_session_mock):
+    """Test fetching an instructor's courses, requirements and chronological load."""
+    mock_repo_instance = mock_instructor_repo.return_value
+    mock_repo_instance.get_instructor.return_value = MOCK_INSTRUCTOR
+    mock_repo_instance.get_instructor_courses.return_value = [("15-122", "Imperative Computation")]
+    mock_repo_instance.get_instructor_requirements.return_value = [("CS Core", "cs", 1)]
+    mock_repo_instance.get_instructor_load.return_value = [("S24", 1, 40), ("F23", 2, None)]
+
+    service = InstructorService(db=db_session_mock)
+    result = service.fetch_instructor("jdoe")
+
+    assert isinstance(result, InstructorDetailResponse)
+    assert [c.course_code for c in result.courses] == ["15-122"]
+    assert result.requirements[0].major == "cs"
+    assert [l.semester for l in result.load] == ["F23", "S24"]
+    assert result.load[0].enrollment_count == 0
+
+@patch('backend.services.instructors.InstructorRepository')
+def test_fetch_instructor_not_found(mock_instructor_repo, db_session_mock):
+    """Test fetching an unknown instructor."""
+    mock_instructor_repo.return_value.get_instructor.return_value = None
+
+    service = InstructorService(db=db_session_mock)
+    assert service.fetch_instructor("nobody") is None
@@ -2,46 +2,61 @@
 import pytest
 from unittest.mock import patch, MagicMock
 from backend.services.requirements import RequirementService
-from backend.app.schemas import RequirementsResponse, RequirementResponse
-
-# Mock data inspired by requirement.csv and RequirementResponse schema
-# Repository is expected to return a list of dicts
-MOCK_REQUIREMENTS_DATA = [
-    {"requirement": "GenEd---Cultural/Global Understanding---Modern Languages Course", "type": True, "major": "bio"},
-    {"requirement": "GenEd---Non-Technical Breadth Electives", "type": False, "major": "bio"},
-    {"requirement": "BS in Computer Science---SCS Electives", "type": True, "major": "cs"},
-    {"requirement": "BS in Information Systems---Technical Core---Mathematics", "type": True, "major": "is"},
-]
+from backend.app.schemas import RequirementCourseDetail, RequirementCourseSummary
 
 @pytest.fixture
 def db_session_mock():
     """Provides a mock database session."""
     return MagicMock()
 
+
+MOCK_PAGE = [
+    {"course_code": "15-122", "course_name": "Principles of Imperative Computation",
+     "department": "15", "units": 12},
+]
+
 @patch('backend.services.requirements.RequirementRepository')
-def test_fetch_all_requirements(mock_requirement_repo, db_session_mock):
-    """Test fetching all requirements successfully."""
-    # Configure the mock repository method
+def test_fetch_requirement_courses_paginates(mock_requirement_repo, db_session_mock):
+    """Test that the page bounds are turned into offset/limit and details are attached."""
     mock_repo_instance = mock_requirement_repo.return_value
-    mock_repo_instance.get_all_requirements.return_value = MOCK_REQUIREMENTS_DATA
+    mock_repo_instance.requirement_exists.return_value = True
+    mock_repo_instance.get_requirement_courses.return_value = (41, MOCK_PAGE)
+    mock_repo_instance.get_course_details.return_value = {
+        "15-122": {"description": "Imperative programming", "prerequisites": "15-112",
+                   "offered_qatar": True, "offered_pitts": True,
+                   "offered": ["F23", "S23", "M23"]}
+    }
 
-    # Instantiate the service with the mock session
     service = RequirementService(db=db_session_mock)
+    result = service.fetch_requirement_courses("BS in CS---Core", campus_id=2,
+                                               page=3, page_size=20)
+
+    mock_repo_instance.get_requirement_courses.assert_called_once_with(
+        "BS in CS---Core", semester=None, campus_id=2, offset=40, limit=20)
+    assert result.total == 41 and result.page == 3
+    [course] = result.courses
+    assert isinstance(course, RequirementCourseDetail)
+    assert course.offered == ["S23", "M23", "F23"]
+
 
-    # Call the service method
-    result = service.fetch_all_requirements()
+@patch('backend.services.requirements.RequirementRepository')
+def test_fetch_requirement_courses_summary(mock_requirement_repo, db_session_mock):
+    """Test that the summary projection skips the course details lookup."""
+    mock_repo_instance = mock_requirement_repo.return_value
+    mock_repo_instance.requirement_exists.return_value = True
+    mock_repo_instance.get_requirement_courses.return_value = (1, MOCK_PAGE)
+
+    service = RequirementService(db=db_session_mock)
+    result = service.fetch_requirement_courses("BS in CS---Core", summary=True)
 
-    # Assertions
-    assert isinstance(result, RequirementsResponse)
-    assert len(result.requirements) == len(MOCK_REQUIREMENTS_DATA)
+    assert isinstance(result.courses[0], RequirementCourseSummary)
+    assert "offered" not in result.model_dump()["courses"][0]
+    mock_repo_instance.get_course_details.assert_not_called()
 
-    # Check the content of each RequirementResponse object
-    for i, expected_req_dict in enumerate(MOCK_REQUIREMENTS_DATA):
-        assert isinstance(result.requirements[i], RequirementResponse)
-        assert result.requirements[i].requirement == expected_req_dict["requirement"]
-        assert result.requirements[i].type == expected_req_dict["type"]
-        assert result.requirements[i].major == expected_req_dict["major"]
 
-    # Verify repository methods were called correctly
-    mock_requirement_repo.assert_called_once_with(db_session_mock)
-    mock_repo_instance.get_all_requirements.assert_called_once()
\ No newline at end of file
+@patch('backend.services.requirements.RequirementRepository')
+def test_fetch_requirement_courses_unknown(mock_requirement_repo, db_session_mock):
+    """Test that an unknown requirement yields None."""
+    mock_requirement_repo.return_value.requirement_exists.return_value = False
+    service = RequirementService(db=db_session_mock)
+    assert service.fetch_requirement_courses("Nope") is None
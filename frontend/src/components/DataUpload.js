@@ -26,6 +26,24 @@ const DataUpload = () => {
     loading: false,
     error: null,
     success: null,
+    progress: null,
+  });
+
+  // Follows the progress stream of an upload job until the job finishes
+  const waitForJob = (eventsUrl) => new Promise((resolve, reject) => {
+    const source = new EventSource(`${API_BASE_URL}${eventsUrl}`);
+    source.addEventListener('status', (event) => {
+      const job = JSON.parse(event.data);
+      setState(prev => ({ ...prev, progress: job }));
+      if (['succeeded', 'failed', 'cancelled'].includes(job.status)) {
+        source.close();
+        resolve(job);
+      }
+    });
+    source.onerror = () => {
+      source.close();
+      reject(new Error('Lost the connection to the upload job'));
+    };
   });
 
   const validateZipStructure = async (file, type) => {
@@ -219,10 +237,17 @@ const DataUpload = () => {
         throw new Error(data.detail || 'Upload failed');
       }
 
+      // The files are saved; the data is loaded by a background job
+      const job = await waitForJob(data.events_url);
+      if (job.status !== 'succeeded') {
+        throw new Error(job.error || `Upload ${job.status}`);
+      }
+
       setState(prev => ({
         ...prev,
-        success: data.message || (data.loaded_data ? `Successfully loaded: ${data.loaded_data.join(', ')}` : 'Operation completed successfully'),
+        success: job.result.message || (job.result.loaded_data ? `Successfully loaded: ${job.result.loaded_data.join(', ')}` : 'Operation completed successfully'),
         loading: false,
+        progress: null,
       }));
     } catch (error) {
       console.error('Upload error details:', {
@@ -243,6 +268,7 @@ const DataUpload = () => {
         ...prev,
         error: errorMessage,
         loading: false,
+        progress: null,
       }));
     }
   };
@@ -455,6 +481,13 @@ const DataUpload = () => {
           </Alert>
         )}
 
+        {state.loading && state.progress && (
+          <Alert severity="info" sx={{ mb: 2 }}>
+            {state.progress.stage ? `Loading ${state.progress.stage}` : `Upload ${state.progress.status}`}
+            {`: ${state.progress.progress.files_parsed || 0} files parsed, ${state.progress.progress.rows_written || 0} rows written`}
+          </Alert>
+        )}
+
         {state.success && (
           <Alert severity="success" sx={{ mb: 2 }}>
             {state.success}